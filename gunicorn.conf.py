@@ -0,0 +1,32 @@
+"""Gunicorn settings for ``gunicorn -c gunicorn.conf.py wsgi:app``.
+
+SQLite takes one writer at a time, so a few processes with several threads
+each serve better than many single-threaded workers. Keep ``threads`` at or
+below the engine's ``pool_size`` (10). Every process keeps its own caches of
+settings, reference lists and rates; they are checked against the database's
+change counters on each request, so a write made through one worker shows
+up in the others at their next request.
+"""
+import os
+
+bind = os.environ.get('NORALYZER_BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('NORALYZER_WORKERS', 2))
+worker_class = 'gthread'
+threads = int(os.environ.get('NORALYZER_THREADS', 8))
+timeout = 120  # large uploads are saved before the import job takes over
+preload_app = True  # wsgi.py migrates the database once, in the master
+
+
+def on_starting(server):
+    # Once, in the master: a worker would also fail the jobs the other workers are running
+    from noralyzer.jobs import fail_interrupted_jobs
+    from wsgi import app
+    fail_interrupted_jobs(app)
+
+
+def post_fork(server, worker):
+    # SQLite connections opened by the master must not be shared with the workers
+    from noralyzer.extensions import db
+    from wsgi import app
+    with app.app_context():
+        db.engine.dispose(close=False)
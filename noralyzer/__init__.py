@@ -0,0 +1,71 @@
+"""Noralyzer: personal finance tracking on Flask and SQLite.
+
+``create_app`` builds an application with its own database engine, caches and
+job runner, so several instances (an in-memory database per test, say) can
+live in one process.
+"""
+import os
+from types import SimpleNamespace
+
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from .budgets import BudgetSpending
+from .cache import REFERENCE_MODELS, ReferenceCache, SettingsStore
+from .changes import forget_change_versions
+from .config import Config
+from .errors import ApiError, handle_api_error, handle_not_found
+from .extensions import db
+from .jobs import JobRunner
+from .maintenance import run_maintenance_command, schedule_maintenance
+from .notifications import inject_notifications
+from .recurring import run_recurring_command
+from .schema import init_db
+from .valuation import RateTable, import_rates_command, inject_base_currency
+from .views import register_blueprints
+
+
+def create_app(config=None):
+    """Application configured from ``Config`` updated with the ``config`` mapping; the database is made current."""
+    app = Flask(__name__, template_folder='../templates', static_folder='../static')
+    app.config.from_object(Config)
+    app.config.update(config or {})
+    app.config['JOB_FOLDER'] = app.config['JOB_FOLDER'] or os.path.join(app.instance_path, 'jobs')
+    if make_url(app.config['SQLALCHEMY_DATABASE_URI']).database not in (None, '', ':memory:'):
+        # One connection per server thread plus the job workers; in-memory databases keep a single shared one
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {'pool_size': 10, 'max_overflow': 10, 'pool_timeout': 30})
+
+    db.init_app(app)
+    with app.app_context():
+        event.listen(db.engine, 'connect', lambda connection, record: set_sqlite_pragmas(app, connection))
+
+    app.extensions['noralyzer'] = SimpleNamespace(
+        reference_cache=ReferenceCache(REFERENCE_MODELS),
+        settings_store=SettingsStore(),
+        rate_table=RateTable(),
+        budget_spending=BudgetSpending(),
+        job_runner=JobRunner(app),
+        maintained_on=None,  # Day the daily maintenance was last started from this process
+        checkpointed_through=None,  # Month end the ledger write hook last checkpointed up to
+    )
+    # Each request reads the change counters afresh before trusting the in-process caches
+    app.before_request(forget_change_versions)
+    app.after_request(schedule_maintenance)
+    app.context_processor(inject_base_currency)
+    app.context_processor(inject_notifications)
+    app.register_error_handler(ApiError, handle_api_error)
+    app.register_error_handler(404, handle_not_found)
+    register_blueprints(app)
+    app.cli.add_command(import_rates_command)
+    app.cli.add_command(run_recurring_command)
+    app.cli.add_command(run_maintenance_command)
+
+    init_db(app)
+    return app
+
+def set_sqlite_pragmas(app, dbapi_connection):
+    cursor = dbapi_connection.cursor()
+    for name, value in app.config['SQLITE_PRAGMAS'].items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+    cursor.close()
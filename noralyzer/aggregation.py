@@ -0,0 +1,88 @@
+"""Per-entity transaction statistics.
+
+Listing pages get one GROUP BY per page instead of a SUM/COUNT query per
+bank, category or goal; the person and place reports one GROUP BY per
+report instead of loading every row.
+"""
+from decimal import Decimal
+
+from .cache import reference_list
+from .extensions import db
+from .models import Category, Transaction
+from .money import from_minor
+from .valuation import rate_table
+
+def sum_of_types(types=None):
+    """SUM(amount_minor) over rows whose type is in ``types`` (all rows when None)."""
+    amount = Transaction.amount_minor
+    if types is not None:
+        amount = db.case((Transaction.transaction_type.in_(types), Transaction.amount_minor), else_=0)
+    return db.func.coalesce(db.func.sum(amount), 0)
+
+def grouped_totals(group_column, **sums):
+    """Aggregate transactions by ``group_column`` in a single query.
+
+    ``sums`` maps result names to transaction type lists (None for all types).
+    Returns ``{group value: {name: total, ..., 'count': row count}}``; groups
+    without transactions are missing, so look values up with ``.get``.
+    Totals are valued in the base currency, see ``valued_totals``.
+    """
+    names = list(sums)
+    month = db.func.strftime('%Y-%m', Transaction.date)
+    query = db.session.query(
+        group_column, Transaction.currency, month, db.func.count(Transaction.id),
+        *[sum_of_types(sums[name]) for name in names]
+    ).filter(group_column.is_not(None)).group_by(group_column, Transaction.currency, month)
+    stats = {}
+    for key, currency, month_key, count, *totals in query:
+        factor = rate_table.factor(currency, month_key)
+        entry = stats.setdefault(key, dict(dict.fromkeys(names, Decimal(0)), count=0))
+        entry['count'] += count
+        for name, total in zip(names, totals):
+            entry[name] += from_minor(total, currency) * factor
+    return stats
+
+class EntityReport:
+    """Totals of one person's or place's transactions, by category and by month.
+
+    ``totals``, every ``categories`` entry and every ``months`` entry map the
+    requested sum names (plus ``'total'`` over all types and ``'count'``) to
+    base-currency amounts.
+    """
+
+    def __init__(self, names):
+        self.names = ('total', *names)
+        self.totals = self._empty()
+        self.categories = []  # [(Category, sums)] in category order
+        self.months = []  # [('YYYY-MM', sums)], oldest first
+
+    def _empty(self):
+        return dict(dict.fromkeys(self.names, Decimal(0)), count=0)
+
+def entity_report(condition, **sums):
+    """Aggregate the transactions matching ``condition`` in one grouped query.
+
+    ``sums`` maps result names to transaction type lists, as in
+    ``grouped_totals``. Uncategorized rows count towards the totals and the
+    months but not the category breakdown.
+    """
+    report = EntityReport(list(sums))
+    month = db.func.strftime('%Y-%m', Transaction.date)
+    query = db.session.query(
+        Transaction.category_id, month, Transaction.currency, db.func.count(Transaction.id),
+        *[sum_of_types(types) for types in (None, *sums.values())]
+    ).filter(condition).group_by(month, Transaction.category_id, Transaction.currency)
+    categories, months = {}, {}
+    for category_id, month_key, currency, count, *totals in query:
+        factor = rate_table.factor(currency, month_key)
+        entries = [report.totals, months.setdefault(month_key, report._empty())]
+        if category_id is not None:
+            entries.append(categories.setdefault(category_id, report._empty()))
+        for entry in entries:
+            entry['count'] += count
+            for name, total in zip(report.names, totals):
+                entry[name] += from_minor(total, currency) * factor
+    report.categories = [(category, categories[category.id])
+                         for category in reference_list(Category) if category.id in categories]
+    report.months = sorted((key, entry) for key, entry in months.items() if key is not None)
+    return report
@@ -0,0 +1,409 @@
+"""Versioned JSON API for scripts and quick-entry clients, loaded on the first API request.
+
+Lists take the same filters and keyset cursors as the pages plus ``fields=``
+to pick the returned keys. Batch endpoints apply up to API_BATCH_LIMIT
+operations with bulk statements in one database transaction: a single invalid
+operation rolls the whole batch back. Amounts are decimal strings, exact in
+the currency's scale. Referenced ids must exist, and a bank, card, person,
+place or category that rows still point at cannot be deleted.
+"""
+from bisect import bisect_left
+from datetime import date
+from operator import attrgetter
+
+from flask import abort, current_app, jsonify, request
+
+from .cache import reference_list
+from .constants import CURRENCIES, TRANSACTION_TYPES
+from .errors import ApiError
+from .extensions import db
+from .hooks import (TRANSACTION_FIELDS, TRANSACTION_ID_FIELDS, apply_transaction_changes, insert_transaction_rows,
+                    transaction_row)
+from .jobs import get_job_or_404, isoformat, job_record
+from .models import Bank, Card, Category, Job, Person, Place, Tag, Transaction, transaction_tags
+from .money import from_minor, to_minor
+from .pagination import items_per_page, paginate_transactions
+from .queries import filter_transactions
+
+API_PAGE_LIMIT = 500
+
+API_CURRENCIES = {code for codes in CURRENCIES.values() for code in codes}
+API_TRANSACTION_TYPES = {code for code, _label in TRANSACTION_TYPES}
+API_TRANSACTION_FIELDS = (
+    'id', 'amount', 'currency', 'transaction_type', 'description', 'date', 'time', 'category_id', 'card_id',
+    'bank_id', 'person_id', 'owner_id', 'place_id', 'from_bank_id', 'to_bank_id', 'tags', 'created_at'
+)
+API_TRANSACTION_INPUT = set(API_TRANSACTION_FIELDS) - {'id', 'created_at'}
+# Columns written by a batch; updates and deletes read their old values once
+TRANSACTION_WRITE_COLUMNS = TRANSACTION_FIELDS + ('description',)
+# Id fields of written records -> model of the row they point at (SQLite does not enforce the keys)
+API_REFERENCE_FIELDS = {
+    'category_id': Category, 'card_id': Card, 'bank_id': Bank, 'person_id': Person, 'owner_id': Person,
+    'place_id': Place, 'from_bank_id': Bank, 'to_bank_id': Bank,
+}
+
+# resource -> (model, writable fields)
+API_RESOURCES = {
+    'banks': (Bank, ('name', 'holder_name', 'iban', 'account_type', 'is_favorite')),
+    'cards': (Card, ('name', 'card_type', 'last_four', 'bank_id', 'is_favorite')),
+    'persons': (Person, ('name', 'phone', 'note', 'is_favorite')),
+    'places': (Place, ('name', 'address', 'category', 'is_favorite')),
+    'categories': (Category, ('name', 'icon', 'color')),
+    'tags': (Tag, ('name', 'color')),
+}
+
+def api_fields(available):
+    """Fields listed in ``?fields=``, or all of ``available``."""
+    if not request.args.get('fields'):
+        return available
+    fields = tuple(request.args['fields'].split(','))
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise ApiError('Bilinmeyen alan: ' + ', '.join(unknown))
+    return fields
+
+def api_operations():
+    """Operations of a batch request: ``{"operations": [...]}`` or a bare list."""
+    body = request.get_json(silent=True)
+    operations = body.get('operations') if isinstance(body, dict) else body
+    if not isinstance(operations, list):
+        raise ApiError('İstek gövdesi bir işlem listesi olmalı')
+    if len(operations) > current_app.config['API_BATCH_LIMIT']:
+        raise ApiError(f'Bir istekte en fazla {current_app.config["API_BATCH_LIMIT"]} işlem gönderilebilir')
+    return operations
+
+def api_object():
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        raise ApiError('İstek gövdesi bir JSON nesnesi olmalı')
+    return body
+
+def _operation(operation):
+    """``(op, id, data)`` of a batch item."""
+    if not isinstance(operation, dict) or operation.get('op') not in ('create', 'update', 'delete'):
+        raise ValueError("Her işlem 'op' alanı create, update veya delete olan bir nesne olmalı")
+    data = operation.get('data') or {}
+    if not isinstance(data, dict):
+        raise ValueError("'data' bir nesne olmalı")
+    if operation['op'] == 'create':
+        return 'create', None, data
+    if operation.get('id') is None:
+        raise ValueError("'id' alanı eksik")
+    return operation['op'], int(operation['id']), data
+
+# -------------------- transactions --------------------
+
+def transaction_values(data, current=None):
+    """Column values of a transaction created from API ``data``, or of ``current`` updated with it."""
+    unknown = set(data) - API_TRANSACTION_INPUT
+    if unknown:
+        raise ValueError('Bilinmeyen alan: ' + ', '.join(sorted(unknown)))
+    if current is None:
+        missing = [field for field in ('amount', 'currency', 'transaction_type') if data.get(field) in (None, '')]
+        if missing:
+            raise ValueError('Eksik alan: ' + ', '.join(missing))
+        current = dict.fromkeys(TRANSACTION_WRITE_COLUMNS)
+        del current['id']
+    values = dict(current)
+    currency = data.get('currency', values['currency'])
+    if currency not in API_CURRENCIES:
+        raise ValueError(f'Geçersiz para birimi: {currency}')
+    if 'amount' in data:
+        try:
+            values['amount_minor'] = to_minor(data['amount'], currency)
+        except ArithmeticError:
+            values['amount_minor'] = None
+        if values['amount_minor'] is None or isinstance(data['amount'], bool):
+            raise ValueError(f'Geçersiz tutar: {data["amount"]!r}')
+    elif currency != values['currency']:
+        values['amount_minor'] = to_minor(from_minor(values['amount_minor'], values['currency']), currency)
+    values['currency'] = currency
+    if 'transaction_type' in data:
+        if data['transaction_type'] not in API_TRANSACTION_TYPES:
+            raise ValueError(f'Geçersiz işlem türü: {data["transaction_type"]}')
+        values['transaction_type'] = data['transaction_type']
+    if 'date' in data or values['date'] is None:
+        values['date'] = date.fromisoformat(data['date']) if data.get('date') else date.today()
+    if 'time' in data:
+        values['time'] = (data['time'] or '')[:5] or None
+    if 'description' in data:
+        values['description'] = data['description']
+    for field in TRANSACTION_ID_FIELDS[1:]:
+        if field in data:
+            values[field] = reference_id(field, data[field])
+    return values
+
+def reference_id(field, value, model=None):
+    """``value`` as the id of an existing row for the id ``field``; None for an empty value."""
+    if value in (None, ''):
+        return None
+    id = int(value)
+    # The cached records are in id order
+    records = reference_list(model or API_REFERENCE_FIELDS[field])
+    position = bisect_left(records, id, key=attrgetter('id'))
+    if position == len(records) or records[position].id != id:
+        raise ValueError(f'Geçersiz {field}: {value}')
+    return id
+
+def _tag_ids(data):
+    if 'tags' not in data:
+        return None
+    if not isinstance(data['tags'], list):
+        raise ValueError("'tags' bir etiket id listesi olmalı")
+    # A tag is linked once, repeated ids would break the link table's primary key
+    return list(dict.fromkeys(reference_id('tags', tag_id, Tag) for tag_id in data['tags']))
+
+def transaction_tag_ids(ids):
+    """``{transaction id: [tag ids]}`` for ``ids`` in one query."""
+    tags = {}
+    if ids:
+        for transaction_id, tag_id in db.session.execute(
+            db.select(transaction_tags.c.transaction_id, transaction_tags.c.tag_id)
+            .where(transaction_tags.c.transaction_id.in_(ids))
+        ):
+            tags.setdefault(transaction_id, []).append(tag_id)
+    return tags
+
+def transaction_record(row, fields, tags=()):
+    record = {}
+    for field in fields:
+        if field == 'amount':
+            record[field] = str(from_minor(row.amount_minor, row.currency))
+        elif field == 'tags':
+            record[field] = list(tags)
+        elif field in ('date', 'created_at'):
+            record[field] = isoformat(getattr(row, field))
+        else:
+            record[field] = getattr(row, field)
+    return record
+
+def apply_transaction_operations(operations):
+    """Apply ``{"op": "create" | "update" | "delete", "id": ..., "data": {...}}`` items.
+
+    All items are validated first; then creates, updates and deletes each run
+    as one bulk statement and the write hooks see every change. Raises
+    ApiError for the first invalid item. Nothing is committed here.
+    Returns the transaction id of every item, in order.
+    """
+    table = Transaction.__table__
+    parsed = []
+    for index, operation in enumerate(operations):
+        try:
+            parsed.append(_operation(operation))
+        except (ValueError, TypeError) as error:
+            raise ApiError(str(error), index=index) from error
+    wanted = {id for _op, id, _data in parsed if id is not None}
+    original = {}
+    if wanted:
+        result = db.session.execute(
+            db.select(*[table.c[column] for column in TRANSACTION_WRITE_COLUMNS]).where(table.c.id.in_(wanted))
+        )
+        original = {row.id: dict(row._mapping) for row in result}
+    current = dict(original)
+
+    creates, create_tags, tag_sets, deleted, ids = [], {}, {}, set(), []
+    for index, (op, id, data) in enumerate(parsed):
+        if op != 'create' and (id not in current or id in deleted):
+            raise ApiError(f'İşlem bulunamadı: {id}', 404, index)
+        try:
+            if op == 'create':
+                creates.append((index, transaction_values(data)))
+            elif op == 'update':
+                current[id] = dict(transaction_values(data, current[id]), id=id)
+            else:
+                deleted.add(id)
+            tags = _tag_ids(data)
+            if tags is not None and op == 'create':
+                # Keyed by position until the insert returns the new id
+                create_tags[index] = tags
+            elif tags is not None:
+                tag_sets[id] = tags
+        except (ValueError, TypeError) as error:
+            raise ApiError(str(error), index=index) from error
+        ids.append(id)
+
+    if creates:
+        new_ids = insert_transaction_rows([values for _index, values in creates])
+        for (index, _values), id in zip(creates, new_ids):
+            ids[index] = id
+            if index in create_tags:
+                tag_sets[id] = create_tags[index]
+
+    updated = [id for id in current if current[id] is not original[id] and id not in deleted]
+    if updated:
+        columns = [column for column in TRANSACTION_WRITE_COLUMNS if column != 'id']
+        db.session.execute(
+            table.update().where(table.c.id == db.bindparam('row_id'))
+            .values({column: db.bindparam(f'new_{column}') for column in columns}),
+            [{'row_id': id, **{f'new_{column}': current[id][column] for column in columns}} for id in updated]
+        )
+    if deleted:
+        db.session.execute(transaction_tags.delete().where(transaction_tags.c.transaction_id.in_(deleted)))
+        db.session.execute(table.delete().where(table.c.id.in_(deleted)))
+    changes = []
+    for id in updated:
+        old_row, new_row = transaction_row(original[id]), transaction_row(current[id])
+        if old_row != new_row:
+            changes += [(-1, old_row), (1, new_row)]
+    changes += [(-1, transaction_row(original[id])) for id in deleted]
+    apply_transaction_changes(db.session.connection(), changes)
+
+    tag_sets = {id: tags for id, tags in tag_sets.items() if id not in deleted}
+    if tag_sets:
+        db.session.execute(transaction_tags.delete().where(transaction_tags.c.transaction_id.in_(list(tag_sets))))
+        links = [{'transaction_id': id, 'tag_id': tag_id} for id, tags in tag_sets.items() for tag_id in tags]
+        if links:
+            db.session.execute(transaction_tags.insert(), links)
+    return ids
+
+def _run_transaction_operations(operations):
+    ids = apply_transaction_operations(operations)
+    db.session.commit()
+    return ids
+
+def _transaction_response(id, status=200):
+    transaction = db.get_or_404(Transaction, id)
+    return jsonify({'data': transaction_record(transaction, API_TRANSACTION_FIELDS,
+                                               transaction_tag_ids([id]).get(id, ()))}), status
+
+def api_transactions():
+    fields = api_fields(API_TRANSACTION_FIELDS)
+    try:
+        limit = min(max(int(request.args.get('limit') or items_per_page()), 1),
+                    API_PAGE_LIMIT)
+        query, ranks = filter_transactions(Transaction.query, request.args)
+    except ValueError as error:
+        raise ApiError(str(error)) from error
+    page = paginate_transactions(query, request.args.get('cursor'), per_page=limit,
+                                 rank=ranks.c.rank if ranks is not None else None)
+    tags = transaction_tag_ids([t.id for t in page.items]) if 'tags' in fields else {}
+    return jsonify({
+        'data': [transaction_record(t, fields, tags.get(t.id, ())) for t in page.items],
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+    })
+
+def api_create_transaction():
+    id, = _run_transaction_operations([{'op': 'create', 'data': api_object()}])
+    return _transaction_response(id, 201)
+
+def api_transaction(id):
+    return _transaction_response(id)
+
+def api_update_transaction(id):
+    _run_transaction_operations([{'op': 'update', 'id': id, 'data': api_object()}])
+    return _transaction_response(id)
+
+def api_delete_transaction(id):
+    _run_transaction_operations([{'op': 'delete', 'id': id}])
+    return '', 204
+
+def api_transaction_batch():
+    return jsonify({'ids': _run_transaction_operations(api_operations())})
+
+# -------------------- reference records --------------------
+
+def api_resource(resource):
+    if resource not in API_RESOURCES:
+        abort(404)
+    return API_RESOURCES[resource]
+
+def reference_record(record, fields):
+    return {field: getattr(record, field) for field in fields}
+
+def apply_reference_operations(model, writable, operations):
+    """Batch counterpart of ``apply_transaction_operations`` for a reference model (ORM, one flush)."""
+    parsed = []
+    for index, operation in enumerate(operations):
+        try:
+            op, id, data = _operation(operation)
+            unknown = set(data) - set(writable)
+            if unknown:
+                raise ValueError('Bilinmeyen alan: ' + ', '.join(sorted(unknown)))
+            if op == 'create' and not data.get('name'):
+                raise ValueError('Eksik alan: name')
+            if 'is_favorite' in data:
+                data = dict(data, is_favorite=bool(data['is_favorite']))
+            data = {field: reference_id(field, value) if field in API_REFERENCE_FIELDS else value
+                    for field, value in data.items()}
+        except (ValueError, TypeError) as error:
+            raise ApiError(str(error), index=index) from error
+        parsed.append((op, id, data))
+    wanted = {id for _op, id, _data in parsed if id is not None}
+    objects = {obj.id: obj for obj in model.query.filter(model.id.in_(wanted))} if wanted else {}
+    in_use = _referenced_ids(model, {id for op, id, _data in parsed if op == 'delete'})
+    results = []
+    for index, (op, id, data) in enumerate(parsed):
+        if op == 'create':
+            obj = model(**data)
+            db.session.add(obj)
+        else:
+            obj = objects.pop(id, None) if op == 'delete' else objects.get(id)
+            if obj is None:
+                raise ApiError(f'Kayıt bulunamadı: {id}', 404, index)
+            if op == 'update':
+                for field, value in data.items():
+                    setattr(obj, field, value)
+            elif id in in_use:
+                # Deleting would leave transactions, budgets or cards pointing at nothing
+                raise ApiError(f'Kayıt kullanımda: {id}', 409, index)
+            else:
+                db.session.delete(obj)
+        results.append(obj)
+    db.session.flush()
+    return [obj.id for obj in results]
+
+def _referenced_ids(model, ids):
+    """Those of ``ids`` that rows of other tables point at; tag links go with the tag."""
+    used = set()
+    if not ids:
+        return used
+    for table in db.metadata.sorted_tables:
+        if table is transaction_tags:
+            continue
+        for key in table.foreign_keys:
+            if key.column.table is model.__table__:
+                used.update(db.session.execute(db.select(key.parent).where(key.parent.in_(ids)).distinct()).scalars())
+    return used
+
+def _run_reference_operations(resource, operations):
+    model, writable = api_resource(resource)
+    ids = apply_reference_operations(model, writable, operations)
+    db.session.commit()
+    return ids
+
+def _reference_response(resource, id, status=200):
+    model, writable = api_resource(resource)
+    return jsonify({'data': reference_record(db.get_or_404(model, id), ('id',) + writable)}), status
+
+def api_references(resource):
+    model, writable = api_resource(resource)
+    fields = api_fields(('id',) + writable)
+    return jsonify({'data': [reference_record(record, fields) for record in reference_list(model)]})
+
+def api_create_reference(resource):
+    id, = _run_reference_operations(resource, [{'op': 'create', 'data': api_object()}])
+    return _reference_response(resource, id, 201)
+
+def api_reference(resource, id):
+    return _reference_response(resource, id)
+
+def api_update_reference(resource, id):
+    _run_reference_operations(resource, [{'op': 'update', 'id': id, 'data': api_object()}])
+    return _reference_response(resource, id)
+
+def api_delete_reference(resource, id):
+    _run_reference_operations(resource, [{'op': 'delete', 'id': id}])
+    return '', 204
+
+def api_reference_batch(resource):
+    return jsonify({'ids': _run_reference_operations(resource, api_operations())})
+
+# -------------------- jobs --------------------
+
+def api_jobs():
+    jobs = Job.query.order_by(Job.created_at.desc()).limit(50).all()
+    return jsonify({'data': [job_record(job) for job in jobs]})
+
+def api_job(id):
+    return jsonify({'data': job_record(get_job_or_404(id))})
@@ -0,0 +1,401 @@
+"""Backup export and restore, and the other maintenance jobs of the settings page.
+
+Exports are streamed: reference lists are small and written at once, while
+transactions are read in ``EXPORT_BATCH_SIZE`` chunks with their tags fetched
+per chunk, so memory stays flat whatever the size of the history.
+"""
+import csv
+import io
+import json
+import os
+import uuid
+from datetime import date, datetime
+
+from flask import Response, current_app, flash, redirect, request, stream_with_context, url_for
+
+from .cache import reference_cache, settings_store
+from .extensions import db
+from .hooks import TRANSACTION_FIELDS, insert_transaction_rows
+from .jobs import isoformat, job_file, job_runner, job_started
+from .ledger import rebuild_ledger
+from .models import (BalanceSnapshot, Bank, Card, Category, Job, LedgerPosting, MonthlyRollup, Person, Place, Tag,
+                     Transaction, transaction_tags)
+from .money import from_minor, to_minor
+from .notifications import refresh_alerts
+from .rollup import rebuild_rollup
+from .schema import init_db
+from .search import rebuild_search_index
+from .statements import existing_fingerprints
+from .valuation import rate_table
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = {
+    'json': ('application/json', 'noralyzer_backup.json'),
+    'ndjson': ('application/x-ndjson', 'noralyzer_backup.ndjson'),
+    'csv': ('text/csv', 'noralyzer_backup.csv'),
+}
+TRANSACTION_EXPORT_FIELDS = [
+    'amount', 'currency', 'transaction_type', 'description', 'date', 'time', 'category', 'card', 'bank',
+    'person', 'owner', 'place', 'from_bank', 'to_bank', 'tags', 'fingerprint', 'created_at'
+]
+
+def export_reference_sections():
+    """Reference tables as ``{section: [records]}`` in backup order."""
+    banks = Bank.query.all()
+    bank_names = {b.id: b.name for b in banks}
+    return {
+        'banks': [{'name': b.name, 'holder_name': b.holder_name, 'iban': b.iban, 'account_type': b.account_type,
+                   'is_favorite': bool(b.is_favorite), 'statement_profile': b.statement_profile} for b in banks],
+        'cards': [{'name': c.name, 'card_type': c.card_type, 'last_four': c.last_four, 'bank': bank_names.get(c.bank_id),
+                   'is_favorite': bool(c.is_favorite)} for c in Card.query.all()],
+        'persons': [{'name': p.name, 'phone': p.phone, 'note': p.note, 'is_favorite': bool(p.is_favorite)}
+                    for p in Person.query.all()],
+        'places': [{'name': p.name, 'address': p.address, 'category': p.category, 'is_favorite': bool(p.is_favorite)}
+                   for p in Place.query.all()],
+        'categories': [{'name': c.name, 'icon': c.icon, 'color': c.color} for c in Category.query.all()],
+        'tags': [{'name': t.name, 'color': t.color} for t in Tag.query.all()],
+    }
+
+def iter_export_transactions(batch_size=EXPORT_BATCH_SIZE):
+    """Yield lists of transaction records, one list per batch, with names instead of ids."""
+    names = {
+        'category': dict(db.session.query(Category.id, Category.name)),
+        'card': dict(db.session.query(Card.id, Card.name)),
+        'bank': dict(db.session.query(Bank.id, Bank.name)),
+        'person': dict(db.session.query(Person.id, Person.name)),
+        'place': dict(db.session.query(Place.id, Place.name)),
+    }
+    result = db.session.execute(
+        db.select(*[Transaction.__table__.c[f] for f in TRANSACTION_FIELDS], Transaction.description, Transaction.fingerprint, Transaction.created_at)
+        .order_by(Transaction.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for batch in result.partitions():
+        tags = {}
+        tag_rows = db.session.execute(
+            db.select(transaction_tags.c.transaction_id, Tag.name)
+            .join(Tag, Tag.id == transaction_tags.c.tag_id)
+            .where(transaction_tags.c.transaction_id.in_([row.id for row in batch]))
+        )
+        for transaction_id, tag_name in tag_rows:
+            tags.setdefault(transaction_id, []).append(tag_name)
+        # Amounts are exact decimal strings; floats lose digits past 2**53 minor units
+        yield [{
+            'amount': f'{from_minor(row.amount_minor, row.currency):f}', 'currency': row.currency,
+            'transaction_type': row.transaction_type,
+            'description': row.description, 'date': isoformat(row.date), 'time': row.time,
+            'category': names['category'].get(row.category_id), 'card': names['card'].get(row.card_id),
+            'bank': names['bank'].get(row.bank_id), 'person': names['person'].get(row.person_id),
+            'owner': names['person'].get(row.owner_id), 'place': names['place'].get(row.place_id),
+            'from_bank': names['bank'].get(row.from_bank_id), 'to_bank': names['bank'].get(row.to_bank_id),
+            'tags': tags.get(row.id, []), 'fingerprint': row.fingerprint, 'created_at': isoformat(row.created_at),
+        } for row in batch]
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False)
+
+def generate_json_export():
+    yield '{\n"version": 2,\n'
+    for section, records in export_reference_sections().items():
+        yield f'"{section}": {_dumps(records)},\n'
+    yield '"transactions": ['
+    separator = '\n'
+    for batch in iter_export_transactions():
+        yield separator + ',\n'.join(_dumps(record) for record in batch)
+        separator = ',\n'
+    yield '\n]\n}\n'
+
+def generate_ndjson_export():
+    singular = {'banks': 'bank', 'cards': 'card', 'persons': 'person', 'places': 'place',
+                'categories': 'category', 'tags': 'tag'}
+    for section, records in export_reference_sections().items():
+        yield ''.join(_dumps({'kind': singular[section], **record}) + '\n' for record in records)
+    for batch in iter_export_transactions():
+        yield ''.join(_dumps({'kind': 'transaction', **record}) + '\n' for record in batch)
+
+def generate_csv_export():
+    """Transactions only; tags are joined with ``|``."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=TRANSACTION_EXPORT_FIELDS)
+    writer.writeheader()
+    for batch in iter_export_transactions():
+        for record in batch:
+            writer.writerow(dict(record, tags='|'.join(record['tags'])))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+EXPORT_GENERATORS = {'json': generate_json_export, 'ndjson': generate_ndjson_export, 'csv': generate_csv_export}
+
+def export_job(job, export_format):
+    mimetype, filename = EXPORT_FORMATS[export_format]
+    path = job_file(job, export_format)
+    with open(path, 'w', encoding='utf-8', newline='') as output:
+        for chunk in EXPORT_GENERATORS[export_format]():
+            output.write(chunk)
+    job.result_file, job.result_name, job.result_mimetype = path, filename, mimetype
+    return 'Yedek dosyası hazır.'
+
+def export_data():
+    """GET streams the backup in the response; POST writes it to a file in a background job."""
+    export_format = request.values.get('format', 'json')
+    if export_format not in EXPORT_FORMATS:
+        flash('Geçersiz dışa aktarma formatı!', 'danger')
+        return redirect(url_for('settings.settings') + '#backup')
+    if request.method == 'POST':
+        return job_started(job_runner.submit('export', export_job, export_format))
+    mimetype, filename = EXPORT_FORMATS[export_format]
+    return Response(
+        stream_with_context(EXPORT_GENERATORS[export_format]()),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment;filename={filename}'}
+    )
+
+# Restores read the upload incrementally (NDJSON/CSV line by line, JSON with a
+# small streaming parser), resolve names through dictionaries built once, and
+# insert transactions with executemany in ``IMPORT_BATCH_SIZE`` batches inside
+# a single database transaction.
+
+BACKUP_SECTIONS = {'banks': 'bank', 'cards': 'card', 'persons': 'person', 'places': 'place',
+                   'categories': 'category', 'tags': 'tag', 'transactions': 'transaction'}
+
+def iter_json_backup(stream, chunk_size=65536):
+    """Yield ``(kind, record)`` from a JSON backup without loading the whole document."""
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = '', 0, False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def peek():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer) or not fill():
+                return buffer[pos:pos + 1]
+
+    def expect(char):
+        nonlocal pos
+        if peek() != char:
+            raise ValueError(f'Geçersiz JSON: "{char}" bekleniyordu')
+        pos += 1
+
+    def value():
+        nonlocal pos
+        peek()
+        while True:
+            try:
+                result, end = decoder.raw_decode(buffer, pos)
+                # A value ending exactly at the buffer edge may be truncated (e.g. a number)
+                if end < len(buffer) or eof:
+                    pos = end
+                    return result
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            fill()
+
+    expect('{')
+    while peek() != '}':
+        key = value()
+        expect(':')
+        if key in BACKUP_SECTIONS and peek() == '[':
+            pos += 1
+            while peek() != ']':
+                yield BACKUP_SECTIONS[key], value()
+                if peek() == ',':
+                    pos += 1
+            pos += 1
+        else:
+            value()
+        if peek() == ',':
+            pos += 1
+
+def iter_ndjson_backup(stream):
+    for line in stream:
+        if line.strip():
+            record = json.loads(line)
+            yield record.pop('kind', 'transaction'), record
+
+def iter_csv_backup(stream):
+    for record in csv.DictReader(stream):
+        record['tags'] = [t for t in (record.get('tags') or '').split('|') if t]
+        yield 'transaction', {k: (v if v != '' else None) for k, v in record.items()}
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date() if isinstance(value, str) else value
+
+class BackupImporter:
+    """Restore backup records, buffering transactions into bulk inserts.
+
+    ``progress`` is called with the running counts after every batch.
+    Nothing is committed here; the caller commits once at the end.
+    """
+
+    REFERENCE_MODELS = {'bank': Bank, 'card': Card, 'person': Person, 'place': Place, 'category': Category, 'tag': Tag}
+
+    def __init__(self, batch_size=None, progress=None):
+        self.batch_size = batch_size or current_app.config['IMPORT_BATCH_SIZE']
+        self.progress = progress
+        self.ids = {kind: dict(db.session.query(model.name, model.id))
+                    for kind, model in self.REFERENCE_MODELS.items()}
+        self.pending = []
+        self.counts = {kind: 0 for kind in BACKUP_SECTIONS.values()}
+
+    def resolve(self, kind, name, fields=None):
+        """Return the id for ``name``, inserting the record when it does not exist yet."""
+        if not name:
+            return None
+        if name not in self.ids[kind]:
+            table = self.REFERENCE_MODELS[kind].__table__
+            values = {k: v for k, v in (fields or {}).items() if k in table.c and k != 'id' and v is not None}
+            values['name'] = name
+            self.ids[kind][name] = db.session.execute(
+                table.insert().values(**values).returning(table.c.id)
+            ).scalar_one()
+            self.counts[kind] += 1
+        return self.ids[kind][name]
+
+    def add(self, kind, record):
+        if kind == 'transaction':
+            self.add_transaction(record)
+        elif kind == 'card':
+            self.resolve('card', record.get('name'), dict(record, bank_id=self.resolve('bank', record.get('bank'))))
+        elif kind in self.REFERENCE_MODELS:
+            self.resolve(kind, record.get('name'), record)
+
+    def add_transaction(self, record):
+        row = {
+            'amount_minor': to_minor(record['amount'], record['currency']),
+            'currency': record['currency'],
+            'transaction_type': record['transaction_type'],
+            'description': record.get('description'),
+            'date': _parse_date(record.get('date')) or date.today(),
+            'time': record.get('time'),
+            'category_id': self.resolve('category', record.get('category')),
+            'card_id': self.resolve('card', record.get('card')),
+            'bank_id': self.resolve('bank', record.get('bank')),
+            'person_id': self.resolve('person', record.get('person')),
+            'owner_id': self.resolve('person', record.get('owner')),
+            'place_id': self.resolve('place', record.get('place')),
+            'from_bank_id': self.resolve('bank', record.get('from_bank')),
+            'to_bank_id': self.resolve('bank', record.get('to_bank')),
+            'fingerprint': record.get('fingerprint'),
+            'created_at': datetime.fromisoformat(record['created_at']) if record.get('created_at') else datetime.utcnow(),
+        }
+        tag_ids = list(dict.fromkeys(self.resolve('tag', name) for name in record.get('tags') or [] if name))
+        self.pending.append((row, tag_ids))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        # Statement lines restored earlier (or imported again) keep their single copy
+        known = existing_fingerprints([row['fingerprint'] for row, _tags in self.pending if row['fingerprint']])
+        pending = [(row, tag_ids) for row, tag_ids in self.pending if row['fingerprint'] not in known]
+        self.pending = []
+        if not pending:
+            return
+        ids = insert_transaction_rows([row for row, _tags in pending])
+        links = [{'transaction_id': id, 'tag_id': tag_id}
+                 for id, (_row, tag_ids) in zip(ids, pending) for tag_id in tag_ids]
+        if links:
+            db.session.execute(transaction_tags.insert(), links)
+        self.counts['transaction'] += len(ids)
+        if self.progress:
+            self.progress(dict(self.counts))
+
+    def run(self, records):
+        for kind, record in records:
+            self.add(kind, record)
+        self.flush()
+        return self.counts
+
+def open_backup(stream, filename):
+    """Pick a record reader for a backup from its file name; ``stream`` is binary."""
+    stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    filename = filename.lower()
+    if filename.endswith('.csv'):
+        return iter_csv_backup(stream)
+    if filename.endswith(('.ndjson', '.jsonl')):
+        return iter_ndjson_backup(stream)
+    return iter_json_backup(stream)
+
+def import_job(job, path, filename):
+    try:
+        with open(path, 'rb') as stream:
+            importer = BackupImporter(progress=lambda counts: job_runner.report(job.id, counts))
+            counts = importer.run(open_backup(stream, filename))
+        db.session.commit()
+    finally:
+        os.remove(path)
+    job_runner.report(job.id, counts)
+    return f'Veriler başarıyla içe aktarıldı! ({counts["transaction"]} işlem)'
+
+def import_data():
+    if 'file' not in request.files:
+        flash('Dosya seçilmedi!', 'danger')
+        return redirect(url_for('settings.settings'))
+    
+    file = request.files['file']
+    if file.filename == '':
+        flash('Dosya seçilmedi!', 'danger')
+        return redirect(url_for('settings.settings'))
+    
+    # The upload is only readable during the request, so the job reads a copy
+    path = os.path.join(current_app.config['JOB_FOLDER'], f'upload-{uuid.uuid4().hex}')
+    os.makedirs(current_app.config['JOB_FOLDER'], exist_ok=True)
+    file.save(path)
+    return job_started(job_runner.submit('import', import_job, path, file.filename))
+
+def delete_transactions_job(job):
+    LedgerPosting.query.delete()
+    BalanceSnapshot.query.delete()
+    db.session.execute(db.text('DELETE FROM transaction_search'))  # Leaves the per-row delete trigger nothing to do
+    Transaction.query.delete()
+    # After the rows, so the search triggers of the links find nothing to refresh; ids are reused
+    db.session.execute(transaction_tags.delete())
+    MonthlyRollup.query.delete()
+    refresh_alerts()
+    db.session.commit()
+    return 'Tüm işlemler silindi!'
+
+def delete_all_transactions():
+    return job_started(job_runner.submit('delete_transactions', delete_transactions_job))
+
+def reset_job(job):
+    # The job table survives so the running job can still record its result
+    tables = [table for table in db.metadata.sorted_tables if table is not Job.__table__]
+    db.session.remove()
+    db.metadata.drop_all(db.engine, tables=tables)
+    db.create_all()
+    reference_cache.invalidate()
+    settings_store.invalidate()
+    rate_table.invalidate()
+    init_db(current_app._get_current_object(), force=True)
+    return 'Veritabanı sıfırlandı!'
+
+def reset_database():
+    return job_started(job_runner.submit('reset', reset_job))
+
+def recompute_job(job):
+    """Rebuild every table derived from the transactions: rollup, ledger, search index and alert totals."""
+    rebuild_rollup()
+    rebuild_ledger()
+    rebuild_search_index(db.session.connection())
+    refresh_alerts()
+    db.session.commit()
+    return 'Özetler yeniden hesaplandı!'
+
+def recompute_data():
+    return job_started(job_runner.submit('recompute', recompute_job))
@@ -0,0 +1,128 @@
+"""Budget evaluation.
+
+A budget with a period is measured over its current window: the week or
+month containing today, anchored on the budget's start date (Monday and the
+1st by default) and clipped to its start and end dates. A budget without a
+period covers its whole date range. Only expense types count, and a budget
+without a category covers every category.
+
+All budgets are evaluated from one grouped query of daily expense totals per
+category and currency over the union of their windows. The rows are kept
+in process until the transaction change counter moves, so every worker
+sees a write at its next evaluation and pages showing budgets share the
+request's counter lookup in between.
+"""
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+
+from .changes import change_versions
+from .constants import EXPENSE_TYPES
+from .extensions import app_state, db
+from .models import Transaction
+from .money import from_minor
+from .recurring import add_months
+from .valuation import rate_table
+
+PERIODS = [
+    ('monthly', 'Aylık'),
+    ('weekly', 'Haftalık'),
+]
+
+# A Monday, the anchor of weekly budgets without a start date
+WEEK_ANCHOR = date(2024, 1, 1)
+
+def budget_window(budget, today=None):
+    """``(start, end)`` dates of the budget's current window; either may be None (unbounded)."""
+    today = today or date.today()
+    if budget.end_date and today > budget.end_date:
+        today = budget.end_date
+    if budget.start_date and today < budget.start_date:
+        today = budget.start_date
+    if budget.period == 'weekly':
+        start = today - timedelta(days=(today - (budget.start_date or WEEK_ANCHOR)).days % 7)
+        end = start + timedelta(days=6)
+    elif budget.period == 'monthly':
+        day_of_month = budget.start_date.day if budget.start_date else 1
+        start = add_months(today.replace(day=1), 0, day_of_month)
+        if start > today:
+            start = add_months(today.replace(day=1), -1, day_of_month)
+        end = add_months(start.replace(day=1), 1, day_of_month) - timedelta(days=1)
+    else:
+        return budget.start_date, budget.end_date
+    if budget.start_date:
+        start = max(start, budget.start_date)
+    if budget.end_date:
+        end = min(end, budget.end_date)
+    return start, end
+
+class BudgetSpending:
+    """Daily expense totals per category and currency, cached per date range and change counter."""
+
+    def __init__(self):
+        self._entry = None
+        self._lock = threading.Lock()
+
+    def rows(self, start, end, categories):
+        """``[(category_id, date, currency, minor total)]`` of expenses in [start, end].
+
+        ``categories`` limits the rows to a set of category ids (None for all).
+        """
+        key = (start, end, categories, change_versions('transaction'))
+        entry = self._entry
+        if entry and entry[0] == key:
+            return entry[1]
+        query = db.select(
+            Transaction.category_id, Transaction.date, Transaction.currency, db.func.sum(Transaction.amount_minor)
+        ).where(Transaction.transaction_type.in_(EXPENSE_TYPES), Transaction.date.is_not(None))
+        if categories is not None:
+            query = query.where(Transaction.category_id.in_(categories))
+        if start:
+            query = query.where(Transaction.date >= start)
+        if end:
+            query = query.where(Transaction.date <= end)
+        rows = db.session.execute(
+            query.group_by(Transaction.category_id, Transaction.date, Transaction.currency)
+        ).all()
+        with self._lock:
+            self._entry = (key, rows)
+        return rows
+
+    def invalidate(self):
+        with self._lock:
+            self._entry = None
+
+budget_spending = app_state('budget_spending')
+
+def budget_stats(budgets, today=None):
+    """``[{'budget', 'start', 'end', 'spent', 'remaining', 'percentage'}]`` for ``budgets``, in order.
+
+    ``spent`` is in the base currency; ``percentage`` is not capped at 100.
+    """
+    if not budgets:
+        return []
+    windows = [budget_window(budget, today) for budget in budgets]
+    starts, ends = [start for start, _end in windows], [end for _start, end in windows]
+    start = None if None in starts else min(starts)
+    end = None if None in ends else max(ends)
+    categories = {budget.category_id for budget in budgets}
+    categories = None if None in categories else tuple(sorted(categories))
+    spent = [Decimal(0)] * len(budgets)
+    for category_id, day, currency, total in budget_spending.rows(start, end, categories):
+        value = None
+        for index, (budget, (window_start, window_end)) in enumerate(zip(budgets, windows)):
+            if budget.category_id not in (None, category_id):
+                continue
+            if (window_start and day < window_start) or (window_end and day > window_end):
+                continue
+            if value is None:
+                value = from_minor(total, currency) * rate_table.factor(currency, f'{day:%Y-%m}')
+            spent[index] += value
+    stats = []
+    for budget, (window_start, window_end), amount in zip(budgets, windows, spent):
+        stats.append({
+            'budget': budget, 'start': window_start, 'end': window_end, 'spent': amount,
+            'remaining': budget.amount - amount,
+            'percentage': (amount / budget.amount * 100) if budget.amount > 0 else 0,
+        })
+    return stats
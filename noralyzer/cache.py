@@ -0,0 +1,156 @@
+"""In-process caches of reference records and settings.
+
+Categories, banks, cards, persons, places, tags and quick transactions fill
+the select boxes of nearly every form, and notifications are shown on every
+page. They are cached across requests as read-only records, dropped when a
+commit touches their table and reloaded when the table's change counter has
+moved (a write by another worker process).
+"""
+import threading
+from types import SimpleNamespace
+
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .changes import change_versions
+from .extensions import app_state, db
+from .models import Bank, Card, Category, Notification, Person, Place, QuickTransaction, Setting, Tag
+
+REFERENCE_MODELS = (Category, Bank, Card, Person, Place, Tag, QuickTransaction, Notification)
+
+class ReferenceCache:
+    """Per-model lists of ``SimpleNamespace`` copies of the rows, in id order."""
+
+    # Cached cards carry their bank record, so a bank change drops the cards too
+    DEPENDENTS = {'Bank': ('Card',)}
+
+    def __init__(self, models):
+        self.models = {model.__name__: model for model in models}
+        self.tables = {model.__table__.name: model.__name__ for model in models}
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def all(self, model):
+        name = model.__name__
+        version = change_versions(*self._tables_of(name))
+        entry = self._entries.get(name)
+        if entry and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        records = self._load(model)
+        with self._lock:
+            self._entries[name] = (version, records)
+        return records
+
+    def _tables_of(self, name):
+        """Tables a cached model's records are built from."""
+        sources = [name] + [source for source, dependents in self.DEPENDENTS.items() if name in dependents]
+        return [self.models[source].__table__.name for source in sources]
+
+    def _load(self, model):
+        columns = [column.name for column in model.__table__.columns]
+        rows = db.session.execute(db.select(*model.__table__.columns).order_by(model.id)).all()
+        records = [SimpleNamespace(**dict(zip(columns, row))) for row in rows]
+        if model is Card:
+            banks = {bank.id: bank for bank in self.all(Bank)}
+            for card in records:
+                card.bank = banks.get(card.bank_id)
+        return records
+
+    def invalidate(self, *names):
+        """Drop the given models (all of them when called without arguments)."""
+        names = set(names or self.models)
+        for name in list(names):
+            names.update(self.DEPENDENTS.get(name, ()))
+        with self._lock:
+            for name in names:
+                self._entries.pop(name, None)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'cached': sorted(self._entries)}
+
+reference_cache = app_state('reference_cache')
+
+def reference_list(model, favorites_first=False):
+    """Cached rows of a reference model; optionally favorites first, then by name."""
+    records = reference_cache.all(model)
+    if favorites_first:
+        return sorted(records, key=lambda record: (not record.is_favorite, record.name))
+    return records
+
+def _changed_references(session):
+    return session.info.setdefault('changed_references', set())
+
+@event.listens_for(Session, 'after_flush')
+def _collect_reference_changes(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if type(obj).__name__ in reference_cache.models:
+            _changed_references(session).add(type(obj).__name__)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_reference_statements(orm_execute_state):
+    # Bulk writes (Model.query.delete(), table.insert() in the importers) skip the flush
+    table = getattr(orm_execute_state.statement, 'table', None)
+    if not orm_execute_state.is_select and table is not None and table.name in reference_cache.tables:
+        _changed_references(orm_execute_state.session).add(reference_cache.tables[table.name])
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_reference_cache(session):
+    changed = session.info.pop('changed_references', None)
+    if changed:
+        reference_cache.invalidate(*changed)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_reference_changes(session):
+    session.info.pop('changed_references', None)
+
+class SettingsStore:
+    """``Setting`` rows as an in-process dict, loaded on first use and reloaded when the setting counter moves."""
+
+    def __init__(self):
+        self._entry = None
+        self._lock = threading.Lock()
+
+    def all(self):
+        version = change_versions('setting')
+        entry = self._entry
+        if entry is None or entry[0] != version:
+            entry = (version, dict(db.session.query(Setting.key, Setting.value)))
+            with self._lock:
+                self._entry = entry
+        return entry[1]
+
+    def get(self, key, default=None):
+        return self.all().get(key) or default
+
+    def get_int(self, key, default=0):
+        try:
+            return int(self.get(key, default))
+        except ValueError:
+            return default
+
+    def get_bool(self, key, default=False):
+        value = self.get(key)
+        return default if value is None else value == 'true'
+
+    def get_list(self, key, default=()):
+        value = self.get(key)
+        return value.split(',') if value else list(default)
+
+    def update(self, values):
+        """Upsert several settings with one statement and one commit."""
+        statement = sqlite_insert(Setting).values([{'key': k, 'value': v} for k, v in values.items()])
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=[Setting.key], set_={'value': statement.excluded.value}
+        ))
+        db.session.commit()
+
+    def invalidate(self):
+        with self._lock:
+            self._entry = None
+
+settings_store = app_state('settings_store')
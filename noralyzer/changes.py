@@ -0,0 +1,95 @@
+"""Change counters of the tables behind cached responses.
+
+SQLite triggers count every insert, update and delete on the tracked tables,
+ORM or bulk, inside the writing transaction, so all processes sharing the
+database see the same counters. Responses computed from those tables carry
+an ETag and Last-Modified derived from them and are answered with 304 Not
+Modified while nothing has been written since, and the in-process caches
+(settings, reference lists, rates, budget spending) compare their entries
+with them to notice writes made by other worker processes.
+"""
+import hashlib
+import json
+
+from flask import Response, g, has_app_context, jsonify, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from werkzeug.http import is_resource_modified
+
+from .extensions import db
+from .models import ChangeCounter
+
+# Tables behind the cached report responses
+REPORT_TABLES = ('transaction', 'currency_rate', 'category', 'person')
+CHANGE_TABLES = REPORT_TABLES + ('setting', 'bank', 'card', 'place', 'tag', 'quick_transaction', 'notification')
+
+def _bump(table):
+    return (f"INSERT INTO change_counter (name, version, changed_at) VALUES ('{table}', 1, CURRENT_TIMESTAMP) "
+            'ON CONFLICT (name) DO UPDATE SET version = version + 1, changed_at = excluded.changed_at;')
+
+CHANGE_TRIGGERS = {
+    f'{table}_change_{suffix}': (f'AFTER {operation} ON "{table}"', _bump(table))
+    for table in CHANGE_TABLES for suffix, operation in (('ai', 'INSERT'), ('au', 'UPDATE'), ('ad', 'DELETE'))
+}
+
+def create_change_triggers(connection):
+    """Create the missing counter triggers; returns True if any was created."""
+    existing = {name for name, in connection.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%_change_%'")}
+    missing = [name for name in CHANGE_TRIGGERS if name not in existing]
+    for name in missing:
+        event_clause, body = CHANGE_TRIGGERS[name]
+        connection.exec_driver_sql(f'CREATE TRIGGER {name} {event_clause} BEGIN {body} END')
+    return bool(missing)
+
+def change_versions(*tables):
+    """``(version, changed_at)`` of each table's counter, None for a table never written.
+
+    All counters are read with one query at most once per request (and again
+    after a commit), however many caches are checked.
+    """
+    versions = g.get('change_versions')
+    if versions is None:
+        rows = db.session.execute(db.select(ChangeCounter.name, ChangeCounter.version, ChangeCounter.changed_at))
+        versions = g.change_versions = {name: (version, changed_at) for name, version, changed_at in rows}
+    return tuple(versions.get(table) for table in tables)
+
+def forget_change_versions():
+    g.pop('change_versions', None)
+
+@event.listens_for(Session, 'after_commit')
+def _forget_committed_versions(session):
+    if has_app_context():
+        forget_change_versions()
+
+def change_validators(tables, key=()):
+    """``(etag, last_modified)`` of a response computed from ``tables`` with the request parameters ``key``.
+
+    The counters' timestamps are part of the tag, so counters starting over
+    after a database reset do not repeat an earlier tag.
+    """
+    counters = db.session.query(ChangeCounter.name, ChangeCounter.version, ChangeCounter.changed_at).filter(
+        ChangeCounter.name.in_(tables)).order_by(ChangeCounter.name).all()
+    state = [list(key), [[name, version, str(changed_at)] for name, version, changed_at in counters]]
+    etag = hashlib.sha256(json.dumps(state, default=str).encode()).hexdigest()[:20]
+    last_modified = max((changed_at for _name, _version, changed_at in counters if changed_at), default=None)
+    return etag, last_modified
+
+def conditional_json(compute, tables=REPORT_TABLES, key=()):
+    """JSON response of ``compute()``, or 304 when the client's copy is still current.
+
+    ``compute`` only runs when the counters of ``tables`` (or ``key``) have
+    changed since the client's copy was made.
+    """
+    etag, last_modified = change_validators(tables, key)
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = Response(status=304)
+    else:
+        response = jsonify(compute())
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Cached copies are revalidated on every use
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
@@ -0,0 +1,28 @@
+import os
+
+
+class Config:
+    """Defaults for ``create_app``; a mapping passed to it overrides any of them."""
+
+    SECRET_KEY = 'noralyzer-secret-key-2024'
+    SQLALCHEMY_DATABASE_URI = os.environ.get('NORALYZER_DATABASE_URI', 'sqlite:///noralyzer.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Applied to every new SQLite connection, in order. WAL lets pages read while an
+    # import or a job writes; with WAL, synchronous=NORMAL may lose the last commits
+    # on power loss but never corrupts the file.
+    SQLITE_PRAGMAS = {
+        'busy_timeout': 10000,
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -32000,  # KiB
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+    }
+    # Rows per executemany in backup, statement and rate imports
+    IMPORT_BATCH_SIZE = 5000
+    # Operations accepted by one API batch request
+    API_BATCH_LIMIT = 5000
+    # Background jobs: worker threads, result files (default: instance/jobs) and retention
+    JOB_WORKERS = 1
+    JOB_FOLDER = None
+    JOB_RETENTION_DAYS = 7
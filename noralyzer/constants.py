@@ -0,0 +1,46 @@
+CURRENCIES = {
+    'fiat': ['TRY', 'USD', 'EUR', 'CAD'],
+    'crypto': ['BTC', 'DOGE'],
+    'gold': ['GOLD_FULL', 'GOLD_GRAM', 'GOLD_QUARTER'],
+    'cash': ['CASH_TRY', 'CASH_USD', 'CASH_EUR']
+}
+
+CURRENCY_NAMES = {
+    'TRY': 'Türk Lirası', 'USD': 'Amerikan Doları', 'EUR': 'Euro', 'CAD': 'Kanada Doları',
+    'BTC': 'Bitcoin', 'DOGE': 'Dogecoin',
+    'GOLD_FULL': 'Tam Altın', 'GOLD_GRAM': 'Gram Altın', 'GOLD_QUARTER': 'Çeyrek Altın',
+    'CASH_TRY': 'Nakit TL', 'CASH_USD': 'Nakit USD', 'CASH_EUR': 'Nakit EUR'
+}
+
+TRANSACTION_TYPES = [
+    ('atm_withdraw', 'ATM Para Çekme'),
+    ('bank_deposit', 'Bankaya Para Yatırma'),
+    ('card_load', 'Karta Para Yükleme'),
+    ('cash_in', 'Nakit Giriş'),
+    ('cash_out', 'Nakit Çıkış'),
+    ('transfer', 'Transfer'),
+    ('crypto_buy', 'Kripto Alış'),
+    ('crypto_sell', 'Kripto Satış'),
+    ('crypto_convert', 'Kripto Çevrim'),
+    ('gold_buy', 'Altın Alış'),
+    ('gold_sell', 'Altın Satış'),
+    ('expense', 'Harcama'),
+    ('income', 'Gelir')
+]
+
+CURRENCY_SYMBOLS = {
+    'TRY': '₺', 'USD': '$', 'EUR': '€', 'CAD': 'C$',
+    'BTC': '₿', 'DOGE': 'Ð',
+    'GOLD_FULL': 'Tam', 'GOLD_GRAM': 'Gr', 'GOLD_QUARTER': 'Çyr',
+    'CASH_TRY': '₺', 'CASH_USD': '$', 'CASH_EUR': '€'
+}
+
+# TRY value of one unit, used for currencies that have no loaded rates yet
+STUB_RATES = {
+    'TRY': 1.0, 'USD': 34.0, 'EUR': 37.0, 'CAD': 25.0,
+    'BTC': 2300000.0, 'DOGE': 4.5,
+    'GOLD_FULL': 19000.0, 'GOLD_GRAM': 2900.0, 'GOLD_QUARTER': 4750.0,
+}
+
+INCOME_TYPES = ['income', 'cash_in', 'bank_deposit']
+EXPENSE_TYPES = ['expense', 'cash_out', 'atm_withdraw']
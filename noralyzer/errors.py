@@ -0,0 +1,24 @@
+"""API errors and their JSON responses; the handlers are registered by ``create_app``."""
+from flask import jsonify, request
+
+from .extensions import db
+
+class ApiError(ValueError):
+    """An invalid API request; ``index`` is the position of the offending batch operation."""
+
+    def __init__(self, message, status=400, index=None):
+        super().__init__(message)
+        self.status = status
+        self.index = index
+
+def api_error(message, status=400, **extra):
+    return jsonify({'error': message, **extra}), status
+
+def handle_api_error(error):
+    db.session.rollback()
+    return api_error(str(error), error.status, index=error.index)
+
+def handle_not_found(error):
+    if request.path.startswith('/api/'):
+        return api_error('Kayıt bulunamadı', 404)
+    return error
@@ -0,0 +1,13 @@
+from flask import current_app
+from flask_sqlalchemy import SQLAlchemy
+from werkzeug.local import LocalProxy
+
+db = SQLAlchemy()
+
+def app_state(name):
+    """Proxy to one of the current application's in-process objects (caches, job runner).
+
+    Each application made by ``create_app`` keeps its own, so separate
+    instances (tests, several databases) never share cached rows.
+    """
+    return LocalProxy(lambda: getattr(current_app.extensions['noralyzer'], name))
@@ -0,0 +1,94 @@
+"""Transaction write hooks.
+
+Derived tables (rollups, ledgers, ...) are kept in sync from a single place:
+every flush that inserts, updates or deletes a Transaction is turned into a
+list of (sign, row) changes and handed to the registered hooks, which run on
+the flush's own connection so they commit or roll back with the write.
+"""
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .extensions import db
+from .models import Transaction
+
+TRANSACTION_FIELDS = (
+    'id', 'amount_minor', 'currency', 'transaction_type', 'date', 'time', 'category_id', 'card_id',
+    'bank_id', 'person_id', 'place_id', 'from_bank_id', 'to_bank_id', 'owner_id'
+)
+TRANSACTION_ID_FIELDS = (
+    'id', 'category_id', 'card_id', 'bank_id', 'person_id', 'place_id', 'from_bank_id', 'to_bank_id', 'owner_id'
+)
+
+_transaction_write_hooks = []
+
+def on_transaction_write(func):
+    """Register ``func(connection, changes)`` to run for every batch of transaction changes."""
+    _transaction_write_hooks.append(func)
+    return func
+
+def transaction_row(values):
+    """Normalize a mapping of Transaction column values into a comparable row dict."""
+    row = {field: values.get(field) for field in TRANSACTION_FIELDS}
+    for field in TRANSACTION_ID_FIELDS:
+        if row[field] not in (None, ''):
+            row[field] = int(row[field])
+        else:
+            row[field] = None
+    if isinstance(row['date'], str):
+        row['date'] = datetime.strptime(row['date'], '%Y-%m-%d').date()
+    row['amount_minor'] = int(row['amount_minor'] or 0)
+    return row
+
+def apply_transaction_changes(connection, changes):
+    """Feed ``(sign, row)`` changes to every hook; bulk writers call this directly."""
+    if not changes:
+        return
+    for hook in _transaction_write_hooks:
+        hook(connection, changes)
+
+def _transaction_values(obj):
+    return {field: getattr(obj, field) for field in TRANSACTION_FIELDS}
+
+@event.listens_for(Session, 'before_flush')
+def _capture_transaction_rows(session, flush_context, instances):
+    # Old values are read from the database before the flush overwrites them
+    ids = [obj.id for obj in list(session.dirty) + list(session.deleted)
+           if isinstance(obj, Transaction) and obj.id is not None]
+    old_rows = {}
+    if ids:
+        table = Transaction.__table__
+        result = session.connection().execute(
+            db.select(*[table.c[f] for f in TRANSACTION_FIELDS]).where(table.c.id.in_(ids))
+        )
+        old_rows = {row.id: transaction_row(row._mapping) for row in result}
+    session.info['transaction_old_rows'] = old_rows
+
+@event.listens_for(Session, 'after_flush')
+def _publish_transaction_changes(session, flush_context):
+    old_rows = session.info.pop('transaction_old_rows', {})
+    changes = []
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            changes.append((1, transaction_row(_transaction_values(obj))))
+    for obj in session.dirty:
+        if isinstance(obj, Transaction) and obj.id in old_rows:
+            new_row = transaction_row(_transaction_values(obj))
+            if new_row != old_rows[obj.id]:
+                changes.append((-1, old_rows[obj.id]))
+                changes.append((1, new_row))
+    for obj in session.deleted:
+        if isinstance(obj, Transaction) and obj.id in old_rows:
+            changes.append((-1, old_rows[obj.id]))
+    apply_transaction_changes(session.connection(), changes)
+
+def insert_transaction_rows(rows):
+    """Bulk insert transaction rows and feed them to the write hooks; returns the new ids."""
+    table = Transaction.__table__
+    ids = db.session.execute(
+        table.insert().returning(table.c.id, sort_by_parameter_order=True), rows
+    ).scalars().all()
+    apply_transaction_changes(db.session.connection(),
+                              [(1, transaction_row(dict(row, id=id))) for id, row in zip(ids, rows)])
+    return ids
@@ -0,0 +1,175 @@
+"""Background jobs.
+
+Imports, exports, resets and recomputes run on a small in-process thread pool
+so the request returns at once with a job id. One worker by default: SQLite
+has a single writer and queued jobs then run one after another. Progress is
+kept in memory while a job runs and stored on its row when it ends.
+"""
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from flask import abort, current_app, jsonify, redirect, request, url_for
+
+from .extensions import app_state, db
+from .models import Job
+
+JOB_KINDS = {
+    'import': 'Yedek geri yükleme',
+    'export': 'Dışa aktarma',
+    'delete_transactions': 'Tüm işlemleri silme',
+    'reset': 'Veritabanını sıfırlama',
+    'recompute': 'Özetleri yeniden hesaplama',
+}
+JOB_FIELDS = ('id', 'kind', 'status', 'message', 'progress', 'download_url', 'created_at', 'started_at', 'finished_at')
+
+class JobRunner:
+    """Submit functions as ``Job`` rows and run them off the request thread.
+
+    A job function is called as ``func(job, *args)`` inside an application
+    context; it may call ``report(job.id, counts)`` and returns the message
+    shown when the job is done. Exceptions mark the job as failed.
+
+    Unfinished jobs are also kept as ``SimpleNamespace`` copies, so polling a
+    job does not have to wait for the database lock its own import holds.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.started = datetime.utcnow()
+        self._executor = None
+        self._active = {}
+        self._progress = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, func, *args):
+        self.purge()
+        job = Job(id=uuid.uuid4().hex, kind=kind, status='queued', created_at=datetime.utcnow())
+        db.session.add(job)
+        db.session.commit()
+        self._track(job)
+        with self._lock:
+            if self._executor is None:
+                # Created on first use so the reloader's parent process never starts threads
+                self._executor = ThreadPoolExecutor(max_workers=self.app.config['JOB_WORKERS'],
+                                                    thread_name_prefix='noralyzer-job')
+        self._executor.submit(self._run, job.id, func, args)
+        return job
+
+    def _track(self, job):
+        copy = SimpleNamespace(**{column.name: getattr(job, column.name) for column in Job.__table__.columns})
+        copy.finished = False
+        with self._lock:
+            self._active[job.id] = copy
+
+    def get(self, job_id):
+        """The job with ``job_id``: the in-memory copy while it is unfinished, else its row (or None)."""
+        with self._lock:
+            job = self._active.get(job_id)
+        return job or db.session.get(Job, job_id)
+
+    def report(self, job_id, progress):
+        with self._lock:
+            self._progress[job_id] = progress
+
+    def progress(self, job):
+        """Latest progress of ``job``: live while it runs, stored once it has ended."""
+        with self._lock:
+            if job.id in self._progress:
+                return self._progress[job.id]
+        return json.loads(job.progress) if job.progress else None
+
+    def _run(self, job_id, func, args):
+        with self.app.app_context():
+            job = db.session.get(Job, job_id)
+            job.status, job.started_at = 'running', datetime.utcnow()
+            db.session.commit()
+            self._track(job)
+            try:
+                message, status = func(job, *args), 'done'
+            except Exception as e:
+                db.session.rollback()
+                self.app.logger.exception('Job %s (%s) failed', job_id, job.kind)
+                message, status = f'Hata: {e}', 'failed'
+            try:
+                job = db.session.get(Job, job_id)
+                progress = self._progress.get(job_id)
+                job.status, job.message, job.finished_at = status, message, datetime.utcnow()
+                job.progress = json.dumps(progress) if progress is not None else None
+                db.session.commit()
+            finally:
+                with self._lock:
+                    self._active.pop(job_id, None)
+                    self._progress.pop(job_id, None)
+                db.session.remove()
+
+    def fail_interrupted(self):
+        """Mark jobs left unfinished by an earlier process as failed; the caller commits."""
+        Job.query.filter(Job.status.in_(('queued', 'running')), Job.created_at < self.started).update(
+            {'status': 'failed', 'message': 'Uygulama yeniden başlatıldığı için iş yarıda kaldı.',
+             'finished_at': datetime.utcnow()})
+
+    def purge(self):
+        """Delete finished jobs older than ``JOB_RETENTION_DAYS`` together with their files."""
+        cutoff = datetime.utcnow() - timedelta(days=self.app.config['JOB_RETENTION_DAYS'])
+        old = Job.query.filter(Job.status.in_(('done', 'failed')), Job.created_at < cutoff).all()
+        for job in old:
+            if job.result_file and os.path.exists(job.result_file):
+                os.remove(job.result_file)
+            db.session.delete(job)
+        if old:
+            db.session.commit()
+
+    def wait(self):
+        """Block until every submitted job has finished (used by scripts and the CLI)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True)
+
+job_runner = app_state('job_runner')
+
+def fail_interrupted_jobs(app):
+    """Fail the jobs an earlier server left unfinished.
+
+    Called once per server start by the process that starts it (the
+    gunicorn master, ``python wsgi.py``): a worker doing it would also fail
+    the jobs the other workers are running.
+    """
+    with app.app_context():
+        app.extensions['noralyzer'].job_runner.fail_interrupted()
+        db.session.commit()
+
+def isoformat(value):
+    return value.isoformat() if value else None
+
+def job_file(job, extension):
+    os.makedirs(current_app.config['JOB_FOLDER'], exist_ok=True)
+    return os.path.join(current_app.config['JOB_FOLDER'], f'{job.id}.{extension}')
+
+def job_record(job):
+    return {
+        'id': job.id, 'kind': job.kind, 'status': job.status, 'message': job.message,
+        'progress': job_runner.progress(job),
+        'download_url': url_for('settings.download_job', id=job.id) if job.status == 'done' and job.result_file else None,
+        'created_at': isoformat(job.created_at), 'started_at': isoformat(job.started_at),
+        'finished_at': isoformat(job.finished_at),
+    }
+
+def job_started(job):
+    """Response for a route that started ``job``: 202 JSON for API clients, else the job page."""
+    if request.accept_mimetypes.best == 'application/json':
+        response = jsonify({'data': job_record(job)})
+        response.headers['Location'] = url_for('api.api_job', id=job.id)
+        return response, 202
+    return redirect(url_for('settings.job_status', id=job.id))
+
+def get_job_or_404(id):
+    job = job_runner.get(id)
+    if job is None:
+        abort(404)
+    return job
@@ -0,0 +1,187 @@
+"""Account ledger and month-end balance checkpoints.
+
+Every transaction is posted as signed legs on the accounts it moves money
+between. Month-end BalanceSnapshot rows act as checkpoints: a balance as of
+any day is the latest snapshot before it plus the postings after it.
+"""
+from datetime import date, timedelta
+
+from flask import current_app
+
+from .constants import CURRENCIES
+from .extensions import db
+from .hooks import TRANSACTION_FIELDS, on_transaction_write, transaction_row
+from .models import BalanceSnapshot, LedgerPosting, Transaction
+from .money import from_minor
+from .rollup import next_month
+
+REBUILD_BATCH_SIZE = 1000
+
+def wallet_account(currency):
+    """Account holding money that is not in a bank or on a card."""
+    if currency in CURRENCIES['crypto']:
+        return 'crypto'
+    if currency in CURRENCIES['gold']:
+        return 'gold'
+    return 'cash'
+
+def ledger_postings(row):
+    """Signed ``(account, currency, minor units)`` legs of a transaction row."""
+    currency = row['currency']
+    if currency.startswith('CASH_'):
+        currency = currency[len('CASH_'):]
+    amount = row['amount_minor']
+    wallet = wallet_account(currency)
+    bank = f"bank:{row['bank_id']}" if row['bank_id'] else None
+    card = f"card:{row['card_id']}" if row['card_id'] else None
+    legs = {
+        'income': [(bank or card or wallet, amount)],
+        'expense': [(card or bank or wallet, -amount)],
+        'cash_in': [(wallet, amount)],
+        'cash_out': [(wallet, -amount)],
+        'atm_withdraw': [(card or bank, -amount), (wallet, amount)],
+        'bank_deposit': [(wallet, -amount), (bank or card, amount)],
+        'card_load': [(bank or wallet, -amount), (card, amount)],
+        'transfer': [(f"bank:{row['from_bank_id']}" if row['from_bank_id'] else bank, -amount),
+                     (f"bank:{row['to_bank_id']}" if row['to_bank_id'] else None, amount)],
+        'crypto_buy': [(wallet, amount)],
+        'crypto_sell': [(wallet, -amount)],
+        'gold_buy': [(wallet, amount)],
+        'gold_sell': [(wallet, -amount)],
+    }.get(row['transaction_type'], [])
+    return [(account, currency, value) for account, value in legs if account]
+
+@on_transaction_write
+def _update_ledger(connection, changes):
+    postings = LedgerPosting.__table__
+    snapshots = BalanceSnapshot.__table__
+    removed = {row['id'] for sign, row in changes if sign < 0}
+    if removed:
+        connection.execute(postings.delete().where(postings.c.transaction_id.in_(removed)))
+    new_postings = []
+    deltas = {}
+    for sign, row in changes:
+        if row['date'] is None:
+            continue
+        for account, currency, amount in ledger_postings(row):
+            if sign > 0:
+                new_postings.append({'transaction_id': row['id'], 'account': account, 'currency': currency,
+                                     'date': row['date'], 'amount_minor': amount})
+            key = (account, currency, row['date'])
+            deltas[key] = deltas.get(key, 0) + sign * amount
+    if new_postings:
+        connection.execute(postings.insert(), new_postings)
+
+    # Checkpoints taken on or after a changed posting's date must include it
+    last_checkpoint = connection.execute(db.select(db.func.max(snapshots.c.date))).scalar()
+    for (account, currency, day), delta in deltas.items():
+        if not delta or last_checkpoint is None or day > last_checkpoint:
+            continue
+        match = db.and_(snapshots.c.account == account, snapshots.c.currency == currency)
+        connection.execute(snapshots.update().where(match, snapshots.c.date >= day)
+                           .values(balance_minor=snapshots.c.balance_minor + delta))
+        # An account first seen before a checkpoint has no rows there yet
+        missing = db.select(
+            db.literal(account), db.literal(currency), snapshots.c.date, db.literal(delta)
+        ).where(snapshots.c.date >= day, snapshots.c.date.not_in(
+            db.select(snapshots.c.date).where(match)
+        )).distinct()
+        connection.execute(snapshots.insert().from_select(['account', 'currency', 'date', 'balance_minor'], missing))
+
+def last_checkpoint(as_of=None, connection=None):
+    query = db.select(db.func.max(BalanceSnapshot.date))
+    if as_of:
+        query = query.where(BalanceSnapshot.date <= as_of)
+    return (connection or db.session).execute(query).scalar()
+
+def account_balances(as_of=None, account=None):
+    """``{(account, currency): balance}`` at the end of ``as_of`` (today when None).
+
+    Starts from the latest checkpoint on or before the day and adds the
+    postings after it; ``account`` limits the result to one account.
+    """
+    return {key: from_minor(balance, key[1]) for key, balance in _minor_balances(as_of, account).items()}
+
+def _minor_balances(as_of=None, account=None, connection=None):
+    connection = connection or db.session
+    as_of = as_of or date.today()
+    checkpoint = last_checkpoint(as_of, connection)
+    balances = {}
+    if checkpoint:
+        snapshots = db.select(BalanceSnapshot.account, BalanceSnapshot.currency, BalanceSnapshot.balance_minor).where(
+            BalanceSnapshot.date == checkpoint)
+        if account:
+            snapshots = snapshots.where(BalanceSnapshot.account == account)
+        balances = {(name, currency): balance for name, currency, balance in connection.execute(snapshots)}
+    tail = db.select(LedgerPosting.account, LedgerPosting.currency, db.func.sum(LedgerPosting.amount_minor)).where(
+        LedgerPosting.date <= as_of).group_by(LedgerPosting.account, LedgerPosting.currency)
+    if checkpoint:
+        tail = tail.where(LedgerPosting.date > checkpoint)
+    if account:
+        tail = tail.where(LedgerPosting.account == account)
+    for name, currency, total in connection.execute(tail):
+        balances[(name, currency)] = balances.get((name, currency), 0) + total
+    return balances
+
+def _month_end(day):
+    return next_month(day) - timedelta(days=1)
+
+def _last_month_end():
+    return date.today().replace(day=1) - timedelta(days=1)
+
+def checkpoint_balances(until=None, connection=None):
+    """Write month-end snapshots for every account up to ``until`` (the last month end).
+
+    Returns the number of snapshot rows added; the caller commits.
+    """
+    connection = connection or db.session
+    until = until or _last_month_end()
+    checkpoint = last_checkpoint(connection=connection)
+    start = connection.execute(db.select(db.func.min(LedgerPosting.date))).scalar()
+    if start is None:
+        return 0
+    month_end = _month_end(checkpoint + timedelta(days=1) if checkpoint else start)
+    if month_end > until:
+        return 0
+    balances = _minor_balances(checkpoint, connection=connection) if checkpoint else {}
+    month = db.func.strftime('%Y-%m', LedgerPosting.date)
+    monthly = db.select(LedgerPosting.account, LedgerPosting.currency, month, db.func.sum(LedgerPosting.amount_minor)).where(
+        LedgerPosting.date <= until).group_by(LedgerPosting.account, LedgerPosting.currency, month)
+    if checkpoint:
+        monthly = monthly.where(LedgerPosting.date > checkpoint)
+    deltas = {}
+    for name, currency, month_key, total in connection.execute(monthly):
+        deltas.setdefault(month_key, []).append(((name, currency), total))
+    rows = []
+    while month_end <= until:
+        for key, total in deltas.get(month_end.strftime('%Y-%m'), []):
+            balances[key] = balances.get(key, 0) + total
+        rows += [{'account': name, 'currency': currency, 'date': month_end, 'balance_minor': balance}
+                 for (name, currency), balance in balances.items()]
+        month_end = _month_end(month_end + timedelta(days=1))
+    if rows:
+        connection.execute(BalanceSnapshot.__table__.insert(), rows)
+    return len(rows)
+
+@on_transaction_write
+def _checkpoint_due_balances(connection, changes):
+    # Only the first write of a month in this process looks for due checkpoints. Checkpoints
+    # only save work (balances add the postings after the latest one), so a write rolled back
+    # after this just leaves the month to the daily maintenance.
+    state = current_app.extensions['noralyzer']
+    due = _last_month_end()
+    if state.checkpointed_through != due:
+        checkpoint_balances(due, connection)
+        state.checkpointed_through = due
+
+def rebuild_ledger():
+    """Recreate postings and snapshots from all transactions."""
+    db.session.execute(LedgerPosting.__table__.delete())
+    db.session.execute(BalanceSnapshot.__table__.delete())
+    table = Transaction.__table__
+    result = db.session.execute(
+        db.select(*[table.c[f] for f in TRANSACTION_FIELDS]).execution_options(yield_per=REBUILD_BATCH_SIZE)
+    )
+    for batch in result.partitions():
+        _update_ledger(db.session.connection(), [(1, transaction_row(row._mapping)) for row in batch])
+    checkpoint_balances()
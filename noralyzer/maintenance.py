@@ -0,0 +1,78 @@
+"""Daily catch-up work, kept out of startup.
+
+Recurring occurrences that fell due, alert totals of budget windows that
+moved on with the calendar, last week's summary and month-end balance
+checkpoints are brought up to date once a day. The first request of a day
+in any process claims the day in the settings table and does the work
+after its response has been sent; the other processes find the day taken
+and skip it. ``flask --app noralyzer run-maintenance`` runs it at once, from
+a scheduler say.
+"""
+from datetime import date
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .extensions import db
+from .ledger import checkpoint_balances
+from .models import Setting
+from .notifications import refresh_alerts, weekly_summary
+from .recurring import materialize_recurring
+
+MAINTENANCE_SETTING = 'maintenance_date'
+
+def claim_day(today=None):
+    """Record ``today`` as maintained; False when a process already did. The caller commits."""
+    today = (today or date.today()).isoformat()
+    statement = sqlite_insert(Setting).values(key=MAINTENANCE_SETTING, value=today)
+    result = db.session.execute(statement.on_conflict_do_update(
+        index_elements=[Setting.key], set_={'value': statement.excluded.value},
+        where=Setting.value.is_distinct_from(statement.excluded.value)))
+    return result.rowcount == 1
+
+def run_maintenance(today=None, force=False):
+    """Do the day's catch-up work unless another process has; returns True if it ran.
+
+    The claim and the work commit together, so a failed run leaves the day
+    unclaimed.
+    """
+    try:
+        if not claim_day(today) and not force:
+            db.session.rollback()
+            return False
+        materialize_recurring(today)
+        refresh_alerts(today)
+        weekly_summary(today=today)
+        checkpoint_balances()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return True
+
+def schedule_maintenance(response):
+    """``after_request`` hook: the first response of a day in this process runs the maintenance once sent."""
+    app = current_app._get_current_object()
+    state = app.extensions['noralyzer']
+    if state.maintained_on != date.today():
+        state.maintained_on = date.today()
+        response.call_on_close(lambda: _maintain(app))
+    return response
+
+def _maintain(app):
+    with app.app_context():
+        try:
+            run_maintenance()
+        except Exception:
+            # The next request tries again
+            app.extensions['noralyzer'].maintained_on = None
+            app.logger.exception('Daily maintenance failed')
+
+@click.command('run-maintenance')
+@with_appcontext
+def run_maintenance_command():
+    """Add due recurring transactions, refresh alerts, the weekly summary and balance checkpoints."""
+    run_maintenance(force=True)
+    click.echo('Maintenance done')
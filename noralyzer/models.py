@@ -0,0 +1,277 @@
+from datetime import datetime, date
+
+from .extensions import db
+from .money import MinorUnits
+
+class Bank(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    holder_name = db.Column(db.String(100))
+    iban = db.Column(db.String(34))
+    account_type = db.Column(db.String(50)) # Vadesiz TL, Vadeli, Döviz, Altın vb.
+    is_favorite = db.Column(db.Boolean, default=False)
+    statement_profile = db.Column(db.JSON)  # CSV column mapping for statement imports
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    cards = db.relationship('Card', backref='bank', lazy=True)
+
+class Card(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    card_type = db.Column(db.String(20))  # credit, debit
+    last_four = db.Column(db.String(4))
+    bank_id = db.Column(db.Integer, db.ForeignKey('bank.id'))
+    is_favorite = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Person(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    phone = db.Column(db.String(20))
+    note = db.Column(db.Text)
+    is_favorite = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Place(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    address = db.Column(db.Text)
+    category = db.Column(db.String(50))
+    is_favorite = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Category(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), nullable=False)
+    icon = db.Column(db.String(50))
+    color = db.Column(db.String(7), default='#6c757d')
+
+class Tag(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), nullable=False)
+    color = db.Column(db.String(7), default='#17a2b8')
+
+
+# The primary key serves the tag lookups of a transaction (search index, API),
+# the reverse index the transactions of a tag (tag filters and report)
+transaction_tags = db.Table('transaction_tags',
+    db.Column('transaction_id', db.Integer, db.ForeignKey('transaction.id'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tag.id'), primary_key=True),
+    db.Index('ix_transaction_tags_tag', 'tag_id', 'transaction_id')
+)
+
+class Transaction(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    amount_minor = db.Column(db.Integer, nullable=False)  # See MONEY
+    amount = MinorUnits('amount_minor', currency_field='currency')
+    currency = db.Column(db.String(10), nullable=False)  # TRY, USD, EUR, CAD, BTC, DOGE, GOLD_FULL, GOLD_GRAM, GOLD_QUARTER, CASH
+    transaction_type = db.Column(db.String(30), nullable=False)  # atm_withdraw, bank_deposit, card_load, cash_in, cash_out, transfer, crypto_buy, crypto_sell, gold_buy, gold_sell
+    description = db.Column(db.Text)
+    date = db.Column(db.Date, default=date.today)
+    time = db.Column(db.String(10))  # HH:MM format
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'))
+    card_id = db.Column(db.Integer, db.ForeignKey('card.id'))
+    bank_id = db.Column(db.Integer, db.ForeignKey('bank.id'))
+    person_id = db.Column(db.Integer, db.ForeignKey('person.id'))
+    place_id = db.Column(db.Integer, db.ForeignKey('place.id'))
+    from_bank_id = db.Column(db.Integer, db.ForeignKey('bank.id'))
+    to_bank_id = db.Column(db.Integer, db.ForeignKey('bank.id'))
+    owner_id = db.Column(db.Integer, db.ForeignKey('person.id'))
+    fingerprint = db.Column(db.String(64))  # Statement import hash, see statement_fingerprint()
+    occurrence_key = db.Column(db.String(40))  # Recurring template occurrence, see occurrence_key()
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    category = db.relationship('Category', backref='transactions')
+    card = db.relationship('Card', backref='transactions')
+    bank_ref = db.relationship('Bank', foreign_keys=[bank_id], backref='transactions')
+    person = db.relationship('Person', foreign_keys=[person_id], backref='transactions')
+    place = db.relationship('Place', backref='transactions')
+    from_bank = db.relationship('Bank', foreign_keys=[from_bank_id])
+    to_bank = db.relationship('Bank', foreign_keys=[to_bank_id])
+    owner = db.relationship('Person', foreign_keys=[owner_id], backref='owned_transactions')
+    tags = db.relationship('Tag', secondary=transaction_tags, backref='transactions')
+
+    # Access paths of the listing filters, date sorting and type-based reports
+    __table_args__ = (
+        db.Index('ix_transaction_date', 'date'),
+        db.Index('ix_transaction_category_date', 'category_id', 'date'),
+        db.Index('ix_transaction_type_date', 'transaction_type', 'date'),
+        db.Index('ix_transaction_owner_date', 'owner_id', 'date'),
+        db.Index('ix_transaction_person_date', 'person_id', 'date'),
+        db.Index('ix_transaction_place_date', 'place_id', 'date'),
+        db.Index('ix_transaction_card_date', 'card_id', 'date'),
+        db.Index('ix_transaction_bank_date', 'bank_id', 'date'),
+        db.Index('ux_transaction_fingerprint', 'fingerprint', unique=True),
+        db.Index('ux_transaction_occurrence_key', 'occurrence_key', unique=True),
+    )
+
+    @db.validates('currency')
+    def _rescale_amount(self, key, currency):
+        Transaction.amount.rescale(self, currency)
+        return currency
+
+class Budget(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    amount_minor = db.Column(db.Integer, nullable=False)
+    amount = MinorUnits('amount_minor')
+    period = db.Column(db.String(20))  # weekly, monthly
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'))
+    start_date = db.Column(db.Date)
+    end_date = db.Column(db.Date)
+    category = db.relationship('Category')
+
+class SavingGoal(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    target_amount_minor = db.Column(db.Integer, nullable=False)
+    current_amount_minor = db.Column(db.Integer, default=0)
+    target_amount = MinorUnits('target_amount_minor')
+    current_amount = MinorUnits('current_amount_minor')
+    deadline = db.Column(db.Date)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'))
+    category = db.relationship('Category')
+
+class QuickTransaction(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    amount_minor = db.Column(db.Integer)
+    amount = MinorUnits('amount_minor', currency_field='currency')
+    currency = db.Column(db.String(10))
+    transaction_type = db.Column(db.String(30))
+    description = db.Column(db.Text)
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'))
+    card_id = db.Column(db.Integer, db.ForeignKey('card.id'))
+    bank_id = db.Column(db.Integer, db.ForeignKey('bank.id'))
+    person_id = db.Column(db.Integer, db.ForeignKey('person.id'))
+    place_id = db.Column(db.Integer, db.ForeignKey('place.id'))
+    # Recurrence: every ``recurrence_interval`` months (on ``recurrence_day``), weeks or days from ``recurrence_start``
+    recurrence = db.Column(db.String(10))  # monthly, weekly, daily; None for a plain template
+    recurrence_interval = db.Column(db.Integer)
+    recurrence_day = db.Column(db.Integer)  # Day of the month for monthly rules
+    recurrence_start = db.Column(db.Date)
+    recurrence_end = db.Column(db.Date)
+    scheduled_through = db.Column(db.Date)  # Occurrences up to this date have been added
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    category = db.relationship('Category')
+    card = db.relationship('Card')
+    bank = db.relationship('Bank')
+    person = db.relationship('Person')
+    place = db.relationship('Place')
+
+    @db.validates('currency')
+    def _rescale_amount(self, key, currency):
+        QuickTransaction.amount.rescale(self, currency)
+        return currency
+
+class MonthlyRollup(db.Model):
+    """Transaction totals per month × category × type × currency × owner, kept in sync on every flush."""
+    id = db.Column(db.Integer, primary_key=True)
+    month = db.Column(db.String(7), nullable=False)  # YYYY-MM
+    category_id = db.Column(db.Integer, nullable=False, default=0)  # 0: no category
+    transaction_type = db.Column(db.String(30), nullable=False)
+    currency = db.Column(db.String(10), nullable=False)
+    owner_id = db.Column(db.Integer, nullable=False, default=0)  # 0: no owner
+    total_minor = db.Column(db.Integer, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ux_monthly_rollup_key', 'month', 'category_id', 'transaction_type', 'currency', 'owner_id',
+                 unique=True),
+    )
+
+class LedgerPosting(db.Model):
+    """One signed leg of a transaction on an account (``bank:<id>``, ``card:<id>``, ``cash``, ``crypto`` or ``gold``)."""
+    id = db.Column(db.Integer, primary_key=True)
+    transaction_id = db.Column(db.Integer, nullable=False)  # No FK: postings are removed after the transaction row, in the same flush
+    account = db.Column(db.String(30), nullable=False)
+    currency = db.Column(db.String(10), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    amount_minor = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_ledger_posting_transaction', 'transaction_id'),
+        db.Index('ix_ledger_posting_account_date', 'account', 'currency', 'date'),
+        db.Index('ix_ledger_posting_date', 'date'),
+    )
+
+class BalanceSnapshot(db.Model):
+    """Balance of an account at the end of ``date`` (a month end), kept current when older postings change."""
+    id = db.Column(db.Integer, primary_key=True)
+    account = db.Column(db.String(30), nullable=False)
+    currency = db.Column(db.String(10), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    balance_minor = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('ux_balance_snapshot_account_date', 'account', 'currency', 'date', unique=True),
+    )
+
+class CurrencyRate(db.Model):
+    """Value of one unit of ``currency`` in TRY on ``date``."""
+    id = db.Column(db.Integer, primary_key=True)
+    currency = db.Column(db.String(10), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    rate = db.Column(db.Float, nullable=False)
+
+    __table_args__ = (
+        db.Index('ux_currency_rate_currency_date', 'currency', 'date', unique=True),
+    )
+
+class AlertTotal(db.Model):
+    """Running expense total of a budget's window, or income total of a goal's category, per month and currency."""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(10), nullable=False)  # budget, goal
+    ref_id = db.Column(db.Integer, nullable=False)
+    period = db.Column(db.String(10), nullable=False, default='')  # Window start of budgets, '' for goals
+    month = db.Column(db.String(7), nullable=False, default='')
+    currency = db.Column(db.String(10), nullable=False, default='')
+    total_minor = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ux_alert_total_key', 'kind', 'ref_id', 'period', 'month', 'currency', unique=True),
+    )
+
+class Notification(db.Model):
+    """A budget or goal threshold alert or a weekly summary; raised once per key."""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(10), nullable=False)  # budget, goal, weekly
+    ref_id = db.Column(db.Integer, nullable=False, default=0)
+    period = db.Column(db.String(10), nullable=False, default='')
+    level = db.Column(db.Integer, nullable=False, default=0)  # Percentage threshold
+    message = db.Column(db.String(255), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    read_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ux_notification_key', 'kind', 'ref_id', 'period', 'level', unique=True),
+    )
+
+class ChangeCounter(db.Model):
+    """Number of writes to table ``name`` and the time of the last one, bumped by SQLite triggers."""
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    changed_at = db.Column(db.DateTime)
+
+class Setting(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(50), unique=True, nullable=False)
+    value = db.Column(db.Text)
+
+class Job(db.Model):
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(30), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    message = db.Column(db.Text)
+    progress = db.Column(db.Text)  # JSON counts reported by the job
+    result_file = db.Column(db.String(255))
+    result_name = db.Column(db.String(100))
+    result_mimetype = db.Column(db.String(50))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed')
@@ -0,0 +1,65 @@
+"""Money amounts as integers in the currency's minor unit.
+
+The scale is the number of decimal places kept (satoshis for the coins,
+milligrams for gold).
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+CURRENCY_SCALES = {'BTC': 8, 'DOGE': 8, 'GOLD_GRAM': 3}
+DEFAULT_SCALE = 2
+
+def currency_scale(currency):
+    if currency and currency.startswith('CASH_'):
+        currency = currency[5:]
+    return CURRENCY_SCALES.get(currency, DEFAULT_SCALE)
+
+def to_minor(value, currency=None):
+    """``value`` (number or numeric string) as an integer count of minor units."""
+    if value is None or value == '':
+        return None
+    value = value if isinstance(value, Decimal) else Decimal(str(value).strip())
+    return int(value.scaleb(currency_scale(currency)).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+def from_minor(minor, currency=None):
+    """Display value of ``minor`` units as an exact Decimal."""
+    if minor is None:
+        return None
+    return Decimal(int(minor)).scaleb(-currency_scale(currency))
+
+class MinorUnits:
+    """Decimal attribute over an integer minor-unit column.
+
+    The scale follows the ``currency_field`` attribute of the row (the default
+    scale without one). SQL has to use the ``*_minor`` column itself.
+    """
+
+    def __init__(self, column, currency_field=None):
+        self.column = column
+        self.currency_field = currency_field
+
+    def __set_name__(self, owner, name):
+        self.pending = f'_{name}_pending'
+
+    def _currency(self, obj):
+        return getattr(obj, self.currency_field) if self.currency_field else None
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return from_minor(getattr(obj, self.column), self._currency(obj))
+
+    def __set__(self, obj, value):
+        minor = to_minor(value, self._currency(obj))
+        setattr(obj, self.column, minor)
+        if self.currency_field:
+            # Kept so a currency assigned afterwards rescales the entered value, not a rounded one
+            obj.__dict__[self.pending] = (value, minor)
+
+    def rescale(self, obj, currency):
+        """Re-express the stored amount in the scale of ``currency``; called before the currency changes."""
+        pending = obj.__dict__.pop(self.pending, None)
+        minor = getattr(obj, self.column)
+        if minor is None:
+            return
+        value = pending[0] if pending and pending[1] == minor else from_minor(minor, self._currency(obj))
+        setattr(obj, self.column, to_minor(value, currency))
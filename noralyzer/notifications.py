@@ -0,0 +1,231 @@
+"""Budget and goal alerts and the weekly summary.
+
+A transaction write hook keeps running totals (AlertTotal) of the budgets
+and goals the written rows belong to: a budget's expenses in its current
+window, a goal's income in its category. Only the budgets and goals whose
+category matches a written row are loaded and their totals touched; a
+total that does not exist yet (a new budget, a new window) is computed
+once from the transactions. When a total crosses 80% or 100% of its
+budget or target, a Notification is raised for the highest level reached,
+once per window and level.
+
+The summary of the last complete week is computed once, by the daily
+maintenance, and stored as a notification too. The ``budget_alerts``,
+``goal_reminders`` and ``weekly_summary`` settings switch each kind off.
+"""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .aggregation import sum_of_types
+from .budgets import budget_window
+from .cache import reference_list, settings_store
+from .constants import CURRENCY_SYMBOLS, EXPENSE_TYPES, INCOME_TYPES
+from .extensions import db
+from .hooks import on_transaction_write
+from .models import AlertTotal, Budget, Notification, SavingGoal, Transaction
+from .money import from_minor
+from .valuation import base_currency, rate_table
+
+THRESHOLDS = (80, 100)
+
+# Setting that switches each kind of notification, all on by default
+NOTIFICATION_SETTINGS = {'budget': 'budget_alerts', 'goal': 'goal_reminders', 'weekly': 'weekly_summary'}
+
+def notifications_enabled(kind):
+    return settings_store.get_bool(NOTIFICATION_SETTINGS[kind], True)
+
+def _money(value):
+    symbol = CURRENCY_SYMBOLS.get(base_currency(), base_currency())
+    return f'{symbol}{value:,.0f}'
+
+class AlertTarget:
+    """A budget window or a goal whose running total is tracked."""
+
+    def __init__(self, kind, row, period='', start=None, end=None):
+        self.kind, self.row, self.period, self.start, self.end = kind, row, period, start, end
+        self.key = (kind, row.id, period)
+
+    @property
+    def types(self):
+        return EXPENSE_TYPES if self.kind == 'budget' else INCOME_TYPES
+
+    def matches(self, row):
+        if row['date'] is None or row['transaction_type'] not in self.types:
+            return False
+        if self.row.category_id not in (None, row['category_id']):
+            return False
+        return (self.start is None or row['date'] >= self.start) and (self.end is None or row['date'] <= self.end)
+
+    def limit(self):
+        if self.kind == 'budget':
+            return from_minor(self.row.amount_minor)
+        return from_minor(self.row.target_amount_minor)
+
+    def base(self):
+        # Saving goals start from their manually entered amount
+        return from_minor(self.row.current_amount_minor or 0) if self.kind == 'goal' else Decimal(0)
+
+    def message(self, level, value):
+        name, limit = self.row.name, self.limit()
+        if self.kind == 'budget' and level >= 100:
+            return f"'{name}' bütçesi aşıldı: {_money(value)} / {_money(limit)}"
+        if self.kind == 'budget':
+            return f"'{name}' bütçesinin %{level}'i kullanıldı: {_money(value)} / {_money(limit)}"
+        if level >= 100:
+            return f"'{name}' hedefine ulaşıldı: {_money(value)}"
+        return f"'{name}' hedefinin %{level}'ine ulaşıldı: {_money(value)} / {_money(limit)}"
+
+def alert_targets(connection, today=None, budget_categories=None, goal_categories=None):
+    """The budget windows and goals tracked under the current settings.
+
+    ``budget_categories`` and ``goal_categories`` limit them to the budgets
+    and goals that rows of those categories count towards.
+    """
+    targets = []
+    if notifications_enabled('budget') and budget_categories != set():
+        query = db.select(Budget.__table__)
+        if budget_categories is not None:
+            # A budget without a category counts every expense
+            query = query.where(db.or_(Budget.category_id.is_(None), Budget.category_id.in_(budget_categories)))
+        for budget in connection.execute(query):
+            start, end = budget_window(budget, today)
+            targets.append(AlertTarget('budget', budget, start.isoformat() if start else '', start, end))
+    if notifications_enabled('goal') and goal_categories != set():
+        # Goals without a category only move when their amount is edited by hand
+        query = db.select(SavingGoal.__table__).where(SavingGoal.category_id.is_not(None))
+        if goal_categories is not None:
+            query = query.where(SavingGoal.category_id.in_(goal_categories))
+        for goal in connection.execute(query):
+            targets.append(AlertTarget('goal', goal))
+    return targets
+
+def _seed_total(connection, target):
+    """Compute a target's running total from the transactions; returns ``{(month, currency): minor}``."""
+    month = db.func.strftime('%Y-%m', Transaction.date)
+    query = db.select(month, Transaction.currency, db.func.sum(Transaction.amount_minor)).where(
+        Transaction.transaction_type.in_(target.types), Transaction.date.is_not(None))
+    if target.row.category_id is not None:
+        query = query.where(Transaction.category_id == target.row.category_id)
+    if target.start:
+        query = query.where(Transaction.date >= target.start)
+    if target.end:
+        query = query.where(Transaction.date <= target.end)
+    totals = {(month_key, currency): total for month_key, currency, total in
+              connection.execute(query.group_by(month, Transaction.currency))}
+    table = AlertTotal.__table__
+    kind, ref_id, period = target.key
+    # Totals of the budget's earlier windows are no longer needed
+    connection.execute(table.delete().where(table.c.kind == kind, table.c.ref_id == ref_id))
+    # An empty ('', '') row marks a target whose total is zero
+    connection.execute(table.insert(), [
+        {'kind': kind, 'ref_id': ref_id, 'period': period, 'month': month_key, 'currency': currency,
+         'total_minor': total} for (month_key, currency), total in (totals or {('', ''): 0}).items()])
+    return totals
+
+def _apply_deltas(connection, target, deltas):
+    """Add ``{(month, currency): minor}`` to a stored running total; returns the new total."""
+    table = AlertTotal.__table__
+    kind, ref_id, period = target.key
+    statement = sqlite_insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=['kind', 'ref_id', 'period', 'month', 'currency'],
+        set_={'total_minor': table.c.total_minor + statement.excluded.total_minor})
+    connection.execute(statement, [
+        {'kind': kind, 'ref_id': ref_id, 'period': period, 'month': month_key, 'currency': currency,
+         'total_minor': total} for (month_key, currency), total in deltas.items()])
+    return {(month_key, currency): total for month_key, currency, total in connection.execute(
+        db.select(table.c.month, table.c.currency, table.c.total_minor).where(
+            table.c.kind == kind, table.c.ref_id == ref_id, table.c.period == period))}
+
+def _raise_alerts(target, totals):
+    value = target.base() + sum((from_minor(total, currency) * rate_table.factor(currency, month)
+                                 for (month, currency), total in totals.items() if currency), Decimal(0))
+    limit = target.limit()
+    if limit <= 0:
+        return
+    reached = [level for level in THRESHOLDS if value * 100 >= limit * level]
+    if reached:
+        # A write jumping past several levels tells only the highest
+        kind, ref_id, period = target.key
+        add_notification(kind, target.message(reached[-1], value), ref_id=ref_id, period=period, level=reached[-1])
+
+def add_notification(kind, message, ref_id=0, period='', level=0):
+    """Insert a notification unless one with the same key exists."""
+    statement = sqlite_insert(Notification).values(
+        kind=kind, ref_id=ref_id, period=period, level=level, message=message, created_at=datetime.utcnow())
+    # Through the session, so the cached notification list is dropped at commit
+    db.session.execute(statement.on_conflict_do_nothing(index_elements=['kind', 'ref_id', 'period', 'level']))
+
+@on_transaction_write
+def _update_alert_totals(connection, changes):
+    dated = [row for sign, row in changes if row['date'] is not None]
+    targets = alert_targets(
+        connection,
+        budget_categories={row['category_id'] for row in dated if row['transaction_type'] in EXPENSE_TYPES},
+        goal_categories={row['category_id'] for row in dated
+                         if row['transaction_type'] in INCOME_TYPES and row['category_id'] is not None})
+    deltas = {}
+    for sign, row in changes:
+        for target in targets:
+            if target.matches(row):
+                key = (row['date'].strftime('%Y-%m'), row['currency'])
+                entry = deltas.setdefault(target.key, (target, {}))[1]
+                entry[key] = entry.get(key, 0) + sign * row['amount_minor']
+    table = AlertTotal.__table__
+    for (kind, ref_id, period), (target, target_deltas) in deltas.items():
+        stored = connection.execute(db.select(table.c.id).where(
+            table.c.kind == kind, table.c.ref_id == ref_id, table.c.period == period).limit(1)).first()
+        # The flushed rows are already in the table, so a fresh total includes them
+        totals = _apply_deltas(connection, target, target_deltas) if stored else _seed_total(connection, target)
+        _raise_alerts(target, totals)
+
+def refresh_alerts(today=None):
+    """Recompute every running total and raise the alerts they call for.
+
+    Run by the daily maintenance (budget windows move on with the
+    calendar), after bulk changes to the transactions and after budgets,
+    goals or the settings change. The caller commits.
+    """
+    connection = db.session.connection()
+    connection.execute(AlertTotal.__table__.delete())
+    for target in alert_targets(connection, today):
+        _raise_alerts(target, _seed_total(connection, target))
+
+def last_week(today=None):
+    today = today or date.today()
+    start = today - timedelta(days=today.weekday() + 7)
+    return start, start + timedelta(days=6)
+
+def weekly_summary(connection=None, today=None):
+    """Store the summary of the last complete week as a notification, once."""
+    if not notifications_enabled('weekly'):
+        return
+    connection = connection or db.session.connection()
+    start, end = last_week(today)
+    period = start.isoformat()
+    if connection.execute(db.select(Notification.id).where(
+            Notification.kind == 'weekly', Notification.period == period)).first():
+        return
+    month = db.func.strftime('%Y-%m', Transaction.date)
+    query = db.select(
+        month, Transaction.currency, db.func.count(Transaction.id),
+        sum_of_types(INCOME_TYPES), sum_of_types(EXPENSE_TYPES)
+    ).where(Transaction.date >= start, Transaction.date <= end).group_by(month, Transaction.currency)
+    count, income, expense = 0, Decimal(0), Decimal(0)
+    for month_key, currency, rows, income_minor, expense_minor in connection.execute(query):
+        factor = rate_table.factor(currency, month_key)
+        count += rows
+        income += from_minor(income_minor, currency) * factor
+        expense += from_minor(expense_minor, currency) * factor
+    add_notification('weekly', f'{start:%d.%m} – {end:%d.%m} haftası: {count} işlem, gelir {_money(income)}, '
+                               f'gider {_money(expense)}, net {_money(income - expense)}', period=period)
+
+def unread_notifications(limit=5):
+    """The newest unread notifications, from the reference cache."""
+    unread = [notification for notification in reference_list(Notification) if notification.read_at is None]
+    return unread[::-1][:limit]
+
+def inject_notifications():
+    return {'notifications': unread_notifications()}
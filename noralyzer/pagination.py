@@ -0,0 +1,119 @@
+"""Keyset pagination of transaction listings.
+
+Keyset pagination over (date, time, id), newest first. Cursors are opaque
+tokens carrying the sort key of the row a page starts after, so every page
+is one indexed range read no matter how deep it is.
+"""
+import base64
+import json
+from datetime import date
+
+from .cache import settings_store
+from .extensions import db
+from .models import Transaction
+
+MAX_PER_PAGE = 200
+
+class CursorPage:
+    """One page of a keyset-paginated query."""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None, total=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+def encode_cursor(direction, key):
+    raw = json.dumps([direction, *key], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def _cursor_date(value):
+    # '' stands for a transaction without a date, which sorts after every dated one
+    return date.fromisoformat(value) if value else ''
+
+DATE_KEY_TYPES = (_cursor_date, str, int)
+RANK_KEY_TYPES = (float, int)
+
+def decode_cursor(token, key_types=DATE_KEY_TYPES):
+    """Return ``(direction, key)`` for a cursor token, or None if it is malformed."""
+    try:
+        direction, *key = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        if direction not in ('next', 'prev') or len(key) != len(key_types):
+            return None
+        return direction, tuple(convert(value) for convert, value in zip(key_types, key))
+    except (ValueError, TypeError):
+        return None
+
+def items_per_page():
+    """The ``items_per_page`` setting, kept between 1 and MAX_PER_PAGE."""
+    return min(max(settings_store.get_int('items_per_page', 20), 1), MAX_PER_PAGE)
+
+def transaction_sort_key(transaction):
+    return (transaction.date.isoformat() if transaction.date else '', transaction.time or '', transaction.id)
+
+def _date_keyset_filters(sort_columns, key, direction):
+    """Filters for the rows after ``key``, in the order they are read.
+
+    SQLite sorts undated rows last (first when ascending), so paging across
+    them takes a second indexed read rather than an OR that sorts the table.
+    """
+    undated, dated = Transaction.date.is_(None), Transaction.date.is_not(None)
+    if key[0] == '':
+        rest, rest_key = db.tuple_(*sort_columns[1:]), db.tuple_(*key[1:])
+        if direction == 'prev':
+            return [db.and_(undated, rest > rest_key), dated]
+        return [db.and_(undated, rest < rest_key)]
+    if direction == 'prev':
+        return [db.tuple_(*sort_columns) > db.tuple_(*key)]
+    return [db.tuple_(*sort_columns) < db.tuple_(*key), undated]
+
+def paginate_transactions(query, cursor=None, per_page=20, total=None, rank=None):
+    """Return a CursorPage of ``query`` ordered by date, time and id descending.
+
+    With ``rank`` (a search rank column, lower is better) the best matches
+    come first instead, ties broken by id.
+    """
+    if rank is None:
+        sort_columns, key_types, sort_key = (
+            (Transaction.date, db.func.coalesce(Transaction.time, ''), Transaction.id), DATE_KEY_TYPES,
+            transaction_sort_key)
+    else:
+        query = query.add_columns(-rank)
+        sort_columns, key_types, sort_key = (-rank, Transaction.id), RANK_KEY_TYPES, lambda row: (row[1], row[0].id)
+    direction, key = (decode_cursor(cursor, key_types) if cursor else None) or ('next', None)
+
+    if not key:
+        filters = [None]
+    elif rank is None:
+        filters = _date_keyset_filters(sort_columns, key, direction)
+    else:
+        filters = [db.tuple_(*sort_columns) > db.tuple_(*key) if direction == 'prev'
+                   else db.tuple_(*sort_columns) < db.tuple_(*key)]
+    order = [column.asc() if direction == 'prev' else column.desc() for column in sort_columns]
+    rows = []
+    for condition in filters:
+        part = query if condition is None else query.filter(condition)
+        rows += part.order_by(*order).limit(per_page + 1 - len(rows)).all()
+        if len(rows) > per_page:
+            break
+    if direction == 'prev':
+        has_prev, has_next = len(rows) > per_page, key is not None
+        rows = rows[:per_page][::-1]
+    else:
+        has_next, has_prev = len(rows) > per_page, key is not None
+        rows = rows[:per_page]
+
+    return CursorPage(
+        rows if rank is None else [row[0] for row in rows],
+        next_cursor=encode_cursor('next', sort_key(rows[-1])) if has_next and rows else None,
+        prev_cursor=encode_cursor('prev', sort_key(rows[0])) if has_prev and rows else None,
+        total=total,
+    )
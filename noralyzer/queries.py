@@ -0,0 +1,58 @@
+"""Transaction queries shared by the listing pages and the API."""
+from datetime import datetime
+
+from .extensions import db
+from .models import Transaction, transaction_tags
+from .search import search_ranks
+
+def transaction_query(*relations):
+    """``Transaction.query`` with the named relationships eager-loaded.
+
+    Many-to-one relations (category, owner, card, ...) are joined into the same
+    SELECT; collections such as ``tags`` are fetched with one ``SELECT ... IN``
+    for the whole result, so a listing costs a fixed number of queries.
+    """
+    options = []
+    for name in relations:
+        attr = getattr(Transaction, name)
+        options.append(db.selectinload(attr) if attr.property.uselist else db.joinedload(attr))
+    return Transaction.query.options(*options)
+
+# Listing filters shared by the transaction page and the API: parameter -> column
+TRANSACTION_FILTERS = {
+    'category': Transaction.category_id, 'person': Transaction.person_id, 'owner': Transaction.owner_id,
+    'place': Transaction.place_id, 'card': Transaction.card_id, 'bank': Transaction.bank_id,
+    'type': Transaction.transaction_type, 'currency': Transaction.currency,
+}
+
+def tag_filter(tag_ids, match_all=False):
+    """Condition for transactions with any (or all) of ``tag_ids``, looked up through ix_transaction_tags_tag."""
+    def links(*ids):
+        return Transaction.id.in_(db.select(transaction_tags.c.transaction_id).where(transaction_tags.c.tag_id.in_(ids)))
+    if match_all:
+        # One (tag_id, transaction_id) lookup per tag rather than grouping every link
+        return db.and_(*[links(tag_id) for tag_id in tag_ids])
+    return links(*tag_ids)
+
+def filter_transactions(query, args):
+    """Apply the listing filters in ``args`` (ids, type, currency, tags, date range, ``q`` search) to ``query``.
+
+    ``tag`` may be repeated; rows need any of the tags, or all of them with
+    ``tag_mode=all``. Tag ids that are not numbers are ignored.
+
+    Returns ``(query, ranks)``; ``ranks`` is the search subquery, or None without ``q``.
+    """
+    ranks = search_ranks(args.get('q'))
+    if ranks is not None:
+        query = query.join(ranks, ranks.c.id == Transaction.id)
+    for name, column in TRANSACTION_FILTERS.items():
+        if args.get(name):
+            query = query.filter(column == args[name])
+    tag_ids = list(dict.fromkeys(args.getlist('tag', type=int)))
+    if tag_ids:
+        query = query.filter(tag_filter(tag_ids, match_all=args.get('tag_mode') == 'all'))
+    if args.get('date_from'):
+        query = query.filter(Transaction.date >= datetime.strptime(args['date_from'], '%Y-%m-%d').date())
+    if args.get('date_to'):
+        query = query.filter(Transaction.date <= datetime.strptime(args['date_to'], '%Y-%m-%d').date())
+    return query, ranks
@@ -0,0 +1,120 @@
+"""Recurring quick transaction templates.
+
+A template with a recurrence rule (every K months on day N, every K weeks
+or every K days, from a start date until an optional end date) is turned
+into transactions by ``materialize_recurring``: every occurrence missed
+since the template's ``scheduled_through`` date is added in one bulk
+insert. Each occurrence carries a unique occurrence key, so running the
+scheduler again (in the next day's maintenance, from the CLI, in a second worker)
+never adds an occurrence twice.
+"""
+import calendar
+from datetime import date, timedelta
+
+import click
+from flask.cli import with_appcontext
+
+from .extensions import db
+from .hooks import insert_transaction_rows
+from .models import QuickTransaction, Transaction
+
+RECURRENCES = [
+    ('monthly', 'Aylık'),
+    ('weekly', 'Haftalık'),
+    ('daily', 'Günlük'),
+]
+
+def occurrence_key(template_id, day):
+    return f'qt:{template_id}:{day.isoformat()}'
+
+def add_months(day, months, day_of_month):
+    month_index = day.year * 12 + day.month - 1 + months
+    year, month = divmod(month_index, 12)
+    month += 1
+    # Day 31 falls on the last day of shorter months
+    return date(year, month, min(day_of_month, calendar.monthrange(year, month)[1]))
+
+def occurrence_dates(template, after, until):
+    """Dates of the template's occurrences in (``after``, ``until``], oldest first."""
+    start = template.recurrence_start
+    if not template.recurrence or start is None:
+        return
+    if template.recurrence_end:
+        until = min(until, template.recurrence_end)
+    interval = max(template.recurrence_interval or 1, 1)
+    if template.recurrence == 'monthly':
+        day_of_month = template.recurrence_day or start.day
+        n = 0
+        day = add_months(start, 0, day_of_month)
+        if day < start:
+            n, day = 1, add_months(start, interval, day_of_month)
+        if after is not None and day <= after:
+            # Skip straight to the month after ``after``
+            n = max(n, ((after.year - start.year) * 12 + after.month - start.month) // interval)
+            day = add_months(start, n * interval, day_of_month)
+        while day <= until:
+            if after is None or day > after:
+                yield day
+            n += 1
+            day = add_months(start, n * interval, day_of_month)
+    else:
+        step = interval * (7 if template.recurrence == 'weekly' else 1)
+        day = start
+        if after is not None and after >= start:
+            day = start + timedelta(days=((after - start).days // step + 1) * step)
+        while day <= until:
+            yield day
+            day += timedelta(days=step)
+
+def next_occurrence(template):
+    """The first occurrence after ``scheduled_through`` (or from the start), None when there is none left."""
+    return next(occurrence_dates(template, template.scheduled_through, date.max), None)
+
+def transaction_values(template, day):
+    return {
+        'amount_minor': template.amount_minor, 'currency': template.currency,
+        'transaction_type': template.transaction_type, 'description': template.description or template.name,
+        'date': day, 'category_id': template.category_id, 'card_id': template.card_id, 'bank_id': template.bank_id,
+        'person_id': template.person_id, 'place_id': template.place_id,
+        'occurrence_key': occurrence_key(template.id, day),
+    }
+
+def materialize_recurring(today=None):
+    """Add the due occurrences of every recurring template up to ``today``; returns the number added.
+
+    Templates without an amount, currency or type are skipped. Occurrences
+    whose key already exists are left alone. The caller commits.
+    """
+    today = today or date.today()
+    templates = QuickTransaction.query.filter(
+        QuickTransaction.recurrence.is_not(None), QuickTransaction.recurrence_start <= today,
+        db.or_(QuickTransaction.scheduled_through.is_(None), QuickTransaction.scheduled_through < today),
+        db.or_(QuickTransaction.recurrence_end.is_(None),
+               QuickTransaction.scheduled_through.is_(None),
+               QuickTransaction.scheduled_through < QuickTransaction.recurrence_end),
+    ).all()
+    rows = []
+    for template in templates:
+        if template.amount_minor is None or not template.currency or not template.transaction_type:
+            continue
+        rows += [transaction_values(template, day)
+                 for day in occurrence_dates(template, template.scheduled_through, today)]
+        template.scheduled_through = today
+    known = set()
+    keys = [row['occurrence_key'] for row in rows]
+    for start in range(0, len(keys), 500):
+        known.update(db.session.execute(
+            db.select(Transaction.occurrence_key).where(Transaction.occurrence_key.in_(keys[start:start + 500]))
+        ).scalars())
+    rows = [row for row in rows if row['occurrence_key'] not in known]
+    if rows:
+        insert_transaction_rows(rows)
+    return len(rows)
+
+@click.command('run-recurring')
+@with_appcontext
+def run_recurring_command():
+    """Add the missed occurrences of the recurring quick transactions."""
+    count = materialize_recurring()
+    db.session.commit()
+    click.echo(f'{count} recurring transactions added')
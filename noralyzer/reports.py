@@ -0,0 +1,265 @@
+"""Report pages and chart data; loaded on the first report request.
+
+Chart series are served as JSON by ``/api/charts/<series>`` rather than
+embedded in the pages, with validators from the change counters so a page
+shown again over unchanged data gets 304 answers for its charts.
+"""
+import math
+from datetime import date, datetime, timedelta
+
+from dateutil.relativedelta import relativedelta
+from flask import abort, jsonify, render_template, request
+
+from .aggregation import sum_of_types
+from .cache import reference_cache, reference_list, settings_store
+from .changes import conditional_json
+from .constants import EXPENSE_TYPES, INCOME_TYPES
+from .extensions import db
+from .models import Category, Person, Tag, Transaction, transaction_tags
+from .money import from_minor
+from .valuation import rate_table, valued_totals
+
+MONTH_NAMES = ['Ocak', 'Şubat', 'Mart', 'Nisan', 'Mayıs', 'Haziran',
+               'Temmuz', 'Ağustos', 'Eylül', 'Ekim', 'Kasım', 'Aralık']
+
+# Daily and weekly series longer than this are merged into wider buckets
+DEFAULT_CHART_POINTS = 120
+MAX_CHART_POINTS = 1000
+
+CHART_TYPES = {'income': INCOME_TYPES, 'expense': EXPENSE_TYPES, 'all': None}
+
+def report_range(args):
+    """``(start_date, end_date)`` of the ``range`` argument (6m, 12m, all or custom with start_date/end_date)."""
+    date_range = args.get('range', '6m')
+    today = date.today()
+    if date_range == '6m':
+        return today - relativedelta(months=6), None
+    if date_range == '12m':
+        return today - relativedelta(months=12), None
+    if date_range == 'custom':
+        custom_start, custom_end = args.get('start_date'), args.get('end_date')
+        return (datetime.strptime(custom_start, '%Y-%m-%d').date() if custom_start else None,
+                datetime.strptime(custom_end, '%Y-%m-%d').date() if custom_end else None)
+    return None, None
+
+def category_where(category_id):
+    if not category_id:
+        return {}
+    return {'category_id': None if category_id == 'uncategorized' else category_id}
+
+def month_label(month_key):
+    year, month = month_key.split('-')
+    return f"{MONTH_NAMES[int(month) - 1]} {year}"
+
+def monthly_series(start_date, end_date, where):
+    monthly_data = {}
+    for (month_key, transaction_type), (total, _count) in valued_totals(
+            ('month', 'transaction_type'), start_date, end_date, where=where).items():
+        bucket = monthly_data.setdefault(month_key, {'income': 0, 'expense': 0})
+        if transaction_type in INCOME_TYPES:
+            bucket['income'] += total
+        elif transaction_type in EXPENSE_TYPES:
+            bucket['expense'] += total
+    months = sorted(monthly_data)
+    return {
+        'labels': [month_label(m) for m in months],
+        'income': [float(monthly_data[m]['income']) for m in months],
+        'expense': [float(monthly_data[m]['expense']) for m in months],
+    }
+
+def daily_totals(start_date, end_date, where):
+    """``{day: [income, expense]}`` in the base currency, one grouped query."""
+    month = db.func.strftime('%Y-%m', Transaction.date)
+    query = db.session.query(
+        Transaction.date, Transaction.currency, month, sum_of_types(INCOME_TYPES), sum_of_types(EXPENSE_TYPES)
+    ).filter(Transaction.date.is_not(None))
+    if start_date:
+        query = query.filter(Transaction.date >= start_date)
+    if end_date:
+        query = query.filter(Transaction.date <= end_date)
+    if 'category_id' in where:
+        query = query.filter(Transaction.category_id.is_(None) if where['category_id'] is None
+                             else Transaction.category_id == where['category_id'])
+    days = {}
+    for day, currency, month_key, income, expense in query.group_by(Transaction.date, Transaction.currency):
+        factor = rate_table.factor(currency, month_key)
+        entry = days.setdefault(day, [0, 0])
+        entry[0] += from_minor(income, currency) * factor
+        entry[1] += from_minor(expense, currency) * factor
+    return days
+
+def bucket_series(totals, first, last, step):
+    """Zero-filled ``(labels, income, expense)`` of ``totals`` in buckets of ``step`` days from ``first``."""
+    labels, income, expense = [], [], []
+    day = first
+    while day <= last:
+        bucket_end = day + timedelta(days=step)
+        labels.append(day.isoformat())
+        income.append(0)
+        expense.append(0)
+        while day < bucket_end:
+            entry = totals.get(day)
+            if entry:
+                income[-1] += entry[0]
+                expense[-1] += entry[1]
+            day += timedelta(days=1)
+    return labels, income, expense
+
+def time_series(granularity, start_date, end_date, where, points):
+    """Daily or weekly income/expense series; longer than ``points`` it is merged into wider buckets.
+
+    Buckets sum their days, so a downsampled series keeps the totals of the
+    full one; each bucket is labelled with its first day.
+    """
+    totals = daily_totals(start_date, end_date, where)
+    if not totals and not start_date:
+        return {'labels': [], 'income': [], 'expense': [], 'step': 1}
+    first = start_date or min(totals)
+    last = end_date or max([date.today(), *totals])
+    step = 7 if granularity == 'weekly' else 1
+    if granularity == 'weekly':
+        first -= timedelta(days=first.weekday())
+    buckets = math.ceil(((last - first).days + 1) / step)
+    if buckets > points:
+        step *= math.ceil(buckets / points)
+    labels, income, expense = bucket_series(totals, first, last, step)
+    return {'labels': labels, 'income': [float(v) for v in income], 'expense': [float(v) for v in expense],
+            'step': step}
+
+def group_series(group_key, model, start_date, end_date, types, where):
+    """Totals per category or owner, largest first; rows without one are labelled 'Kategorisiz' / 'Sahipsiz'."""
+    names = {record.id: record.name for record in reference_list(model)}
+    unnamed = 'Kategorisiz' if model is Category else 'Sahipsiz'
+    rows = sorted(((names.get(key, unnamed), total) for (key,), (total, _count) in valued_totals(
+        (group_key,), start_date, end_date, types=types, where=where).items()), key=lambda row: row[1], reverse=True)
+    return {'labels': [name for name, _total in rows], 'data': [float(total) for _name, total in rows]}
+
+def tag_stats(start_date, end_date, where):
+    """Income, expense and row count per tag in the base currency, largest expense first.
+
+    One grouped query from the tag links; a transaction with several tags
+    counts towards each of them.
+    """
+    month = db.func.strftime('%Y-%m', Transaction.date)
+    query = db.session.query(
+        transaction_tags.c.tag_id, Transaction.currency, month, db.func.count(),
+        sum_of_types(INCOME_TYPES), sum_of_types(EXPENSE_TYPES)
+    ).select_from(transaction_tags).join(Transaction, Transaction.id == transaction_tags.c.transaction_id)
+    if start_date:
+        query = query.filter(Transaction.date >= start_date)
+    if end_date:
+        query = query.filter(Transaction.date <= end_date)
+    if 'category_id' in where:
+        query = query.filter(Transaction.category_id.is_(None) if where['category_id'] is None
+                             else Transaction.category_id == where['category_id'])
+    totals = {}
+    for tag_id, currency, month_key, count, income, expense in query.group_by(
+            transaction_tags.c.tag_id, Transaction.currency, month):
+        factor = rate_table.factor(currency, month_key)
+        entry = totals.setdefault(tag_id, {'income': 0, 'expense': 0, 'count': 0})
+        entry['income'] += from_minor(income, currency) * factor
+        entry['expense'] += from_minor(expense, currency) * factor
+        entry['count'] += count
+    stats = [dict(totals[tag.id], tag=tag) for tag in reference_list(Tag) if tag.id in totals]
+    return sorted(stats, key=lambda item: item['expense'], reverse=True)
+
+CHART_SERIES = ('monthly', 'weekly', 'daily', 'category', 'owner')
+
+def chart_series(series):
+    """Chart data of ``series`` for the ``range``, ``category``, ``type`` and ``points`` arguments.
+
+    ``monthly``, ``weekly`` and ``daily`` give income and expense per period;
+    ``category`` and ``owner`` give the totals of one ``type`` (income,
+    expense or all; expense by default) per category or owner.
+    """
+    if series not in CHART_SERIES:
+        abort(404)
+    try:
+        start_date, end_date = report_range(request.args)
+        points = min(max(int(request.args.get('points', DEFAULT_CHART_POINTS)), 2), MAX_CHART_POINTS)
+    except ValueError:
+        abort(400)
+    types = CHART_TYPES.get(request.args.get('type', 'expense'), EXPENSE_TYPES)
+    where = category_where(request.args.get('category'))
+
+    def compute():
+        if series == 'monthly':
+            return monthly_series(start_date, end_date, where)
+        if series in ('weekly', 'daily'):
+            return time_series(series, start_date, end_date, where, points)
+        if series == 'category':
+            return group_series('category_id', Category, start_date, end_date, types, where)
+        return group_series('owner_id', Person, start_date, end_date, types, where)
+
+    # Relative ranges move with the date and valuation with the base currency
+    key = (series, sorted(request.args.items()), date.today(), settings_store.get('default_currency', 'TRY'))
+    return conditional_json(compute, key=key)
+
+def reports():
+    date_range = request.args.get('range', '6m')
+    category_id = request.args.get('category')
+    start_date, end_date = report_range(request.args)
+
+    # Category filter
+    where = category_where(category_id)
+    current_category = None
+    if category_id:
+        if category_id == 'uncategorized':
+            current_category = type('obj', (object,), {'name': 'Kategorisiz', 'icon': '<i class="bi bi-question-circle"></i>'})
+        else:
+            current_category = Category.query.get(category_id)
+
+    # Totals from the rollup; the monthly trend is loaded by the page from the chart API
+    total_income = 0
+    total_expense = 0
+    for (transaction_type,), (total, _count) in valued_totals(('transaction_type',), start_date, end_date, where=where).items():
+        if transaction_type in INCOME_TYPES:
+            total_income += total
+        elif transaction_type in EXPENSE_TYPES:
+            total_expense += total
+    
+    # Category Stats
+    categories = reference_list(Category)
+    categories_by_id = {c.id: c for c in categories}
+    category_stats = []
+    for (cat_id,), (total, _count) in valued_totals(('category_id',), start_date, end_date, types=EXPENSE_TYPES, where=where).items():
+        if cat_id in categories_by_id:
+            category_stats.append({
+                'category': categories_by_id[cat_id],
+                'total': total,
+                'percentage': (total / total_expense * 100) if total_expense > 0 else 0
+            })
+    category_stats.sort(key=lambda x: x['total'], reverse=True)
+
+    return render_template('reports.html', 
+                          total_income=total_income, 
+                          total_expense=total_expense,
+                          category_stats=category_stats,
+                          tag_stats=tag_stats(start_date, end_date, where),
+                          chart_args={k: v for k, v in request.args.items() if v},
+                          current_range=date_range,
+                          current_category=current_category,
+                          categories=categories)
+
+def chart_data_api():
+    def compute():
+        # Monthly spending trend (Last 6 months)
+        start_date = date.today() - relativedelta(months=6)
+        monthly_data = sorted(
+            (month, total) for (month,), (total, _count) in valued_totals(('month',), start_date, types=EXPENSE_TYPES).items()
+        )
+
+        # Category breakdown (All time)
+        by_category = valued_totals(('category_id',), types=EXPENSE_TYPES)
+        category_data = [(c.name, by_category[(c.id,)][0])
+                         for c in reference_list(Category) if (c.id,) in by_category]
+
+        return {
+            'monthly': {'labels': [m[0] for m in monthly_data], 'data': [float(m[1] or 0) for m in monthly_data]},
+            'categories': {'labels': [c[0] for c in category_data], 'data': [float(c[1] or 0) for c in category_data]}
+        }
+
+    return conditional_json(compute, key=('chart-data', date.today(), settings_store.get('default_currency', 'TRY')))
+
+def reference_cache_stats():
+    return jsonify(reference_cache.stats())
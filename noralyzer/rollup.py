@@ -0,0 +1,136 @@
+"""Monthly transaction totals, kept in sync by a write hook.
+
+A transaction without a category or owner is counted under 0, so every key
+is non-NULL and one upsert per batch of changes maintains the table.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .extensions import db
+from .hooks import on_transaction_write
+from .models import MonthlyRollup, Transaction
+from .money import from_minor
+
+ROLLUP_KEYS = ('month', 'category_id', 'transaction_type', 'currency', 'owner_id')
+# Stored in place of NULL
+ROLLUP_EMPTY = {'category_id': 0, 'owner_id': 0}
+
+@on_transaction_write
+def _update_monthly_rollup(connection, changes):
+    deltas = {}
+    for sign, row in changes:
+        if row['date'] is None:
+            continue
+        key = (row['date'].strftime('%Y-%m'), row['category_id'] or 0, row['transaction_type'], row['currency'],
+               row['owner_id'] or 0)
+        delta = deltas.setdefault(key, [0, 0])
+        delta[0] += sign * row['amount_minor']
+        delta[1] += sign
+    deltas = {key: delta for key, delta in deltas.items() if delta != [0, 0]}
+    if not deltas:
+        return
+
+    table = MonthlyRollup.__table__
+    statement = sqlite_insert(table)
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=list(ROLLUP_KEYS),
+        set_={'total_minor': table.c.total_minor + statement.excluded.total_minor,
+              'count': table.c.count + statement.excluded.count}
+    ), [dict(zip(ROLLUP_KEYS, key), total_minor=total, count=count) for key, (total, count) in deltas.items()])
+    emptied = [dict(zip(ROLLUP_KEYS, key)) for key, (_total, count) in deltas.items() if count < 0]
+    if emptied:
+        connection.execute(table.delete().where(
+            *[table.c[name] == db.bindparam(name) for name in ROLLUP_KEYS], table.c.count <= 0), emptied)
+
+def rebuild_rollup():
+    """Recompute MonthlyRollup from scratch (after bulk deletes or on first start)."""
+    month = db.func.strftime('%Y-%m', Transaction.date)
+    category_id = db.func.coalesce(Transaction.category_id, ROLLUP_EMPTY['category_id'])
+    owner_id = db.func.coalesce(Transaction.owner_id, ROLLUP_EMPTY['owner_id'])
+    source = db.select(
+        month, category_id, Transaction.transaction_type, Transaction.currency, owner_id,
+        db.func.sum(Transaction.amount_minor), db.func.count(Transaction.id)
+    ).where(Transaction.date.is_not(None)).group_by(
+        month, category_id, Transaction.transaction_type, Transaction.currency, owner_id
+    )
+    db.session.execute(MonthlyRollup.__table__.delete())
+    db.session.execute(MonthlyRollup.__table__.insert().from_select(list(ROLLUP_KEYS) + ['total_minor', 'count'], source))
+
+def next_month(day):
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+def rollup_totals(group_by=(), start_date=None, end_date=None, types=None, where=None):
+    """Sum transactions grouped by ``group_by`` (names from ROLLUP_KEYS).
+
+    Whole months inside [start_date, end_date] are read from MonthlyRollup;
+    partial months at either edge are aggregated from Transaction directly.
+    ``where`` maps key names to required values (None means IS NULL).
+    Returns ``{group key tuple: [total, count]}``; SQL sums minor units per
+    currency and the exact totals are added up as Decimals.
+    """
+    where = where or {}
+    columns = tuple(group_by) + (() if 'currency' in group_by else ('currency',))
+    currency_index = columns.index('currency')
+    rollup_columns = {name: getattr(MonthlyRollup, name) for name in ROLLUP_KEYS}
+    raw_columns = {name: getattr(Transaction, name) for name in ROLLUP_KEYS if name != 'month'}
+    raw_columns['month'] = db.func.strftime('%Y-%m', Transaction.date)
+
+    def conditions(columns, empty):
+        conds = [columns[name].is_not_distinct_from(empty.get(name) if value is None else value)
+                 for name, value in where.items()]
+        if types is not None:
+            conds.append(columns['transaction_type'].in_(types))
+        return conds
+
+    # Split the range into whole months (rollup) and partial edge months (raw rows)
+    raw_ranges = []
+    first_month = start_date
+    if start_date and start_date.day != 1:
+        first_month = next_month(start_date)
+        leading_end = first_month - timedelta(days=1)
+        raw_ranges.append((start_date, min(leading_end, end_date) if end_date else leading_end))
+    end_month = None
+    if end_date:
+        end_month = next_month(end_date)
+        if end_month - timedelta(days=1) != end_date:
+            end_month = end_date.replace(day=1)
+            trailing_start = max(end_month, start_date) if start_date else end_month
+            if not raw_ranges or trailing_start >= first_month:
+                raw_ranges.append((trailing_start, end_date))
+
+    # (query, stored value of each group_by key standing for NULL)
+    queries = []
+    for range_start, range_end in raw_ranges:
+        queries.append((db.select(
+            *[raw_columns[name] for name in columns],
+            db.func.sum(Transaction.amount_minor), db.func.count(Transaction.id)
+        ).where(
+            Transaction.date >= range_start, Transaction.date <= range_end, *conditions(raw_columns, {})
+        ).group_by(*[raw_columns[name] for name in columns]), ()))
+
+    rollup_conds = conditions(rollup_columns, ROLLUP_EMPTY)
+    if first_month:
+        rollup_conds.append(MonthlyRollup.month >= first_month.strftime('%Y-%m'))
+    if end_month:
+        rollup_conds.append(MonthlyRollup.month < end_month.strftime('%Y-%m'))
+    if not (first_month and end_month and first_month >= end_month):
+        queries.append((db.select(
+            *[rollup_columns[name] for name in columns],
+            db.func.sum(MonthlyRollup.total_minor), db.func.sum(MonthlyRollup.count)
+        ).where(*rollup_conds).group_by(*[rollup_columns[name] for name in columns]),
+            [ROLLUP_EMPTY.get(name) for name in group_by]))
+
+    totals = {}
+    for query, empty in queries:
+        for row in db.session.execute(query):
+            if not row[-1]:
+                continue
+            key = tuple(row[:len(group_by)])
+            if empty:
+                key = tuple(None if value == stored else value for value, stored in zip(key, empty))
+            entry = totals.setdefault(key, [Decimal(0), 0])
+            entry[0] += from_minor(row[-2] or 0, row[currency_index])
+            entry[1] += row[-1]
+    return totals
@@ -0,0 +1,181 @@
+"""Schema migrations and first-start setup.
+
+A database that has been brought up to date carries a stamp of the schema in
+``PRAGMA user_version``. While the stamp matches, starting the application
+skips the table, column and index checks, the default data and the derived
+table rebuilds, so a restart or a new worker process only opens the file.
+"""
+import hashlib
+from functools import lru_cache
+
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from .changes import CHANGE_TRIGGERS, create_change_triggers
+from .constants import CURRENCIES
+from .extensions import db
+from .ledger import rebuild_ledger
+from .models import Category, LedgerPosting, MonthlyRollup, Transaction, transaction_tags
+from .money import DEFAULT_SCALE, currency_scale
+from .rollup import rebuild_rollup
+from .search import SEARCH_TRIGGERS, create_search_index
+
+DEFAULT_CATEGORIES = [
+    ('Yemek', '🍔', '#e74c3c'),
+    ('Ulaşım', '🚗', '#3498db'),
+    ('Kira', '🏠', '#9b59b6'),
+    ('Eğlence', '🎮', '#f39c12'),
+    ('Sağlık', '💊', '#1abc9c'),
+    ('Giyim', '👕', '#e91e63'),
+    ('Faturalar', '📄', '#607d8b'),
+    ('Market', '🛒', '#4caf50'),
+    ('Diğer', '📦', '#95a5a6')
+]
+
+# Float money columns of databases created before amounts were kept in minor
+# units: table -> (currency column or None, [(float column, minor column)])
+FLOAT_MONEY_COLUMNS = {
+    'transaction': ('currency', [('amount', 'amount_minor')]),
+    'quick_transaction': ('currency', [('amount', 'amount_minor')]),
+    'budget': (None, [('amount', 'amount_minor')]),
+    'saving_goal': (None, [('target_amount', 'target_amount_minor'), ('current_amount', 'current_amount_minor')]),
+}
+# Derived tables are emptied instead; init_db rebuilds them from the transactions
+FLOAT_DERIVED_COLUMNS = {'monthly_rollup': 'total', 'ledger_posting': 'amount', 'balance_snapshot': 'balance'}
+# Derived tables emptied before a new unique index is created on them, as their old
+# rows may not fit it (NULL keys of the monthly rollup); init_db rebuilds them
+REBUILT_TABLES = {'monthly_rollup'}
+# Indexes replaced by others
+OBSOLETE_INDEXES = ('ix_monthly_rollup_key',)
+
+def migrate_money_columns(connection, columns):
+    """Convert float money columns to minor units and drop them.
+
+    ``columns`` maps table names to their column names before the migration.
+    Returns True when anything was converted.
+    """
+    scales = {code: currency_scale(code) for codes in CURRENCIES.values() for code in codes}
+    migrated = False
+    for table, (currency_column, pairs) in FLOAT_MONEY_COLUMNS.items():
+        if currency_column:
+            factor = 'CASE "{}" {} ELSE {} END'.format(currency_column, ' '.join(
+                f"WHEN '{code}' THEN {10 ** scale}" for code, scale in scales.items() if scale != DEFAULT_SCALE
+            ), 10 ** DEFAULT_SCALE)
+        else:
+            factor = str(10 ** DEFAULT_SCALE)
+        for float_column, minor_column in pairs:
+            if float_column not in columns.get(table, ()):
+                continue
+            connection.exec_driver_sql(
+                f'UPDATE "{table}" SET "{minor_column}" = CAST(ROUND("{float_column}" * {factor}) AS INTEGER) '
+                f'WHERE "{float_column}" IS NOT NULL'
+            )
+            connection.exec_driver_sql(f'ALTER TABLE "{table}" DROP COLUMN "{float_column}"')
+            migrated = True
+    for table, float_column in FLOAT_DERIVED_COLUMNS.items():
+        if float_column in columns.get(table, ()):
+            connection.exec_driver_sql(f'DELETE FROM "{table}"')
+            connection.exec_driver_sql(f'ALTER TABLE "{table}" DROP COLUMN "{float_column}"')
+            migrated = True
+    return migrated
+
+def migrate_tag_links(connection):
+    """Rebuild a ``transaction_tags`` table created without its primary key; returns True if it was.
+
+    SQLite cannot add a primary key to a table, so the links are copied into
+    a new one, dropping duplicates and links with a missing side. Its search
+    index triggers go with the old table and are created again by
+    ``create_search_index``.
+    """
+    columns = connection.exec_driver_sql('PRAGMA table_info(transaction_tags)').all()
+    if not columns or any(column[5] for column in columns):
+        return False
+    connection.exec_driver_sql('ALTER TABLE transaction_tags RENAME TO transaction_tags_old')
+    transaction_tags.create(connection)
+    connection.exec_driver_sql(
+        'INSERT OR IGNORE INTO transaction_tags (transaction_id, tag_id) '
+        'SELECT DISTINCT transaction_id, tag_id FROM transaction_tags_old '
+        'WHERE transaction_id IN (SELECT id FROM "transaction") AND tag_id IN (SELECT id FROM tag)')
+    connection.exec_driver_sql('DROP TABLE transaction_tags_old')
+    return True
+
+def migrate_db():
+    """Bring an existing database up to the models: create missing tables, columns and indexes."""
+    db.create_all()
+    with db.engine.begin() as connection:
+        # Before the index checks, which would otherwise index the old table
+        migrated_tags = migrate_tag_links(connection)
+    inspector = db.inspect(db.engine)
+    created = migrated_tags
+    existing_columns = {}
+    for table in db.metadata.sorted_tables:
+        columns = existing_columns[table.name] = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in columns:
+                # New columns are nullable, so a plain ADD COLUMN is enough on SQLite
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                with db.engine.begin() as connection:
+                    connection.exec_driver_sql(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}')
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                if index.unique and table.name in REBUILT_TABLES:
+                    with db.engine.begin() as connection:
+                        connection.exec_driver_sql(f'DELETE FROM "{table.name}"')
+                index.create(db.engine)
+                created = True
+    with db.engine.begin() as connection:
+        for name in OBSOLETE_INDEXES:
+            connection.exec_driver_sql(f'DROP INDEX IF EXISTS {name}')
+        created |= migrate_money_columns(connection, existing_columns)
+        created |= create_search_index(connection)
+        create_change_triggers(connection)
+    if created:
+        # Refresh planner statistics so SQLite picks up the new indexes
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql('ANALYZE')
+
+@lru_cache(maxsize=None)
+def schema_version():
+    """Stamp of the schema this code expects: a hash of the table, index and trigger DDL.
+
+    Any change to the models or the triggers gives a new stamp, so the
+    next start runs the checks again. Fits the 32-bit ``user_version``.
+    """
+    dialect = sqlite.dialect()
+    ddl = []
+    for table in db.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=dialect)))
+        ddl += sorted(str(CreateIndex(index).compile(dialect=dialect)) for index in table.indexes)
+    triggers = {**SEARCH_TRIGGERS, **CHANGE_TRIGGERS}
+    ddl += [f'{name} {event_clause} {body}' for name, (event_clause, body) in sorted(triggers.items())]
+    return int(hashlib.sha256('\n'.join(ddl).encode()).hexdigest()[:7], 16) or 1
+
+def stored_schema_version():
+    return db.session.execute(db.text('PRAGMA user_version')).scalar()
+
+def init_db(app, force=False):
+    """Migrate and seed the database of ``app`` unless it carries the current schema stamp.
+
+    ``force`` runs every check whatever the stamp says (after a reset).
+    With a current stamp nothing is written; the daily catch-up work is
+    left to ``maintenance``.
+    """
+    with app.app_context():
+        version = schema_version()
+        if force or stored_schema_version() != version:
+            migrate_db()
+            # Add default categories if empty
+            if Category.query.count() == 0:
+                for name, icon, color in DEFAULT_CATEGORIES:
+                    db.session.add(Category(name=name, icon=icon, color=color))
+                db.session.commit()
+            # Build the monthly rollup for databases created before it existed
+            if MonthlyRollup.query.first() is None and Transaction.query.first() is not None:
+                rebuild_rollup()
+                db.session.commit()
+            # Same for the ledger
+            if LedgerPosting.query.first() is None and Transaction.query.first() is not None:
+                rebuild_ledger()
+            db.session.execute(db.text(f'PRAGMA user_version = {version}'))
+            db.session.commit()
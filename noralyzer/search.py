@@ -0,0 +1,100 @@
+"""Full-text search over transactions.
+
+Free-text search runs on an FTS5 table holding one document per transaction:
+its description plus the category, person, place and tag names. SQLite
+triggers keep it in sync with every write, ORM or bulk, including renames of
+the referenced records.
+"""
+import re
+
+from .extensions import db
+
+SEARCH_COLUMNS = ('description', 'category', 'people', 'place', 'tags')
+SEARCH_WEIGHTS = (10.0, 4.0, 4.0, 4.0, 3.0)
+
+# The unicode61 tokenizer folds ş/ç/ö/ü/ğ but not the dotless ı, so documents
+# and queries both have ı and İ replaced with i
+SEARCH_FOLD = {'ı': 'i', 'İ': 'i'}
+
+def _fold_sql(expression):
+    for char, replacement in SEARCH_FOLD.items():
+        expression = f"replace({expression}, '{char}', '{replacement}')"
+    return expression
+
+SEARCH_DOCUMENT = f"""
+    SELECT t.id, {_fold_sql('t.description')},
+        (SELECT {_fold_sql('name')} FROM category WHERE id = t.category_id),
+        (SELECT {_fold_sql("group_concat(name, ' ')")} FROM person WHERE id IN (t.person_id, t.owner_id)),
+        (SELECT {_fold_sql('name')} FROM place WHERE id = t.place_id),
+        (SELECT {_fold_sql("group_concat(tag.name, ' ')")} FROM transaction_tags
+            JOIN tag ON tag.id = transaction_tags.tag_id WHERE transaction_tags.transaction_id = t.id)
+    FROM "transaction" t WHERE {{condition}}"""
+
+def _search_refresh(condition):
+    """Trigger body re-indexing the transactions matching ``condition``."""
+    return (f'DELETE FROM transaction_search WHERE rowid IN (SELECT t.id FROM "transaction" t WHERE {condition}); '
+            f'INSERT INTO transaction_search(rowid, {", ".join(SEARCH_COLUMNS)}) '
+            + SEARCH_DOCUMENT.format(condition=condition) + ';')
+
+SEARCH_TRIGGERS = {
+    'transaction_search_ai': ('AFTER INSERT ON "transaction"', _search_refresh('t.id = new.id')),
+    'transaction_search_au': ('AFTER UPDATE OF description, category_id, person_id, owner_id, place_id ON "transaction"',
+                              _search_refresh('t.id = new.id')),
+    'transaction_search_ad': ('AFTER DELETE ON "transaction"', 'DELETE FROM transaction_search WHERE rowid = old.id;'),
+    'transaction_search_tag_ai': ('AFTER INSERT ON transaction_tags', _search_refresh('t.id = new.transaction_id')),
+    'transaction_search_tag_ad': ('AFTER DELETE ON transaction_tags', _search_refresh('t.id = old.transaction_id')),
+    'transaction_search_category_au': ('AFTER UPDATE OF name ON category', _search_refresh('t.category_id = new.id')),
+    'transaction_search_person_au': ('AFTER UPDATE OF name ON person',
+                                     _search_refresh('(t.person_id = new.id OR t.owner_id = new.id)')),
+    'transaction_search_place_au': ('AFTER UPDATE OF name ON place', _search_refresh('t.place_id = new.id')),
+    'transaction_search_tag_au': ('AFTER UPDATE OF name ON tag', _search_refresh(
+        't.id IN (SELECT transaction_id FROM transaction_tags WHERE tag_id = new.id)')),
+}
+
+def create_search_index(connection):
+    """Create the FTS table and its triggers when missing; returns True if the index was (re)built.
+
+    Dropping an indexed table drops its triggers too, so a missing trigger
+    means the index may be stale and it is rebuilt.
+    """
+    existing = {name for name, in connection.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE name LIKE 'transaction_search%'")}
+    exists = 'transaction_search' in existing
+    if not exists:
+        connection.exec_driver_sql(
+            f'CREATE VIRTUAL TABLE transaction_search USING fts5({", ".join(SEARCH_COLUMNS)}, '
+            "tokenize = 'unicode61 remove_diacritics 2')")
+        connection.exec_driver_sql(
+            "INSERT INTO transaction_search(transaction_search, rank) "
+            f"VALUES ('rank', 'bm25({', '.join(map(str, SEARCH_WEIGHTS))})')")
+    missing = [name for name in SEARCH_TRIGGERS if name not in existing]
+    for name in missing:
+        event_clause, body = SEARCH_TRIGGERS[name]
+        connection.exec_driver_sql(f'CREATE TRIGGER {name} {event_clause} BEGIN {body} END')
+    if missing:
+        rebuild_search_index(connection)
+    return bool(missing)
+
+def rebuild_search_index(connection):
+    connection.exec_driver_sql('DELETE FROM transaction_search')
+    connection.exec_driver_sql(f'INSERT INTO transaction_search(rowid, {", ".join(SEARCH_COLUMNS)}) '
+                               + SEARCH_DOCUMENT.format(condition='1'))
+
+def search_match(text):
+    """FTS5 query for rows containing every word of ``text`` (words match as prefixes); None if there are none."""
+    for char, replacement in SEARCH_FOLD.items():
+        text = (text or '').replace(char, replacement)
+    words = re.findall(r'\w+', text)
+    return ' '.join(f'"{word}"*' for word in words) or None
+
+def search_ranks(text):
+    """Subquery of ``(id, rank)`` for the transactions matching ``text``; None for an empty search."""
+    match = search_match(text)
+    if match is None:
+        return None
+    search = db.table('transaction_search', db.column('rowid'), db.column('rank'))
+    # LIMIT -1 keeps SQLite from flattening the subquery: MATCH then runs once and
+    # the matches drive the join, instead of one full-text lookup per transaction
+    return db.select(search.c.rowid.label('id'), search.c.rank.label('rank')).where(
+        db.literal_column('transaction_search').op('MATCH')(match)
+    ).limit(-1).subquery()
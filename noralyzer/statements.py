@@ -0,0 +1,130 @@
+"""Bank and card statement imports.
+
+Bank and card statements are CSV files whose layout differs per bank. Each
+bank keeps a column mapping in ``Bank.statement_profile``; rows are hashed
+into ``Transaction.fingerprint`` (unique index) so overlapping statements
+can be imported again without creating duplicates.
+"""
+import csv
+import hashlib
+import itertools
+from datetime import datetime
+from decimal import Decimal
+
+from flask import current_app
+
+from .extensions import db
+from .hooks import insert_transaction_rows
+from .models import Transaction
+from .money import from_minor, to_minor
+
+STATEMENT_PROFILE_DEFAULTS = {
+    'delimiter': ';',
+    'skip_rows': 0,                  # Lines above the header row
+    'date_column': 'Tarih',
+    'date_format': '%d.%m.%Y',
+    'time_column': '',
+    'description_column': 'Açıklama',
+    'amount_column': 'Tutar',
+    'decimal_separator': ',',
+    'currency_column': '',
+    'currency': 'TRY',               # Used when there is no currency column
+    'positive_is_expense': False,    # Card statements list spending as positive amounts
+}
+
+def statement_profile(bank):
+    return {**STATEMENT_PROFILE_DEFAULTS, **(bank.statement_profile or {})}
+
+def statement_profile_from_form(form):
+    profile = {}
+    for key, default in STATEMENT_PROFILE_DEFAULTS.items():
+        field = f'profile_{key}'
+        if isinstance(default, bool):
+            profile[key] = bool(form.get(field))
+        elif isinstance(default, int):
+            profile[key] = int(form.get(field) or 0)
+        else:
+            profile[key] = form.get(field, '').strip() or default
+    if profile['delimiter'] == '\\t':
+        profile['delimiter'] = '\t'
+    return profile
+
+def parse_statement_amount(text, decimal_separator=','):
+    value = (text or '').strip().replace(' ', '').replace('\xa0', '')
+    negative = value.startswith('(') and value.endswith(')') or value.endswith('-')
+    value = value.strip('()').rstrip('-')
+    thousands = '.' if decimal_separator == ',' else ','
+    value = value.replace(thousands, '').replace(decimal_separator, '.')
+    amount = Decimal(''.join(c for c in value if c.isdigit() or c in '.-'))
+    return -amount if negative else amount
+
+def statement_fingerprint(bank_id, card_id, tx_date, time, amount, currency, description, occurrence):
+    """Hash of the fields a statement line is identified by.
+
+    ``occurrence`` numbers identical lines within one file (two equal coffees on
+    the same day), so they stay distinct but still match on re-import. The
+    amount is written at its currency's scale, as it is stored.
+    """
+    exact = from_minor(to_minor(amount, currency), currency)
+    key = '|'.join([str(bank_id), str(card_id or ''), tx_date.isoformat(), time or '', f'{exact:f}',
+                    currency, ' '.join((description or '').split()).casefold(), str(occurrence)])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+def iter_statement_rows(stream, profile, bank_id, card_id=None):
+    """Yield transaction rows, fingerprint included, for each line of a statement CSV."""
+    for _ in range(profile['skip_rows']):
+        stream.readline()
+    occurrences = {}
+    reader = csv.DictReader(stream, delimiter=profile['delimiter'])
+    for row in reader:
+        raw_date = (row.get(profile['date_column']) or '').strip()
+        raw_amount = (row.get(profile['amount_column']) or '').strip()
+        if not raw_date or not raw_amount:
+            continue  # Blank and summary lines
+        try:
+            tx_date = datetime.strptime(raw_date, profile['date_format']).date()
+            amount = parse_statement_amount(raw_amount, profile['decimal_separator'])
+        except (ValueError, ArithmeticError):
+            raise ValueError(f'{reader.line_num + profile["skip_rows"]}. satır okunamadı: {raw_date} / {raw_amount}')
+        time = (row.get(profile['time_column']) or '').strip()[:5] or None
+        currency = (row.get(profile['currency_column']) or '').strip().upper() or profile['currency']
+        description = (row.get(profile['description_column']) or '').strip() or None
+        if profile['positive_is_expense']:
+            amount = -amount
+        key = (tx_date, time, amount, currency, description)
+        occurrences[key] = occurrences.get(key, 0) + 1
+        yield {
+            'amount_minor': to_minor(abs(amount), currency), 'currency': currency,
+            'transaction_type': 'expense' if amount < 0 else 'income',
+            'description': description, 'date': tx_date, 'time': time,
+            'bank_id': bank_id, 'card_id': card_id,
+            'fingerprint': statement_fingerprint(bank_id, card_id, *key, occurrences[key]),
+        }
+
+def existing_fingerprints(fingerprints):
+    if not fingerprints:
+        return set()
+    return set(db.session.execute(
+        db.select(Transaction.fingerprint).where(Transaction.fingerprint.in_(fingerprints))
+    ).scalars())
+
+def import_statement(stream, bank, card_id=None, batch_size=None):
+    """Insert the new lines of a statement in batches; returns ``(inserted, skipped)``.
+
+    Lines whose fingerprint already exists are skipped before anything is written.
+    Nothing is committed here.
+    """
+    batch_size = batch_size or current_app.config['IMPORT_BATCH_SIZE']
+    rows = iter_statement_rows(stream, statement_profile(bank), bank.id, card_id)
+    inserted = skipped = 0
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return inserted, skipped
+        known = existing_fingerprints([row['fingerprint'] for row in batch])
+        new_rows = [row for row in batch if row['fingerprint'] not in known]
+        if new_rows:
+            insert_transaction_rows(new_rows)
+        inserted += len(new_rows)
+        skipped += len(batch) - len(new_rows)
+        current_app.logger.info('Statement import for bank %s: %s inserted, %s skipped', bank.id, inserted, skipped)
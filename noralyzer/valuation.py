@@ -0,0 +1,138 @@
+"""Currency rates and base-currency valuation.
+
+Amounts are stored in their own currency. Aggregates are converted to the
+``default_currency`` setting: SQL sums each month × currency group and every
+group is converted once at that month's rate, so the work grows with the
+number of groups rather than the number of rows.
+"""
+import csv
+import itertools
+import threading
+from bisect import bisect_right
+from datetime import date
+from decimal import Decimal
+from functools import lru_cache
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .cache import settings_store
+from .changes import change_versions
+from .constants import CURRENCY_SYMBOLS, STUB_RATES
+from .extensions import app_state, db
+from .models import CurrencyRate
+from .rollup import rollup_totals
+
+class RateTable:
+    """Daily TRY rates per currency from CurrencyRate, with memoized lookups.
+
+    ``CASH_X`` is valued as ``X``. A currency without loaded rates falls back
+    to STUB_RATES; dates before its first rate use the earliest one. Both
+    are dropped when the currency_rate counter moves.
+    """
+
+    def __init__(self):
+        self._series = None
+        self._version = None
+        self._lock = threading.Lock()
+        self._rate_cache = lru_cache(maxsize=4096)(self._rate)
+
+    def _check_version(self):
+        version = change_versions('currency_rate')
+        if version != self._version:
+            self.invalidate()
+            self._version = version
+
+    def rate(self, currency, day):
+        self._check_version()
+        return self._rate_cache(currency, day)
+
+    def series(self):
+        self._check_version()
+        if self._series is None:
+            series = {}
+            for currency, day, rate in db.session.execute(
+                db.select(CurrencyRate.currency, CurrencyRate.date, CurrencyRate.rate)
+                .order_by(CurrencyRate.currency, CurrencyRate.date)
+            ):
+                dates, rates = series.setdefault(currency, ([], []))
+                dates.append(day)
+                rates.append(rate)
+            with self._lock:
+                self._series = series
+        return self._series
+
+    def _rate(self, currency, day):
+        if currency.startswith('CASH_'):
+            currency = currency[len('CASH_'):]
+        if currency == 'TRY':
+            return 1.0
+        series = self.series().get(currency)
+        if not series:
+            return STUB_RATES.get(currency, 1.0)
+        dates, rates = series
+        return rates[max(bisect_right(dates, day) - 1, 0)]
+
+    def factor(self, currency, month=None, target=None):
+        """Decimal multiplier from ``currency`` to ``target`` (the base currency) for a ``YYYY-MM`` month."""
+        day = date(int(month[:4]), int(month[5:7]), 15) if month else date.today()
+        target = target or base_currency()
+        if currency == target:
+            return Decimal(1)
+        return Decimal(repr(self.rate(currency, day))) / Decimal(repr(self.rate(target, day)))
+
+    def latest(self):
+        return {currency: (dates[-1], rates[-1]) for currency, (dates, rates) in self.series().items()}
+
+    def invalidate(self):
+        with self._lock:
+            self._series = None
+        self._rate_cache.cache_clear()
+
+rate_table = app_state('rate_table')
+
+def base_currency():
+    return settings_store.get('default_currency', 'TRY')
+
+def valued_totals(group_by=(), start_date=None, end_date=None, types=None, where=None):
+    """``rollup_totals`` with every total converted to the base currency."""
+    detail = tuple(group_by) + tuple(name for name in ('month', 'currency') if name not in group_by)
+    month_index, currency_index = detail.index('month'), detail.index('currency')
+    totals = {}
+    for key, (total, count) in rollup_totals(detail, start_date, end_date, types, where).items():
+        entry = totals.setdefault(key[:len(group_by)], [Decimal(0), 0])
+        entry[0] += total * rate_table.factor(key[currency_index], key[month_index])
+        entry[1] += count
+    return totals
+
+def import_rates(stream, batch_size=None):
+    """Upsert ``currency,date,rate`` CSV rows (ISO dates, TRY per unit); returns the row count."""
+    batch_size = batch_size or current_app.config['IMPORT_BATCH_SIZE']
+    statement = sqlite_insert(CurrencyRate)
+    statement = statement.on_conflict_do_update(
+        index_elements=[CurrencyRate.currency, CurrencyRate.date], set_={'rate': statement.excluded.rate}
+    )
+    rows = ({'currency': row['currency'].strip().upper(), 'date': date.fromisoformat(row['date'].strip()),
+             'rate': float(row['rate'])} for row in csv.DictReader(stream))
+    count = 0
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return count
+        db.session.execute(statement, batch)
+        count += len(batch)
+
+def inject_base_currency():
+    return {'base_symbol': CURRENCY_SYMBOLS.get(base_currency(), base_currency())}
+
+@click.command('import-rates')
+@click.argument('rates_file', type=click.File(encoding='utf-8-sig'))
+@with_appcontext
+def import_rates_command(rates_file):
+    """Load daily currency rates from a currency,date,rate CSV file."""
+    count = import_rates(rates_file)
+    db.session.commit()
+    rate_table.invalidate()
+    click.echo(f'{count} rates imported')
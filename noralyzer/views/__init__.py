@@ -0,0 +1,36 @@
+"""Blueprints of the application, one per area.
+
+Everyday pages are plain blueprint views. Rarely used areas (reports, the
+JSON API, backup and maintenance jobs) register their URL rules up front but
+import the module holding their views only when one of them is first
+requested, which keeps those modules and their dependencies out of startup.
+"""
+from functools import cached_property
+
+from werkzeug.utils import import_string
+
+
+class LazyView:
+    """View function given by its import name, imported on the first request it serves."""
+
+    def __init__(self, import_name):
+        self.__module__, self.__name__ = import_name.rsplit('.', 1)
+        self.import_name = import_name
+
+    @cached_property
+    def view(self):
+        return import_string(self.import_name)
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+def lazy_routes(blueprint, module, routes):
+    """Add ``(rule, view name, methods)`` routes whose views are functions of ``module``."""
+    for rule, name, methods in routes:
+        blueprint.add_url_rule(rule, view_func=LazyView(f'{module}.{name}'), methods=methods)
+
+def register_blueprints(app):
+    from . import api, banks, budgets, contacts, reports, settings, transactions
+
+    for module in (transactions, banks, contacts, budgets, settings, reports, api):
+        app.register_blueprint(module.bp)
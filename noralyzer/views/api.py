@@ -0,0 +1,23 @@
+"""Versioned JSON API; the views live in ``noralyzer.api``."""
+from flask import Blueprint
+
+from . import lazy_routes
+
+bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+lazy_routes(bp, 'noralyzer.api', [
+    ('/transactions', 'api_transactions', ['GET']),
+    ('/transactions', 'api_create_transaction', ['POST']),
+    ('/transactions/<int:id>', 'api_transaction', ['GET']),
+    ('/transactions/<int:id>', 'api_update_transaction', ['PATCH']),
+    ('/transactions/<int:id>', 'api_delete_transaction', ['DELETE']),
+    ('/transactions/batch', 'api_transaction_batch', ['POST']),
+    ('/jobs', 'api_jobs', ['GET']),
+    ('/jobs/<id>', 'api_job', ['GET']),
+    ('/<resource>', 'api_references', ['GET']),
+    ('/<resource>', 'api_create_reference', ['POST']),
+    ('/<resource>/<int:id>', 'api_reference', ['GET']),
+    ('/<resource>/<int:id>', 'api_update_reference', ['PATCH']),
+    ('/<resource>/<int:id>', 'api_delete_reference', ['DELETE']),
+    ('/<resource>/batch', 'api_reference_batch', ['POST']),
+])
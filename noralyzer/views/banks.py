@@ -0,0 +1,179 @@
+"""Bank, card and statement import pages."""
+import io
+from datetime import date, datetime
+
+from flask import Blueprint, flash, jsonify, redirect, render_template, request, url_for
+
+from ..aggregation import entity_report, grouped_totals
+from ..cache import reference_list
+from ..constants import CURRENCY_SYMBOLS, EXPENSE_TYPES
+from ..extensions import db
+from ..ledger import account_balances
+from ..models import Bank, Card, Transaction
+from ..queries import transaction_query
+from ..statements import import_statement, statement_profile, statement_profile_from_form
+from ..valuation import rate_table
+from .contacts import report_page
+
+bp = Blueprint('banks', __name__)
+
+@bp.route('/banks')
+def banks():
+    as_of = request.args.get('as_of')
+    as_of = datetime.strptime(as_of, '%Y-%m-%d').date() if as_of else None
+    banks = Bank.query.order_by(Bank.is_favorite.desc(), Bank.name).all()
+    
+    # Bank analysis: flows from the transactions, balances from the ledger
+    totals = grouped_totals(Transaction.bank_id,
+                            income=['income', 'bank_deposit', 'transfer'],
+                            expense=['expense', 'atm_withdraw', 'cash_out'])
+    month = (as_of or date.today()).strftime('%Y-%m')
+    balances = account_balances(as_of)
+    valued = {}
+    for (account, currency), balance in balances.items():
+        valued[account] = valued.get(account, 0) + balance * rate_table.factor(currency, month)
+    bank_stats = []
+    for bank in banks:
+        stats = totals.get(bank.id, {'income': 0, 'expense': 0})
+        bank_stats.append({'bank': bank, 'income': stats['income'], 'expense': stats['expense'],
+                           'balance': valued.get(f'bank:{bank.id}', 0)})
+    
+    # Cards and cash/crypto/gold wallets, in their own currency
+    card_names = {f'card:{card.id}': card.name for card in reference_list(Card)}
+    wallet_names = {'cash': 'Nakit', 'crypto': 'Kripto', 'gold': 'Altın'}
+    wallets = [{'name': card_names.get(account) or wallet_names.get(account, account), 'currency': currency,
+                'balance': balance}
+               for (account, currency), balance in sorted(balances.items())
+               if not account.startswith('bank:') and balance]
+    
+    return render_template('banks.html', bank_stats=bank_stats, wallets=wallets, as_of=as_of,
+                           currency_symbols=CURRENCY_SYMBOLS)
+
+@bp.route('/banks/add', methods=['GET', 'POST'])
+def add_bank():
+    if request.method == 'POST':
+        bank = Bank(
+            name=request.form['name'],
+            holder_name=request.form.get('holder_name'),
+            iban=request.form.get('iban'),
+            account_type=request.form.get('account_type'),
+            is_favorite=bool(request.form.get('is_favorite'))
+        )
+        db.session.add(bank)
+        db.session.commit()
+        flash('Banka eklendi!', 'success')
+        return redirect(url_for('settings.settings') + '#banks')
+    return render_template('add_bank.html')
+
+@bp.route('/banks/<int:id>/edit', methods=['GET', 'POST'])
+def edit_bank(id):
+    bank = Bank.query.get_or_404(id)
+    if request.method == 'POST':
+        bank.name = request.form['name']
+        bank.holder_name = request.form.get('holder_name')
+        bank.iban = request.form.get('iban')
+        bank.account_type = request.form.get('account_type')
+        bank.is_favorite = bool(request.form.get('is_favorite'))
+        bank.statement_profile = statement_profile_from_form(request.form)
+        db.session.commit()
+        flash('Banka güncellendi!', 'success')
+        return redirect(url_for('banks.banks'))
+    return render_template('edit_bank.html', bank=bank, profile=statement_profile(bank))
+
+@bp.route('/banks/<int:id>/toggle-favorite', methods=['POST'])
+def toggle_bank_favorite(id):
+    bank = Bank.query.get_or_404(id)
+    bank.is_favorite = not bank.is_favorite
+    db.session.commit()
+    return jsonify({'success': True, 'is_favorite': bank.is_favorite})
+
+@bp.route('/banks/<int:id>/delete', methods=['POST'])
+def delete_bank(id):
+    bank = Bank.query.get_or_404(id)
+    db.session.delete(bank)
+    db.session.commit()
+    flash('Banka silindi!', 'success')
+    return redirect(url_for('settings.settings') + '#banks')
+
+@bp.route('/banks/<int:id>/import-statement', methods=['GET', 'POST'])
+def import_bank_statement(id):
+    bank = Bank.query.get_or_404(id)
+    if request.method == 'POST':
+        file = request.files.get('file')
+        if not file or file.filename == '':
+            flash('Dosya seçilmedi!', 'danger')
+            return redirect(url_for('banks.import_bank_statement', id=id))
+        card_id = request.form.get('card_id', type=int)
+        try:
+            stream = io.TextIOWrapper(file.stream, encoding='utf-8-sig', newline='')
+            inserted, skipped = import_statement(stream, bank, card_id)
+            db.session.commit()
+            flash(f'Ekstre içe aktarıldı! {inserted} yeni işlem, {skipped} tekrar atlandı.', 'success')
+            return redirect(url_for('transactions.transactions', bank=id))
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Hata: {str(e)}', 'danger')
+            return redirect(url_for('banks.import_bank_statement', id=id))
+    cards = Card.query.filter_by(bank_id=id).order_by(Card.name).all()
+    return render_template('import_statement.html', bank=bank, cards=cards, profile=statement_profile(bank))
+
+
+@bp.route('/cards')
+def cards():
+    cards = Card.query.order_by(Card.is_favorite.desc(), Card.name).all()
+    return render_template('cards.html', cards=cards)
+
+@bp.route('/cards/add', methods=['GET', 'POST'])
+def add_card():
+    if request.method == 'POST':
+        card = Card(
+            name=request.form['name'],
+            card_type=request.form['card_type'],
+            last_four=request.form.get('last_four'),
+            bank_id=request.form.get('bank_id') or None,
+            is_favorite=bool(request.form.get('is_favorite'))
+        )
+        db.session.add(card)
+        db.session.commit()
+        flash('Kart eklendi!', 'success')
+        return redirect(url_for('settings.settings') + '#cards')
+    return render_template('add_card.html', banks=reference_list(Bank))
+
+@bp.route('/cards/<int:id>/edit', methods=['GET', 'POST'])
+def edit_card(id):
+    card = Card.query.get_or_404(id)
+    if request.method == 'POST':
+        card.name = request.form['name']
+        card.card_type = request.form['card_type']
+        card.last_four = request.form.get('last_four')
+        card.bank_id = request.form.get('bank_id') or None
+        card.is_favorite = bool(request.form.get('is_favorite'))
+        db.session.commit()
+        flash('Kart güncellendi!', 'success')
+        return redirect(url_for('banks.cards'))
+    return render_template('edit_card.html', card=card, banks=reference_list(Bank))
+
+@bp.route('/cards/<int:id>/toggle-favorite', methods=['POST'])
+def toggle_card_favorite(id):
+    card = Card.query.get_or_404(id)
+    card.is_favorite = not card.is_favorite
+    db.session.commit()
+    return jsonify({'success': True, 'is_favorite': card.is_favorite})
+
+@bp.route('/cards/<int:id>/delete', methods=['POST'])
+def delete_card(id):
+    card = Card.query.get_or_404(id)
+    db.session.delete(card)
+    db.session.commit()
+    flash('Kart silindi!', 'success')
+    return redirect(url_for('settings.settings') + '#cards')
+
+@bp.route('/cards/<int:id>/transactions')
+def card_transactions(id):
+    card = Card.query.options(db.joinedload(Card.bank)).get_or_404(id)
+    # Spending valued in the base currency, from one grouped query
+    report = entity_report(Transaction.card_id == id, spent=EXPENSE_TYPES)
+    query = transaction_query('category', 'person', 'place').filter_by(card_id=id)
+    return render_template('card_transactions.html', card=card, total=report.totals['spent'],
+                           currency_symbols=CURRENCY_SYMBOLS,
+                           **report_page(query, report, 'banks.card_transactions', id))
@@ -0,0 +1,113 @@
+"""Budget and saving goal pages."""
+from datetime import datetime
+from decimal import Decimal
+
+from flask import Blueprint, flash, redirect, render_template, request, url_for
+
+from ..aggregation import grouped_totals
+from ..budgets import PERIODS
+from ..cache import reference_list
+from ..constants import INCOME_TYPES
+from ..extensions import db
+from ..models import Budget, Category, SavingGoal, Transaction
+from ..notifications import refresh_alerts
+
+bp = Blueprint('budgets', __name__)
+
+@bp.route('/budgets')
+def budgets():
+    # Budgets are listed and managed on the settings page
+    return redirect(url_for('settings.settings') + '#budgets')
+
+@bp.route('/budgets/add', methods=['GET', 'POST'])
+def add_budget():
+    if request.method == 'POST':
+        budget = Budget(
+            name=request.form['name'],
+            amount=request.form['amount'],
+            period=request.form.get('period') or None,
+            category_id=request.form.get('category_id') or None,
+            start_date=datetime.strptime(request.form['start_date'], '%Y-%m-%d').date() if request.form.get('start_date') else None,
+            end_date=datetime.strptime(request.form['end_date'], '%Y-%m-%d').date() if request.form.get('end_date') else None
+        )
+        db.session.add(budget)
+        db.session.flush()
+        refresh_alerts()
+        db.session.commit()
+        flash('Bütçe eklendi!', 'success')
+        return redirect(url_for('settings.settings') + '#budgets')
+    return render_template('add_budget.html', categories=reference_list(Category), periods=PERIODS)
+
+@bp.route('/budgets/<int:id>/delete', methods=['POST'])
+def delete_budget(id):
+    budget = Budget.query.get_or_404(id)
+    db.session.delete(budget)
+    db.session.flush()
+    refresh_alerts()
+    db.session.commit()
+    flash('Bütçe silindi!', 'success')
+    return redirect(url_for('settings.settings') + '#budgets')
+
+@bp.route('/goals')
+def goals():
+    goals = SavingGoal.query.options(db.joinedload(SavingGoal.category)).all()
+    savings = grouped_totals(Transaction.category_id, savings=INCOME_TYPES)
+    goal_stats = []
+    
+    for goal in goals:
+        current_amount = goal.current_amount or Decimal(0) # Manual amount as base
+        
+        # If category is linked, sum up relevant transactions
+        if goal.category_id:
+            current_amount += savings.get(goal.category_id, {'savings': 0})['savings']
+            
+        percentage = (current_amount / goal.target_amount * 100) if goal.target_amount > 0 else 0
+        remaining = goal.target_amount - current_amount
+        
+        # Dynamic object to pass to template without modifying DB object permanently in this view
+        goal_display = {
+            'id': goal.id,
+            'name': goal.name,
+            'target_amount': goal.target_amount,
+            'current_amount': current_amount,
+            'deadline': goal.deadline,
+            'category': goal.category
+        }
+        
+        goal_stats.append({'goal': goal_display, 'percentage': min(percentage, 100), 'remaining': remaining})
+    return render_template('goals.html', goal_stats=goal_stats)
+
+@bp.route('/goals/add', methods=['GET', 'POST'])
+def add_goal():
+    if request.method == 'POST':
+        goal = SavingGoal(
+            name=request.form['name'],
+            target_amount=request.form['target_amount'],
+            current_amount=request.form.get('current_amount') or 0,
+            deadline=datetime.strptime(request.form['deadline'], '%Y-%m-%d').date() if request.form.get('deadline') else None
+        )
+        if request.form.get('category_id'):
+            goal.category_id = int(request.form['category_id'])
+            
+        db.session.add(goal)
+        db.session.flush()
+        refresh_alerts()
+        db.session.commit()
+        flash('Hedef eklendi!', 'success')
+        return redirect(url_for('budgets.goals'))
+    return render_template('add_goal.html', categories=reference_list(Category))
+
+@bp.route('/goals/<int:id>/update', methods=['POST'])
+def update_goal(id):
+    # Bu metod artık kullanılmıyor, hedefler otomatik hesaplanıyor
+    return redirect(url_for('budgets.goals'))
+
+@bp.route('/goals/<int:id>/delete', methods=['POST'])
+def delete_goal(id):
+    goal = SavingGoal.query.get_or_404(id)
+    db.session.delete(goal)
+    db.session.flush()
+    refresh_alerts()
+    db.session.commit()
+    flash('Hedef silindi!', 'success')
+    return redirect(url_for('budgets.goals'))
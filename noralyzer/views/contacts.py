@@ -0,0 +1,152 @@
+"""Person and place pages with their reports."""
+from flask import Blueprint, flash, jsonify, redirect, render_template, request, url_for
+
+from ..aggregation import entity_report
+from ..constants import CURRENCY_SYMBOLS, EXPENSE_TYPES, INCOME_TYPES
+from ..extensions import db
+from ..models import Person, Place, Transaction
+from ..pagination import items_per_page, paginate_transactions
+from ..queries import transaction_query
+
+bp = Blueprint('contacts', __name__)
+
+# Money sent to a person (expense, transfer, cash out) and received from them
+SENT_TYPES = ['expense', 'transfer', 'cash_out']
+RECEIVED_TYPES = INCOME_TYPES
+
+def report_page(query, report, endpoint, id):
+    """Template arguments for one page of a report's transaction list."""
+    page = paginate_transactions(query, request.args.get('cursor'), total=report.totals['count'],
+                                 per_page=items_per_page())
+    return {
+        'transactions': page,
+        'prev_url': url_for(endpoint, id=id, cursor=page.prev_cursor) if page.has_prev else None,
+        'next_url': url_for(endpoint, id=id, cursor=page.next_cursor) if page.has_next else None,
+    }
+
+@bp.route('/persons')
+def persons():
+    persons = Person.query.order_by(Person.is_favorite.desc(), Person.name).all()
+    return render_template('persons.html', persons=persons)
+
+@bp.route('/persons/add', methods=['GET', 'POST'])
+def add_person():
+    if request.method == 'POST':
+        person = Person(
+            name=request.form['name'],
+            phone=request.form.get('phone'),
+            note=request.form.get('note'),
+            is_favorite=bool(request.form.get('is_favorite'))
+        )
+        db.session.add(person)
+        db.session.commit()
+        flash('Kişi eklendi!', 'success')
+        return redirect(url_for('settings.settings') + '#contacts')
+    return render_template('add_person.html')
+
+@bp.route('/persons/<int:id>/edit', methods=['GET', 'POST'])
+def edit_person(id):
+    person = Person.query.get_or_404(id)
+    if request.method == 'POST':
+        person.name = request.form['name']
+        person.phone = request.form.get('phone')
+        person.note = request.form.get('note')
+        person.is_favorite = bool(request.form.get('is_favorite'))
+        db.session.commit()
+        flash('Kişi güncellendi!', 'success')
+        return redirect(url_for('contacts.persons'))
+    return render_template('edit_person.html', person=person)
+
+@bp.route('/persons/<int:id>/toggle-favorite', methods=['POST'])
+def toggle_person_favorite(id):
+    person = Person.query.get_or_404(id)
+    person.is_favorite = not person.is_favorite
+    db.session.commit()
+    return jsonify({'success': True, 'is_favorite': person.is_favorite})
+
+@bp.route('/persons/<int:id>/delete', methods=['POST'])
+def delete_person(id):
+    person = Person.query.get_or_404(id)
+    db.session.delete(person)
+    db.session.commit()
+    flash('Kişi silindi!', 'success')
+    return redirect(url_for('settings.settings') + '#contacts')
+
+@bp.route('/persons/<int:id>/report')
+def person_report(id):
+    person = Person.query.get_or_404(id)
+    report = entity_report(Transaction.person_id == id, sent=SENT_TYPES, received=RECEIVED_TYPES)
+    query = transaction_query('category', 'bank_ref', 'card', 'place').filter_by(person_id=id)
+    return render_template('person_report.html', person=person, report=report,
+                         total_sent=report.totals['sent'], total_received=report.totals['received'],
+                         currency_symbols=CURRENCY_SYMBOLS, **report_page(query, report, 'contacts.person_report', id))
+
+@bp.route('/persons/<int:id>/owner-report')
+def owner_report(id):
+    """Report for transactions OWNED by this person (i.e. made by this person)"""
+    person = Person.query.get_or_404(id)
+    report = entity_report(Transaction.owner_id == id, income=INCOME_TYPES, expense=EXPENSE_TYPES)
+    query = transaction_query('category', 'bank_ref', 'card', 'place', 'person').filter_by(owner_id=id)
+    total_income, total_expense = report.totals['income'], report.totals['expense']
+    return render_template('owner_report.html', person=person, report=report,
+                         total_income=total_income, total_expense=total_expense,
+                         balance=total_income - total_expense,
+                         currency_symbols=CURRENCY_SYMBOLS, **report_page(query, report, 'contacts.owner_report', id))
+
+# ==================== PLACE ROUTES ====================
+
+@bp.route('/places')
+def places():
+    places = Place.query.order_by(Place.is_favorite.desc(), Place.name).all()
+    return render_template('places.html', places=places)
+
+@bp.route('/places/add', methods=['GET', 'POST'])
+def add_place():
+    if request.method == 'POST':
+        place = Place(
+            name=request.form['name'],
+            address=request.form.get('address'),
+            category=request.form.get('category'),
+            is_favorite=bool(request.form.get('is_favorite'))
+        )
+        db.session.add(place)
+        db.session.commit()
+        flash('Yer eklendi!', 'success')
+        return redirect(url_for('settings.settings') + '#contacts')
+    return render_template('add_place.html')
+
+@bp.route('/places/<int:id>/edit', methods=['GET', 'POST'])
+def edit_place(id):
+    place = Place.query.get_or_404(id)
+    if request.method == 'POST':
+        place.name = request.form['name']
+        place.address = request.form.get('address')
+        place.category = request.form.get('category')
+        place.is_favorite = bool(request.form.get('is_favorite'))
+        db.session.commit()
+        flash('Yer güncellendi!', 'success')
+        return redirect(url_for('contacts.places'))
+    return render_template('edit_place.html', place=place)
+
+@bp.route('/places/<int:id>/toggle-favorite', methods=['POST'])
+def toggle_place_favorite(id):
+    place = Place.query.get_or_404(id)
+    place.is_favorite = not place.is_favorite
+    db.session.commit()
+    return jsonify({'success': True, 'is_favorite': place.is_favorite})
+
+@bp.route('/places/<int:id>/delete', methods=['POST'])
+def delete_place(id):
+    place = Place.query.get_or_404(id)
+    db.session.delete(place)
+    db.session.commit()
+    flash('Yer silindi!', 'success')
+    return redirect(url_for('settings.settings') + '#contacts')
+
+@bp.route('/places/<int:id>/report')
+def place_report(id):
+    place = Place.query.get_or_404(id)
+    report = entity_report(Transaction.place_id == id)
+    query = transaction_query('category', 'bank_ref', 'card', 'person').filter_by(place_id=id)
+    return render_template('place_report.html', place=place, report=report, total_spent=report.totals['total'],
+                         currency_symbols=CURRENCY_SYMBOLS, **report_page(query, report, 'contacts.place_report', id))
@@ -0,0 +1,13 @@
+"""Report pages and chart data; the views live in ``noralyzer.reports``."""
+from flask import Blueprint
+
+from . import lazy_routes
+
+bp = Blueprint('reports', __name__)
+
+lazy_routes(bp, 'noralyzer.reports', [
+    ('/reports', 'reports', ['GET']),
+    ('/api/chart-data', 'chart_data_api', ['GET']),
+    ('/api/charts/<series>', 'chart_series', ['GET']),
+    ('/api/reference-cache', 'reference_cache_stats', ['GET']),
+])
@@ -0,0 +1,193 @@
+"""Settings, category and tag pages, job status pages and the backup routes."""
+import io
+import os
+from datetime import datetime
+
+from flask import Blueprint, abort, flash, redirect, render_template, request, send_file, url_for
+
+from ..aggregation import grouped_totals
+from ..budgets import budget_stats
+from ..cache import reference_list, settings_store
+from ..constants import CURRENCY_NAMES
+from ..extensions import db
+from ..jobs import JOB_KINDS, get_job_or_404, job_runner
+from ..models import Bank, Budget, Card, Category, Job, Notification, Person, Place, Tag, Transaction
+from ..notifications import notifications_enabled, refresh_alerts
+from ..valuation import import_rates, rate_table
+from . import lazy_routes
+
+bp = Blueprint('settings', __name__)
+
+@bp.route('/categories')
+def categories():
+    categories = Category.query.all()
+    totals = grouped_totals(Transaction.category_id, total=None)
+    category_stats = []
+    for cat in categories:
+        stats = totals.get(cat.id, {'total': 0, 'count': 0})
+        category_stats.append({'category': cat, 'total': stats['total'], 'count': stats['count']})
+    return render_template('categories.html', category_stats=category_stats)
+
+@bp.route('/categories/add', methods=['GET', 'POST'])
+def add_category():
+    if request.method == 'POST':
+        category = Category(
+            name=request.form['name'],
+            icon=request.form.get('icon'),
+            color=request.form.get('color', '#6c757d')
+        )
+        db.session.add(category)
+        db.session.commit()
+        flash('Kategori eklendi!', 'success')
+        return redirect(url_for('settings.settings') + '#categories')
+    return render_template('add_category.html')
+
+@bp.route('/categories/<int:id>/edit', methods=['GET', 'POST'])
+def edit_category(id):
+    category = Category.query.get_or_404(id)
+    if request.method == 'POST':
+        category.name = request.form['name']
+        category.icon = request.form.get('icon')
+        category.color = request.form.get('color', '#6c757d')
+        db.session.commit()
+        flash('Kategori güncellendi!', 'success')
+        return redirect(url_for('settings.categories'))
+    return render_template('edit_category.html', category=category)
+
+@bp.route('/categories/<int:id>/delete', methods=['POST'])
+def delete_category(id):
+    category = Category.query.get_or_404(id)
+    db.session.delete(category)
+    db.session.commit()
+    flash('Kategori silindi!', 'success')
+    return redirect(url_for('settings.settings') + '#categories')
+
+@bp.route('/tags')
+def tags():
+    tags = Tag.query.all()
+    return render_template('tags.html', tags=tags)
+
+@bp.route('/tags/add', methods=['GET', 'POST'])
+def add_tag():
+    if request.method == 'POST':
+        tag = Tag(
+            name=request.form['name'],
+            color=request.form.get('color', '#17a2b8')
+        )
+        db.session.add(tag)
+        db.session.commit()
+        flash('Etiket eklendi!', 'success')
+        return redirect(url_for('settings.settings') + '#tags')
+    return render_template('add_tag.html')
+
+@bp.route('/tags/<int:id>/delete', methods=['POST'])
+def delete_tag(id):
+    tag = Tag.query.get_or_404(id)
+    db.session.delete(tag)
+    db.session.commit()
+    flash('Etiket silindi!', 'success')
+    return redirect(url_for('settings.settings') + '#tags')
+
+@bp.route('/settings')
+def settings():
+    # Budget stats for settings page
+    budgets_list = Budget.query.options(db.joinedload(Budget.category)).all()
+
+    return render_template('settings.html',
+        settings=settings_store.all(),
+        banks=reference_list(Bank, favorites_first=True),
+        cards=reference_list(Card, favorites_first=True),
+        persons=reference_list(Person, favorites_first=True),
+        places=reference_list(Place, favorites_first=True),
+        categories=reference_list(Category),
+        tags=reference_list(Tag),
+        budget_stats=budget_stats(budgets_list),
+        latest_rates=rate_table.latest(),
+        currency_names=CURRENCY_NAMES,
+        jobs=Job.query.order_by(Job.created_at.desc()).limit(5).all(),
+        job_kinds=JOB_KINDS,
+        notification_settings={kind: notifications_enabled(kind) for kind in ('budget', 'goal', 'weekly')}
+    )
+
+@bp.route('/settings/save', methods=['POST'])
+def save_settings():
+    section = request.form.get('section')
+    
+    if section == 'general':
+        settings_store.update({
+            'app_name': request.form.get('app_name', 'Noralyzer'),
+            'default_currency': request.form.get('default_currency', 'TRY'),
+            'date_format': request.form.get('date_format', 'DD.MM.YYYY'),
+            'items_per_page': request.form.get('items_per_page', '20'),
+        })
+    elif section == 'appearance':
+        settings_store.update({
+            'theme': request.form.get('theme', 'dark'),
+            'primary_color': request.form.get('primary_color', '#6366f1'),
+            'compact_mode': 'true' if request.form.get('compact_mode') else 'false',
+        })
+    elif section == 'notifications':
+        settings_store.update({
+            'budget_alerts': 'true' if request.form.get('budget_alerts') else 'false',
+            'goal_reminders': 'true' if request.form.get('goal_reminders') else 'false',
+            'weekly_summary': 'true' if request.form.get('weekly_summary') else 'false',
+        })
+        refresh_alerts()
+        db.session.commit()
+    elif section == 'currencies':
+        currencies = request.form.getlist('currencies')
+        settings_store.update({'active_currencies': ','.join(currencies)})
+    
+    flash('Ayarlar kaydedildi!', 'success')
+    return redirect(url_for('settings.settings'))
+
+@bp.route('/settings/rates/import', methods=['POST'])
+def import_rates_file():
+    file = request.files.get('file')
+    if not file or file.filename == '':
+        flash('Dosya seçilmedi!', 'danger')
+        return redirect(url_for('settings.settings') + '#currencies')
+    try:
+        count = import_rates(io.TextIOWrapper(file.stream, encoding='utf-8-sig', newline=''))
+        db.session.commit()
+        rate_table.invalidate()
+        flash(f'{count} kur kaydı içe aktarıldı!', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Hata: {str(e)}', 'danger')
+    return redirect(url_for('settings.settings') + '#currencies')
+
+@bp.route('/notifications/<int:id>/read', methods=['POST'])
+def read_notification(id):
+    notification = db.get_or_404(Notification, id)
+    notification.read_at = datetime.utcnow()
+    db.session.commit()
+    return redirect(request.referrer or url_for('transactions.dashboard'))
+
+@bp.route('/notifications/read-all', methods=['POST'])
+def read_all_notifications():
+    Notification.query.filter(Notification.read_at.is_(None)).update({'read_at': datetime.utcnow()})
+    db.session.commit()
+    return redirect(request.referrer or url_for('transactions.dashboard'))
+
+@bp.route('/jobs/<id>')
+def job_status(id):
+    job = get_job_or_404(id)
+    return render_template('job.html', job=job, job_kinds=JOB_KINDS, progress=job_runner.progress(job))
+
+@bp.route('/jobs/<id>/download')
+def download_job(id):
+    job = db.get_or_404(Job, id)
+    if job.status != 'done' or not job.result_file or not os.path.exists(job.result_file):
+        abort(404)
+    return send_file(job.result_file, mimetype=job.result_mimetype, as_attachment=True,
+                     download_name=job.result_name)
+
+# Backup and maintenance actions, run as background jobs by noralyzer.backup
+lazy_routes(bp, 'noralyzer.backup', [
+    ('/settings/export', 'export_data', ['GET', 'POST']),
+    ('/settings/import', 'import_data', ['POST']),
+    ('/settings/delete-all-transactions', 'delete_all_transactions', ['POST']),
+    ('/settings/reset-database', 'reset_database', ['POST']),
+    ('/settings/recompute', 'recompute_data', ['POST']),
+])
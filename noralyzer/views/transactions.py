@@ -0,0 +1,291 @@
+"""Dashboard, transaction and quick transaction pages."""
+from datetime import date, datetime
+
+from flask import Blueprint, flash, redirect, render_template, request, url_for
+
+from ..budgets import budget_stats
+from ..cache import reference_list, settings_store
+from ..constants import CURRENCIES, CURRENCY_NAMES, CURRENCY_SYMBOLS, EXPENSE_TYPES, INCOME_TYPES, TRANSACTION_TYPES
+from ..extensions import db
+from ..models import Bank, Budget, Card, Category, Person, Place, QuickTransaction, SavingGoal, Tag, Transaction
+from ..pagination import items_per_page, paginate_transactions
+from ..queries import filter_transactions, transaction_query
+from ..recurring import RECURRENCES, materialize_recurring, next_occurrence
+from ..rollup import rollup_totals
+from ..valuation import valued_totals
+
+bp = Blueprint('transactions', __name__)
+
+@bp.route('/')
+def dashboard():
+    transactions = transaction_query('category', 'owner').order_by(Transaction.date.desc()).limit(10).all()
+    by_type = valued_totals(('transaction_type',), types=INCOME_TYPES + EXPENSE_TYPES)
+    total_income = sum(by_type.get((t,), [0])[0] for t in INCOME_TYPES)
+    total_expense = sum(by_type.get((t,), [0])[0] for t in EXPENSE_TYPES)
+    
+    budgets = budget_stats(Budget.query.all())
+    goals = SavingGoal.query.all()
+    
+    return render_template('dashboard.html', 
+        transactions=transactions,
+        total_income=total_income,
+        total_expense=total_expense,
+        balance=total_income - total_expense,
+        budgets=budgets,
+        goals=goals,
+        currency_symbols=CURRENCY_SYMBOLS
+    )
+
+@bp.route('/transactions')
+def transactions():
+    cursor = request.args.get('cursor')
+    category_id = request.args.get('category')
+    person_id = request.args.get('person')
+    owner_id = request.args.get('owner')
+    place_id = request.args.get('place')
+    card_id = request.args.get('card')
+    bank_id = request.args.get('bank')
+    date_from = request.args.get('date_from')
+    date_to = request.args.get('date_to')
+    start_date = datetime.strptime(date_from, '%Y-%m-%d').date() if date_from else None
+    end_date = datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else None
+    
+    query, ranks = filter_transactions(transaction_query('category', 'owner', 'person', 'place'), request.args)
+    
+    # The rollup can count rows cheaply as long as only its own keys are filtered
+    total = None
+    if not (person_id or place_id or card_id or bank_id or request.args.get('tag') or ranks is not None):
+        where = {}
+        if category_id:
+            where['category_id'] = category_id
+        if owner_id:
+            where['owner_id'] = owner_id
+        if request.args.get('type'):
+            where['transaction_type'] = request.args['type']
+        if request.args.get('currency'):
+            where['currency'] = request.args['currency']
+        total = sum(count for _total, count in rollup_totals((), start_date, end_date, where=where).values())
+    
+    transactions = paginate_transactions(query, cursor, per_page=items_per_page(), total=total,
+                                         rank=ranks.c.rank if ranks is not None else None)
+    filters = {k: values for k, values in request.args.lists() if k != 'cursor' and any(values)}
+    
+    return render_template('transactions.html',
+        transactions=transactions,
+        prev_url=url_for('transactions.transactions', cursor=transactions.prev_cursor, **filters) if transactions.has_prev else None,
+        next_url=url_for('transactions.transactions', cursor=transactions.next_cursor, **filters) if transactions.has_next else None,
+        categories=reference_list(Category),
+        persons=reference_list(Person),
+        places=reference_list(Place),
+        cards=reference_list(Card),
+        banks=reference_list(Bank),
+        tags=reference_list(Tag),
+        selected_tags=request.args.getlist('tag'),
+        currency_symbols=CURRENCY_SYMBOLS,
+        currency_names=CURRENCY_NAMES
+    )
+
+@bp.route('/transactions/add', methods=['GET', 'POST'])
+def add_transaction():
+    if request.method == 'POST':
+        transaction = Transaction(
+            amount=request.form['amount'],
+            currency=request.form['currency'],
+            transaction_type=request.form['transaction_type'],
+            description=request.form.get('description'),
+            date=datetime.strptime(request.form['date'], '%Y-%m-%d').date() if request.form.get('date') else date.today(),
+            time=request.form.get('time') or None,
+            category_id=request.form.get('category_id') or None,
+            card_id=request.form.get('card_id') or None,
+            bank_id=request.form.get('bank_id') or None,
+            person_id=request.form.get('person_id') or None,
+            owner_id=request.form.get('owner_id') or None,
+            place_id=request.form.get('place_id') or None,
+            from_bank_id=request.form.get('from_bank_id') or None,
+            to_bank_id=request.form.get('to_bank_id') or None
+        )
+        
+        # Tags processing
+        if 'tags' in request.form:
+             tags = Tag.query.filter(Tag.id.in_(request.form.getlist('tags'))).all()
+             transaction.tags.extend(tags)
+             
+        db.session.add(transaction)
+        db.session.commit()
+        flash('İşlem eklendi!', 'success')
+        return redirect(url_for('transactions.transactions'))
+        
+    return render_template('add_transaction.html',
+        transaction_types=TRANSACTION_TYPES,
+        currencies=CURRENCIES,
+        categories=reference_list(Category),
+        banks=reference_list(Bank),
+        cards=reference_list(Card),
+        persons=reference_list(Person),
+        places=reference_list(Place),
+        tags=reference_list(Tag),
+        quick_transactions=reference_list(QuickTransaction),
+        currency_names=CURRENCY_NAMES,
+        default_currency=settings_store.get('default_currency', 'TRY')
+    )
+
+
+
+
+@bp.route('/transactions/<int:id>/edit', methods=['GET', 'POST'])
+def edit_transaction(id):
+    transaction = Transaction.query.get_or_404(id)
+    if request.method == 'POST':
+        transaction.amount = request.form['amount']
+        transaction.currency = request.form['currency']
+        transaction.transaction_type = request.form['transaction_type']
+        transaction.description = request.form.get('description')
+        transaction.date = datetime.strptime(request.form['date'], '%Y-%m-%d').date() if request.form.get('date') else transaction.date
+        transaction.time = request.form.get('time') or None
+        transaction.category_id = request.form.get('category_id') or None
+        transaction.card_id = request.form.get('card_id') or None
+        transaction.bank_id = request.form.get('bank_id') or None
+        transaction.person_id = request.form.get('person_id') or None
+        transaction.owner_id = request.form.get('owner_id') or None
+        transaction.place_id = request.form.get('place_id') or None
+        # The form always lists the tags, so no checked box means no tags
+        if 'tags_shown' in request.form:
+            transaction.tags = Tag.query.filter(Tag.id.in_(request.form.getlist('tags'))).all()
+        
+        db.session.commit()
+        flash('İşlem güncellendi!', 'success')
+        return redirect(url_for('transactions.transactions'))
+    
+    return render_template('edit_transaction.html',
+        transaction=transaction,
+        transaction_tag_ids={tag.id for tag in transaction.tags},
+        transaction_types=TRANSACTION_TYPES,
+        currencies=CURRENCIES,
+        categories=reference_list(Category),
+        cards=reference_list(Card),
+        banks=reference_list(Bank),
+        persons=reference_list(Person),
+        places=reference_list(Place),
+        tags=reference_list(Tag),
+        currency_names=CURRENCY_NAMES
+    )
+
+@bp.route('/transactions/<int:id>/delete', methods=['POST'])
+def delete_transaction(id):
+    transaction = Transaction.query.get_or_404(id)
+    db.session.delete(transaction)
+    db.session.commit()
+    flash('İşlem silindi!', 'success')
+    return redirect(url_for('transactions.transactions'))
+
+
+
+@bp.route('/quick-transactions')
+def quick_transactions():
+    quick_txs = QuickTransaction.query.all()
+    return render_template('quick_transactions.html', quick_transactions=quick_txs,
+                           recurrences=dict(RECURRENCES),
+                           next_dates={qt.id: next_occurrence(qt) for qt in quick_txs if qt.recurrence})
+
+def set_recurrence(qt, form):
+    """Copy the recurrence fields of a template form onto ``qt``."""
+    qt.recurrence = form.get('recurrence') or None
+    qt.recurrence_interval = form.get('recurrence_interval', type=int) if qt.recurrence else None
+    qt.recurrence_day = form.get('recurrence_day', type=int) if qt.recurrence == 'monthly' else None
+    start, end = form.get('recurrence_start'), form.get('recurrence_end')
+    qt.recurrence_start = datetime.strptime(start, '%Y-%m-%d').date() if start else date.today() if qt.recurrence else None
+    qt.recurrence_end = datetime.strptime(end, '%Y-%m-%d').date() if end and qt.recurrence else None
+
+def schedule_recurring():
+    """Add the occurrences a saved template has already fallen due for."""
+    count = materialize_recurring()
+    db.session.commit()
+    if count:
+        flash(f'{count} tekrarlayan işlem eklendi.', 'info')
+
+@bp.route('/quick-transactions/add', methods=['GET', 'POST'])
+def add_quick_transaction():
+    if request.method == 'POST':
+        qt = QuickTransaction(
+            name=request.form['name'],
+            amount=request.form.get('amount') or None,
+            currency=request.form.get('currency'),
+            transaction_type=request.form.get('transaction_type'),
+            description=request.form.get('description'),
+            category_id=request.form.get('category_id') or None,
+            card_id=request.form.get('card_id') or None,
+            bank_id=request.form.get('bank_id') or None,
+            person_id=request.form.get('person_id') or None,
+            place_id=request.form.get('place_id') or None
+        )
+        set_recurrence(qt, request.form)
+        db.session.add(qt)
+        db.session.commit()
+        flash('Hızlı işlem şablonu eklendi!', 'success')
+        schedule_recurring()
+        return redirect(url_for('transactions.quick_transactions'))
+    return render_template('add_quick_transaction.html',
+        transaction_types=TRANSACTION_TYPES,
+        recurrences=RECURRENCES,
+        currencies=CURRENCIES,
+        categories=reference_list(Category),
+        cards=reference_list(Card),
+        banks=reference_list(Bank),
+        persons=reference_list(Person),
+        places=reference_list(Place)
+    )
+
+@bp.route('/quick-transactions/<int:id>/edit', methods=['GET', 'POST'])
+def edit_quick_transaction(id):
+    qt = QuickTransaction.query.get_or_404(id)
+    if request.method == 'POST':
+        qt.name = request.form['name']
+        qt.amount = request.form.get('amount') or None
+        qt.currency = request.form.get('currency')
+        qt.transaction_type = request.form.get('transaction_type')
+        qt.description = request.form.get('description')
+        qt.category_id = request.form.get('category_id') or None
+        qt.card_id = request.form.get('card_id') or None
+        qt.bank_id = request.form.get('bank_id') or None
+        qt.person_id = request.form.get('person_id') or None
+        qt.place_id = request.form.get('place_id') or None
+        set_recurrence(qt, request.form)
+        db.session.commit()
+        flash('Hızlı işlem şablonu güncellendi!', 'success')
+        schedule_recurring()
+        return redirect(url_for('transactions.quick_transactions'))
+    return render_template('edit_quick_transaction.html',
+        qt=qt,
+        transaction_types=TRANSACTION_TYPES,
+        recurrences=RECURRENCES,
+        currencies=CURRENCIES,
+        categories=reference_list(Category),
+        cards=reference_list(Card),
+        banks=reference_list(Bank),
+        persons=reference_list(Person),
+        places=reference_list(Place)
+    )
+
+@bp.route('/quick-transactions/<int:id>/use', methods=['POST'])
+def use_quick_transaction(id):
+    qt = QuickTransaction.query.get_or_404(id)
+    # Verileri query parameter olarak add_transaction sayfasına taşı
+    return redirect(url_for('transactions.add_transaction', 
+        amount=qt.amount,
+        currency=qt.currency,
+        transaction_type=qt.transaction_type,
+        description=qt.description,
+        category_id=qt.category_id,
+        card_id=qt.card_id,
+        bank_id=qt.bank_id,
+        person_id=qt.person_id,
+        place_id=qt.place_id
+    ))
+
+@bp.route('/quick-transactions/<int:id>/delete', methods=['POST'])
+def delete_quick_transaction(id):
+    qt = QuickTransaction.query.get_or_404(id)
+    db.session.delete(qt)
+    db.session.commit()
+    flash('Hızlı işlem şablonu silindi!', 'success')
+    return redirect(url_for('transactions.quick_transactions'))
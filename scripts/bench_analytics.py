@@ -0,0 +1,123 @@
+"""Time the reports page totals three ways on generated data.
+
+- orm: load Transaction objects and add them up in Python (the old reports code)
+- columnar: analytics.py next to this script, plain tuples into column arrays (NumPy when installed)
+- rollup: valued_totals over the monthly rollup, as the reports page does
+
+Each method must give the same totals, category breakdown and monthly series.
+
+    python scripts/bench_analytics.py                   # 100k and 1M rows
+    python scripts/bench_analytics.py --rows 50000 --skip-orm
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analytics  # noqa: E402
+from noralyzer import create_app  # noqa: E402
+from noralyzer.constants import EXPENSE_TYPES, INCOME_TYPES, TRANSACTION_TYPES  # noqa: E402
+from noralyzer.extensions import db  # noqa: E402
+from noralyzer.models import Transaction  # noqa: E402
+from noralyzer.rollup import rebuild_rollup  # noqa: E402
+from noralyzer.valuation import rate_table, valued_totals  # noqa: E402
+
+START = date(2015, 1, 1)
+
+
+def populate(rows):
+    """Insert ``rows`` pseudo-random transactions over ten years in one INSERT ... SELECT."""
+    types = ', '.join(f"'{t}'" for t, _ in TRANSACTION_TYPES)
+    db.session.execute(db.text(f"""
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :rows)
+        INSERT INTO "transaction" (amount_minor, currency, transaction_type, description, date, category_id, created_at)
+        SELECT abs(random()) % 500000 + 100,
+               CASE WHEN i % 10 = 0 THEN 'USD' WHEN i % 17 = 0 THEN 'EUR' ELSE 'TRY' END,
+               json_extract(json_array({types}), '$[' || (abs(random()) % {len(TRANSACTION_TYPES)}) || ']'),
+               'işlem ' || i,
+               date(:start, '+' || (abs(random()) % 3650) || ' days'),
+               CASE WHEN i % 13 = 0 THEN NULL ELSE abs(random()) % 9 + 1 END,
+               CURRENT_TIMESTAMP
+        FROM n"""), {'rows': rows, 'start': START.isoformat()})
+    rebuild_rollup()
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+
+
+def orm_summary(start_date):
+    summary = {'income': Decimal(0), 'expense': Decimal(0), 'categories': {}, 'months': {}}
+    for t in Transaction.query.filter(Transaction.date >= start_date).all():
+        month = t.date.strftime('%Y-%m')
+        value = t.amount * rate_table.factor(t.currency, month)
+        name = 'income' if t.transaction_type in INCOME_TYPES else 'expense' if t.transaction_type in EXPENSE_TYPES else None
+        if name is None:
+            continue
+        summary[name] += value
+        bucket = summary['months'].setdefault(month, {'income': Decimal(0), 'expense': Decimal(0)})
+        bucket[name] += value
+        if name == 'expense':
+            summary['categories'][t.category_id] = summary['categories'].get(t.category_id, Decimal(0)) + value
+    db.session.expunge_all()
+    return summary
+
+
+def rollup_summary(start_date):
+    summary = {'income': Decimal(0), 'expense': Decimal(0), 'categories': {}, 'months': {}}
+    for (month, transaction_type), (total, _count) in valued_totals(('month', 'transaction_type'), start_date).items():
+        name = 'income' if transaction_type in INCOME_TYPES else 'expense' if transaction_type in EXPENSE_TYPES else None
+        if name is None:
+            continue
+        summary[name] += total
+        summary['months'].setdefault(month, {'income': Decimal(0), 'expense': Decimal(0)})[name] += total
+    for (category_id,), (total, _count) in valued_totals(('category_id',), start_date, types=EXPENSE_TYPES).items():
+        summary['categories'][category_id] = total
+    return summary
+
+
+def rounded(summary):
+    cents = Decimal('0.01')
+    return (summary['income'].quantize(cents), summary['expense'].quantize(cents),
+            {k: v.quantize(cents) for k, v in summary['categories'].items()},
+            {m: {k: v.quantize(cents) for k, v in b.items()} for m, b in summary['months'].items()})
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--skip-orm', action='store_true', help='leave out the (slow) ORM method')
+    args = parser.parse_args()
+
+    print(f"numpy: {'yes' if analytics.numpy is not None else 'no (array fallback)'}")
+    print(f"{'rows':>9}  {'range':<6} {'orm s':>8} {'columnar s':>11} {'rollup s':>9}")
+    for rows in args.rows:
+        folder = tempfile.mkdtemp(prefix='noralyzer-bench-')
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(folder, 'bench.db')})
+        with app.app_context():
+            populate(rows)
+            for label, start_date in (('all', START), ('1y', date(2024, 1, 1))):
+                orm_time = None
+                if not args.skip_orm:
+                    orm_time, orm = timed(orm_summary, start_date)
+                columnar_time, columnar = timed(analytics.report_summary, start_date)
+                rollup_time, rollup = timed(rollup_summary, start_date)
+                assert rounded(columnar) == rounded(rollup), 'columnar and rollup totals differ'
+                if orm_time is not None:
+                    assert rounded(orm) == rounded(columnar), 'orm and columnar totals differ'
+                orm_column = f'{orm_time:8.2f}' if orm_time is not None else f"{'-':>8}"
+                print(f'{rows:>9}  {label:<6} {orm_column} {columnar_time:11.2f} {rollup_time:9.3f}')
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
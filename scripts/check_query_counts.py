@@ -0,0 +1,108 @@
+"""Assert that transaction listing pages issue a fixed number of SQL queries.
+
+Each page is rendered against a small and a large in-memory dataset; the
+number of statements must stay within the page's budget and must not grow
+with the number of rows (no N+1 loads).
+
+    python scripts/check_query_counts.py
+"""
+import os
+import sys
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event  # noqa: E402
+
+from noralyzer import create_app  # noqa: E402
+from noralyzer.extensions import db  # noqa: E402
+from noralyzer.models import Bank, Card, Category, Person, Place, Transaction  # noqa: E402
+
+app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+
+# page -> maximum number of statements allowed for one render, including
+# the change counter lookup that validates the in-process caches
+PAGES = {
+    '/': 5,
+    '/transactions': 4,
+    '/cards/1/transactions': 4,
+    '/persons/1/report': 4,
+    '/persons/1/owner-report': 4,
+    '/places/1/report': 4,
+}
+
+
+@contextmanager
+def count_queries():
+    """Collect every statement sent to the database while the block runs."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def add_transactions(count):
+    """Add rows whose related records are all distinct, so lazy loads cannot hit the identity map."""
+    today = date.today()
+    for i in range(count):
+        bank = Bank(name=f'Banka {i}')
+        related = dict(
+            category=Category(name=f'Kategori {i}'), bank_ref=bank, card=Card(name=f'Kart {i}', bank=bank),
+            person=Person(name=f'Kişi {i}'), owner=Person(name=f'Sahip {i}'), place=Place(name=f'Yer {i}')
+        )
+        # Every row still belongs to one of the pages under test
+        pinned = ('card_id', 'person_id', 'owner_id', 'place_id')[i % 4]
+        related.pop({'card_id': 'card', 'person_id': 'person', 'owner_id': 'owner', 'place_id': 'place'}[pinned])
+        db.session.add(Transaction(
+            amount=10 + i, currency='TRY', transaction_type='expense' if i % 2 else 'income',
+            description=f'row {i}', date=today - timedelta(days=i % 90), **{pinned: 1}, **related
+        ))
+    db.session.commit()
+
+
+def measure(client):
+    counts = {}
+    for page in PAGES:
+        client.get(page)  # warm the in-process caches (reference lists, settings)
+        db.session.remove()
+        with count_queries() as statements:
+            response = client.get(page)
+        assert response.status_code == 200, (page, response.status_code)
+        counts[page] = len(statements)
+    return counts
+
+
+def main():
+    client = app.test_client()
+    with app.app_context():
+        db.session.add_all([Bank(name='Banka'), Person(name='Kişi'), Place(name='Yer')])
+        db.session.add(Card(name='Kart', card_type='debit', bank_id=1))
+        db.session.commit()
+
+        add_transactions(40)
+        small = measure(client)
+        add_transactions(400)
+        large = measure(client)
+
+    failed = False
+    for page, budget in PAGES.items():
+        if small[page] != large[page]:
+            status = 'GROWS'
+        elif large[page] > budget:
+            status = f'OVER BUDGET ({budget})'
+        else:
+            status = 'ok'
+        failed |= status != 'ok'
+        print(f'{page:<28} {small[page]:>3} -> {large[page]:>3} queries  {status}')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
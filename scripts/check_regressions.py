@@ -0,0 +1,182 @@
+"""Regression checks for fixed bugs, each against a fresh in-memory database.
+
+    python scripts/check_regressions.py
+"""
+import io
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from noralyzer import create_app  # noqa: E402
+from noralyzer.api import transaction_tag_ids  # noqa: E402
+from noralyzer.backup import (BackupImporter, generate_csv_export, generate_json_export,  # noqa: E402
+                              generate_ndjson_export, iter_csv_backup, iter_json_backup, iter_ndjson_backup)
+from noralyzer.cache import reference_list, settings_store  # noqa: E402
+from noralyzer.extensions import db  # noqa: E402
+from noralyzer.hooks import insert_transaction_rows  # noqa: E402
+from noralyzer.models import Bank, Budget, Category, Notification, Tag, Transaction  # noqa: E402
+from noralyzer.statements import import_statement  # noqa: E402
+from noralyzer.valuation import rate_table  # noqa: E402
+
+CHECKS = []
+
+
+def check(func):
+    CHECKS.append(func)
+    return func
+
+
+def transaction(**values):
+    return dict({'amount': '10', 'currency': 'TRY', 'transaction_type': 'expense', 'date': '2025-01-01'}, **values)
+
+
+@check
+def batch_create_tags_apart_from_update_tags(app, client):
+    """A create's position in a batch must not pick up the tags of an update with that id."""
+    db.session.add_all([Tag(name='a'), Tag(name='b')])
+    db.session.commit()
+    ids = client.post('/api/v1/transactions/batch', json=[
+        {'op': 'create', 'data': transaction()} for _ in range(3)
+    ]).get_json()['ids']
+    # The create sits at position 1, the updated transaction has id 1
+    assert ids[0] == 1, ids
+    response = client.post('/api/v1/transactions/batch', json=[
+        {'op': 'update', 'id': 1, 'data': {'tags': [1]}},
+        {'op': 'create', 'data': transaction(tags=[2])},
+    ])
+    assert response.status_code == 200, response.get_json()
+    _updated, created = response.get_json()['ids']
+    tags = transaction_tag_ids([1, created])
+    assert tags.get(1) == [1], tags
+    assert tags.get(created) == [2], tags
+
+
+@check
+def caches_follow_writes_of_other_processes(app, client):
+    """Writes the in-process caches cannot see (another worker, a CLI) reach them by the change counters."""
+    client.get('/settings')
+    assert settings_store.get('app_name') != 'Başka', settings_store.get('app_name')
+    assert not any(category.name == 'Başka' for category in reference_list(Category))
+    assert rate_table.rate('USD', date(2025, 1, 1)) != 42.0
+    # Plain connection statements, as another process would write them, skip the session's listeners
+    connection = db.session.connection()
+    connection.exec_driver_sql("INSERT INTO setting (key, value) VALUES ('app_name', 'Başka') "
+                               'ON CONFLICT (key) DO UPDATE SET value = excluded.value')
+    connection.exec_driver_sql("INSERT INTO category (name) VALUES ('Başka')")
+    connection.exec_driver_sql("INSERT INTO currency_rate (currency, date, rate) VALUES ('USD', '2024-12-31', 42.0)")
+    db.session.commit()
+    assert settings_store.get('app_name') == 'Başka', settings_store.get('app_name')
+    assert any(category.name == 'Başka' for category in reference_list(Category))
+    assert rate_table.rate('USD', date(2025, 1, 1)) == 42.0
+
+
+@check
+def statement_fingerprint_keeps_sub_cent_amounts(app, client):
+    """Coin amounts that round to the same cent are distinct statement lines."""
+    bank = Bank(name='Borsa', statement_profile={'currency': 'BTC'})
+    db.session.add(bank)
+    db.session.commit()
+    statement = 'Tarih;Açıklama;Tutar\n01.02.2025;Alım;0,00120000\n01.02.2025;Alım;0,00130000\n'
+    assert import_statement(io.StringIO(statement), bank) == (2, 0)
+    db.session.commit()
+    # The same file again matches both lines
+    assert import_statement(io.StringIO(statement), bank) == (0, 2)
+
+
+@check
+def malformed_tag_filters_are_ignored(app, client):
+    """A tag id that is not a number drops out of the filter instead of failing the page."""
+    for url in ('/transactions?tag=abc', '/transactions?tag=&tag=1', '/api/v1/transactions?tag=abc'):
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+
+
+@check
+def one_alert_for_a_write_past_several_thresholds(app, client):
+    """A budget going from 0 to past 100% at once gets the 100% notification only."""
+    db.session.add(Budget(name='Market', amount=100, period='monthly'))
+    db.session.commit()
+    client.post('/api/v1/transactions', json=transaction(amount='150', date=date.today().isoformat()))
+    levels = db.session.execute(db.select(Notification.level).where(Notification.kind == 'budget')).scalars().all()
+    assert levels == [100], levels
+
+
+@check
+def backup_amounts_round_trip_exactly(app, client):
+    """Amounts past 2**53 minor units and 8-decimal coin amounts survive export and import."""
+    amounts = {'TRY': 2 ** 53 + 1, 'BTC': 2 ** 53 + 3, 'DOGE': 12345678}
+    insert_transaction_rows([{'amount_minor': minor, 'currency': currency, 'transaction_type': 'income',
+                              'date': date(2025, 1, 1)} for currency, minor in amounts.items()])
+    db.session.commit()
+    for generate, reader in ((generate_json_export, iter_json_backup), (generate_ndjson_export, iter_ndjson_backup),
+                             (generate_csv_export, iter_csv_backup)):
+        backup = ''.join(generate())
+        db.session.execute(Transaction.__table__.delete())
+        BackupImporter().run(reader(io.StringIO(backup)))
+        db.session.commit()
+        restored = dict(db.session.execute(db.select(Transaction.currency, Transaction.amount_minor)).all())
+        assert restored == amounts, (generate.__name__, restored)
+
+
+@check
+def pages_walk_past_undated_transactions(app, client):
+    """Cursors step over transactions without a date both ways; a zero page size still shows rows."""
+    insert_transaction_rows([{'amount_minor': 100, 'currency': 'TRY', 'transaction_type': 'expense',
+                              'date': day} for day in (date(2025, 1, 1), date(2025, 1, 2), None, None, None)])
+    settings_store.update({'items_per_page': '2'})
+    db.session.commit()
+    pages, cursor = [], None
+    while True:
+        page = client.get('/api/v1/transactions', query_string={'cursor': cursor} if cursor else {}).get_json()
+        pages.append([row['id'] for row in page['data']])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    assert pages == [[2, 1], [5, 4], [3]], pages
+    back = client.get('/api/v1/transactions', query_string={'cursor': page['prev_cursor']}).get_json()
+    assert [row['id'] for row in back['data']] == [5, 4], back
+    back = client.get('/api/v1/transactions', query_string={'cursor': back['prev_cursor']}).get_json()
+    assert [row['id'] for row in back['data']] == [2, 1], back
+    settings_store.update({'items_per_page': '0'})
+    db.session.commit()
+    assert len(client.get('/api/v1/transactions').get_json()['data']) == 1
+    assert client.get('/transactions').status_code == 200
+
+
+@check
+def api_rejects_dangling_references(app, client):
+    """Ids of missing rows are a 400; a bank or category still in use cannot be deleted."""
+    for data in (transaction(category_id=999), transaction(to_bank_id=999), transaction(tags=[999])):
+        response = client.post('/api/v1/transactions', json=data)
+        assert response.status_code == 400 and 'error' in response.get_json(), (data, response.get_json())
+    assert client.post('/api/v1/cards', json={'name': 'Kart', 'bank_id': 999}).status_code == 400
+    bank = client.post('/api/v1/banks', json={'name': 'Banka'}).get_json()['data']['id']
+    category = client.post('/api/v1/categories', json={'name': 'Yeni'}).get_json()['data']['id']
+    created = client.post('/api/v1/transactions', json=transaction(category_id=category, from_bank_id=bank))
+    assert created.status_code == 201, created.get_json()
+    for url in (f'/api/v1/banks/{bank}', f'/api/v1/categories/{category}'):
+        response = client.delete(url)
+        assert response.status_code == 409, (url, response.status_code)
+    client.delete(f"/api/v1/transactions/{created.get_json()['data']['id']}")
+    assert client.delete(f'/api/v1/banks/{bank}').status_code == 204
+
+
+def main():
+    failed = False
+    for func in CHECKS:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+        with app.app_context():
+            try:
+                func(app, app.test_client())
+                status = 'ok'
+            except Exception as error:
+                status = f'FAILED {error!r}'
+        failed |= status != 'ok'
+        print(f'{func.__name__:<50} {status}')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""Show the SQLite query plan of every transaction query behind the listing and report pages.
+
+Pages are rendered against a generated in-memory dataset; each statement that
+reads the transaction table is re-run with EXPLAIN QUERY PLAN. Only SEARCH
+steps count as indexed: a SCAN of the table visits every row, in index order
+or not. The script exits non-zero when a statement scans the table, unless
+the page and plan step are listed in ALLOWED_SCANS.
+
+    python scripts/explain_queries.py            # summary
+    python scripts/explain_queries.py --verbose  # every statement with its plan
+"""
+import os
+import random
+import re
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event  # noqa: E402
+
+from noralyzer import create_app  # noqa: E402
+from noralyzer.constants import TRANSACTION_TYPES  # noqa: E402
+from noralyzer.extensions import db  # noqa: E402
+from noralyzer.models import Bank, Budget, Card, Person, Place, Tag, Transaction, transaction_tags  # noqa: E402
+from noralyzer.pagination import encode_cursor  # noqa: E402
+
+app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+
+PAGES = [
+    '/',
+    '/transactions',
+    '/transactions?category=2',
+    '/transactions?person=3',
+    '/transactions?owner=2',
+    '/transactions?place=4',
+    '/transactions?card=1',
+    '/transactions?bank=2',
+    '/transactions?date_from=2024-01-01&date_to=2024-03-31',
+    '/transactions?category=1&date_from=2024-06-01',
+    '/transactions?cursor=' + encode_cursor('next', ('2024-06-01', '12:00', 2500)),
+    '/transactions?category=4&cursor=' + encode_cursor('prev', ('2024-06-01', '', 2500)),
+    '/transactions?q=kira',
+    '/transactions?tag=2',
+    '/transactions?tag=1&tag=3&tag_mode=all&date_from=2024-01-01',
+    '/transactions?q=market&category=2&cursor=' + encode_cursor('next', (-1.5, 2500)),
+    '/cards/1/transactions',
+    '/persons/1/report',
+    '/persons/1/owner-report',
+    '/places/1/report',
+    '/banks',
+    '/goals',
+    '/settings',
+    '/reports',
+    '/reports?range=12m&category=3',
+    '/reports?range=all',
+    '/api/chart-data',
+    '/api/charts/daily?range=12m',
+    '/api/charts/weekly?range=12m&category=2',
+]
+
+FULL_SCAN = re.compile(r'\bSCAN transaction\b')
+
+# Scans accepted on purpose: page -> {plan step: reason}
+ALLOWED_SCANS = {
+    '/': {
+        'SCAN transaction USING INDEX ix_transaction_date': 'recent rows in date order, stops at the LIMIT',
+    },
+    '/transactions': {
+        'SCAN transaction USING INDEX ix_transaction_date': 'unfiltered first page in date order, stops at the LIMIT',
+    },
+}
+
+
+def populate(rows=5000):
+    rnd = random.Random(7)
+    db.session.add_all([Bank(name=f'Banka {i}') for i in range(5)])
+    db.session.add_all([Person(name=f'Kişi {i}') for i in range(10)])
+    db.session.add_all([Place(name=f'Yer {i}') for i in range(10)])
+    db.session.add_all([Card(name=f'Kart {i}', card_type='debit', bank_id=1 + i) for i in range(3)])
+    db.session.add_all([Budget(name=f'Bütçe {i}', amount=1000, period='monthly', category_id=1 + i) for i in range(3)])
+    db.session.add_all([Tag(name=f'Etiket {i}') for i in range(5)])
+    db.session.flush()
+    types = [t for t, _ in TRANSACTION_TYPES]
+    start = date(2023, 1, 1)
+    db.session.add_all([Transaction(
+        amount=rnd.randint(1, 5000), currency=rnd.choice(['TRY', 'USD', 'EUR']),
+        transaction_type=rnd.choice(types), date=start + timedelta(days=rnd.randint(0, 1000)),
+        category_id=rnd.randint(1, 9), bank_id=rnd.randint(1, 5), card_id=rnd.randint(1, 3),
+        person_id=rnd.randint(1, 10), owner_id=rnd.randint(1, 10), place_id=rnd.randint(1, 10)
+    ) for _ in range(rows)])
+    db.session.flush()
+    db.session.execute(transaction_tags.insert(), [
+        {'transaction_id': id, 'tag_id': tag_id} for id in range(1, rows + 1, 3) for tag_id in rnd.sample(range(1, 6), 2)])
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+
+
+def capture(client, page):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and re.search(r'\b(?:FROM|JOIN)\s+"?transaction"?', statement):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get(page)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    assert response.status_code == 200, (page, response.status_code)
+    return statements
+
+
+def main():
+    verbose = '--verbose' in sys.argv
+    client = app.test_client()
+    failures = 0
+    with app.app_context():
+        populate()
+        raw = db.engine.raw_connection()
+        try:
+            for page in PAGES:
+                db.session.remove()
+                statements = capture(client, page)
+                cursor = raw.cursor()
+                print(page)
+                for statement, parameters in statements:
+                    plan = [row[3] for row in cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters)]
+                    scans = [line for line in plan if FULL_SCAN.search(line)]
+                    allowed = ALLOWED_SCANS.get(page, {})
+                    failures += any(line not in allowed for line in scans)
+                    if not scans:
+                        label = 'indexed'
+                    elif all(line in allowed for line in scans):
+                        label = 'allowed scan: ' + '; '.join(allowed[line] for line in scans)
+                    else:
+                        label = 'FULL SCAN'
+                    print(f'  [{label}] ' + ' | '.join(plan))
+                    if verbose:
+                        print('      ' + ' '.join(statement.split()))
+        finally:
+            raw.close()
+    print(f'{failures} statement(s) scan the transaction table' if failures else 'no transaction query scans the table outside ALLOWED_SCANS')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""Compare request throughput with SQLite's default settings and with the tuned pragmas.
+
+For each profile a fresh database file is filled with generated transactions
+and served by several threaded Werkzeug processes, like the workers of a
+production server. Client threads request listing, report and API pages while
+a share of the requests write batches through the JSON API; requests per
+second, latency percentiles and failed requests ("database is locked") are
+printed for both profiles.
+
+    python scripts/load_test.py                              # both profiles, 10 s each
+    python scripts/load_test.py --seconds 30 --clients 16 --workers 4 --writes 0.2
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# profile -> SQLITE_PRAGMAS (None keeps the application's settings)
+PROFILES = {
+    'default': {},
+    'tuned': None,
+}
+
+READ_PAGES = [
+    '/',
+    '/transactions',
+    '/transactions?category=2',
+    '/transactions?q=market',
+    '/reports',
+    '/api/v1/transactions?limit=50',
+    '/api/v1/transactions?type=expense&limit=50',
+]
+
+
+def populate(rows):
+    from noralyzer.constants import TRANSACTION_TYPES
+    from noralyzer.extensions import db
+    from noralyzer.hooks import insert_transaction_rows
+    from noralyzer.models import Bank, Person, Place
+
+    rnd = random.Random(7)
+    db.session.add_all([Bank(name=f'Banka {i}') for i in range(5)])
+    db.session.add_all([Person(name=f'Kişi {i}') for i in range(10)])
+    db.session.add_all([Place(name=f'Yer {i}') for i in range(10)])
+    db.session.flush()
+    types = [t for t, _ in TRANSACTION_TYPES]
+    start = date(2023, 1, 1)
+    insert_transaction_rows([{
+        'amount_minor': rnd.randint(100, 500000), 'currency': rnd.choice(['TRY', 'USD', 'EUR']),
+        'transaction_type': rnd.choice(types), 'date': start + timedelta(days=rnd.randint(0, 1000)),
+        'description': rnd.choice(['market', 'kira', 'fatura', 'yemek', 'maaş']) + f' {i}',
+        'category_id': rnd.randint(1, 9), 'bank_id': rnd.randint(1, 5),
+        'person_id': rnd.randint(1, 10), 'place_id': rnd.randint(1, 10),
+    } for i in range(rows)])
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+
+
+def write_batch(rnd, size):
+    return json.dumps({'operations': [{'op': 'create', 'data': {
+        'amount': f'{rnd.randint(1, 5000)}.{rnd.randint(0, 99):02d}', 'currency': 'TRY',
+        'transaction_type': rnd.choice(['expense', 'income']), 'date': date.today().isoformat(),
+        'description': f'yük testi {rnd.random():.6f}', 'category_id': rnd.randint(1, 9),
+    }} for _ in range(size)]}).encode()
+
+
+def client(base, deadline, writes, batch, seed, results):
+    rnd = random.Random(seed)
+    while time.monotonic() < deadline:
+        if rnd.random() < writes:
+            kind = 'write'
+            request = urllib.request.Request(base + '/api/v1/transactions/batch', data=write_batch(rnd, batch),
+                                             headers={'Content-Type': 'application/json'})
+        else:
+            kind = 'read'
+            request = urllib.request.Request(base + rnd.choice(READ_PAGES))
+        started = time.monotonic()
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                response.read()
+            ok = True
+        except (urllib.error.URLError, OSError):
+            ok = False
+        results.append((kind, time.monotonic() - started, ok))
+
+
+def serve(profile, database, rows):
+    """Serve the application with ``profile``; prints the port and journal mode once ready."""
+    sys.path.insert(0, ROOT)
+    from werkzeug.serving import make_server
+
+    from noralyzer import create_app
+    from noralyzer.extensions import db
+
+    config = {'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + database}
+    if PROFILES[profile] is not None:
+        config['SQLITE_PRAGMAS'] = PROFILES[profile]
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    app = create_app(config)
+    app.logger.disabled = True
+    with app.app_context():
+        if rows:
+            populate(rows)
+        journal_mode = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    print(json.dumps({'port': server.server_port, 'journal_mode': journal_mode}), flush=True)
+    server.serve_forever()
+
+
+def run_profile(profile, args):
+    """Start ``args.workers`` server processes on one new database, load them and summarize the results."""
+    database = os.path.join(tempfile.mkdtemp(prefix='noralyzer-load-'), 'load.db')
+    processes, bases = [], []
+    try:
+        # The first worker creates and fills the database, the others open it afterwards
+        for worker in range(args.workers):
+            process = subprocess.Popen([sys.executable, __file__, '--serve', profile, f'--database={database}',
+                                        f'--rows={args.rows if worker == 0 else 0}'], stdout=subprocess.PIPE, text=True)
+            processes.append(process)
+            ready = json.loads(process.stdout.readline())
+            bases.append(f'http://127.0.0.1:{ready["port"]}')
+        results = []
+        deadline = time.monotonic() + args.seconds
+        threads = [threading.Thread(target=client, args=(bases[seed % len(bases)], deadline, args.writes, args.batch,
+                                                         seed, results))
+                   for seed in range(args.clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    def percentile(values, share):
+        values = sorted(values)
+        return round(values[min(int(len(values) * share), len(values) - 1)] * 1000) if values else '-'
+
+    summary = {'profile': profile, 'journal_mode': ready['journal_mode'],
+               'rps': round(len(results) / args.seconds, 1), 'failed': sum(not ok for _kind, _t, ok in results)}
+    for kind in ('read', 'write'):
+        timings = [t for k, t, ok in results if k == kind and ok]
+        summary[kind] = f'{percentile(timings, 0.5)}/{percentile(timings, 0.95)}/{percentile(timings, 1)}'
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--writes', type=float, default=0.1, help='share of requests that write')
+    parser.add_argument('--batch', type=int, default=200, help='transactions per write request')
+    parser.add_argument('--rows', type=int, default=20000, help='transactions in the generated database')
+    parser.add_argument('--workers', type=int, default=4, help='server processes sharing the database')
+    parser.add_argument('--serve', choices=PROFILES, help=argparse.SUPPRESS)
+    parser.add_argument('--database', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        return serve(args.serve, args.database, args.rows)
+
+    print(f'{"profile":<8} {"journal":<8} {"req/s":>7} {"failed":>7}  {"read p50/p95/max ms":<20} {"write p50/p95/max ms":<20}')
+    for profile in PROFILES:
+        result = run_profile(profile, args)
+        print(f'{profile:<8} {result["journal_mode"]:<8} {result["rps"]:>7} {result["failed"]:>7}  '
+              f'{result["read"]:<20} {result["write"]:<20}')
+
+
+if __name__ == '__main__':
+    main()
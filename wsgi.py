@@ -0,0 +1,30 @@
+"""Production entry point: no debugger, no reloader, a threaded server.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+    waitress-serve --threads=8 wsgi:app
+    python wsgi.py    # waitress when installed, otherwise Werkzeug's threaded server
+
+The database is migrated once here, before any worker handles a request.
+Jobs an earlier server left unfinished are failed by the process that
+starts the server: here when run as a script, the master under gunicorn.
+Settings come from ``noralyzer.config.Config`` and the environment.
+"""
+import os
+
+from noralyzer import create_app
+from noralyzer.jobs import fail_interrupted_jobs
+
+app = create_app({'DEBUG': False})
+
+if __name__ == '__main__':
+    fail_interrupted_jobs(app)
+    host = os.environ.get('NORALYZER_HOST', '127.0.0.1')
+    port = int(os.environ.get('NORALYZER_PORT', 8000))
+    threads = int(os.environ.get('NORALYZER_THREADS', 8))
+    try:
+        from waitress import serve
+    except ImportError:
+        from werkzeug.serving import run_simple
+        run_simple(host, port, app, threaded=True, use_reloader=False, use_debugger=False)
+    else:
+        serve(app, host=host, port=port, threads=threads)